@@ -0,0 +1,13 @@
+import os
+
+# Arranque de los procesos hijos del pool de ingesta. Con `spawn` el hijo importa este módulo para
+# ejecutar el inicializador antes de haber configurado Django, así que aquí no se importan modelos
+# ni nada que los importe.
+
+
+def iniciar_proceso(settings_module):
+    # Cada proceso del pool configura Django y abre su propia conexión a la base
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
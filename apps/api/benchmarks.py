@@ -0,0 +1,515 @@
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Asegura que la carpeta raíz del proyecto está en sys.path
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from apps.api.referencias import (
+    carga_diaria_por_mascaras, carga_laboral_con_fechas_python, carga_total_por_filas, plazos_por_filas,
+)
+
+ESTADOS = [
+    'CON ARCHIVO (PRELIMINAR)', 'CON ARCHIVO (CALIFICA)', 'ARCHIVO CONSENTIDO',
+    'CON SENTENCIA', 'EN INVESTIGACION', 'CALIFICACION',
+]
+CONDICIONES = ['RESUELTO', 'EN TRAMITE']
+MATERIAS = ['HURTO', 'ROBO', 'LESIONES', 'OMISION A LA ASISTENCIA FAMILIAR', 'USURPACION']
+
+
+def generar_export_carga(filas=500_000, fiscales=60, anio=2025, mes=3, semilla=0):
+    # Export CargaTotal sintético ya normalizado (fechas datetime64 sin hora), con fechas
+    # repartidas en los últimos dos años
+    rng = np.random.default_rng(semilla)
+    fin = pd.Timestamp(anio, mes, 1) + pd.offsets.MonthEnd(0)
+    ingreso = fin - pd.to_timedelta(rng.integers(0, 730, filas), unit='D')
+    conclusion = ingreso + pd.to_timedelta(rng.integers(0, 120, filas), unit='D')
+    conclusion = conclusion.where(rng.random(filas) < 0.6)
+
+    return pd.DataFrame({
+        'nombre_fiscal': np.array([f'FISCAL {i:03d}' for i in range(fiscales)])[rng.integers(0, fiscales, filas)],
+        'fecha_ingreso': ingreso,
+        'fecha_conclusion': conclusion,
+        'estado': np.array(ESTADOS)[rng.integers(0, len(ESTADOS), filas)],
+        'condicion': np.array(CONDICIONES)[rng.integers(0, len(CONDICIONES), filas)],
+        'materia_delito': np.array(MATERIAS)[rng.integers(0, len(MATERIAS), filas)],
+    })
+
+
+def benchmark_carga_diaria(filas=500_000, anio=2025, mes=3):
+    from apps.api.functions import agregar_carga_diaria
+
+    df = generar_export_carga(filas=filas, anio=anio, mes=mes)
+    inicio = date(anio, mes, 1)
+    fin = (pd.Timestamp(inicio) + pd.offsets.MonthEnd(0)).date()
+
+    t0 = time.perf_counter()
+    anterior = carga_diaria_por_mascaras(df, inicio, fin)
+    t1 = time.perf_counter()
+    nuevo = agregar_carga_diaria(df, inicio, fin)
+    t2 = time.perf_counter()
+
+    anterior = anterior.sort_values(['nombre_fiscal', 'fecha']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(anterior, nuevo, check_dtype=False)
+
+    print(f'Carga diaria ({filas} filas, {len(nuevo)} registros Carga)')
+    print(f'  máscaras por fiscal y día: {t1 - t0:8.2f} s')
+    print(f'  groupby (fiscal, fecha):   {t2 - t1:8.2f} s  (x{(t1 - t0) / (t2 - t1):.0f})')
+
+
+def benchmark_fechas_carga(filas=500_000, anio=2025, mes=3):
+    import tracemalloc
+
+    from apps.api.functions import agregar_carga_laboral, normalizar_carga_laboral
+    from apps.api.pipeline import Contexto
+
+    contexto = Contexto(None, 'DEP', f'{anio:04d}-{mes:02d}', None, mes=mes, anio=anio)
+    export = generar_export_carga(filas=filas, anio=anio, mes=mes)
+
+    def datetime64(df):
+        return agregar_carga_laboral(normalizar_carga_laboral(df, contexto), contexto)
+
+    def fechas_python(df):
+        df = normalizar_carga_laboral(df, contexto)
+        return carga_laboral_con_fechas_python(df, contexto)
+
+    print(f'Fechas de la carga laboral ({filas} filas): normalizar + agregar')
+    resultados = {}
+    for nombre, funcion in [('date (object) y re-parseo', fechas_python), ('datetime64 de una lectura', datetime64)]:
+        df = export.copy()
+        t0 = time.perf_counter()
+        resultados[nombre] = funcion(df)
+        segundos = time.perf_counter() - t0
+        df = export.copy()
+        tracemalloc.start()
+        funcion(df)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'  {nombre:26} {segundos:8.2f} s  pico {pico / 2**20:6.1f} MiB')
+
+    anterior, nuevo = resultados.values()
+    materias = pd.concat([
+        pd.DataFrame({'periodo': inicio, 'materia': conteo.index.astype(str), 'cantidad': conteo.values})
+        for inicio, conteo in anterior['materias']
+    ])
+    comparar_materias(materias, nuevo['materias'])
+    pd.testing.assert_frame_equal(
+        anterior['tramites'][['nombre_fiscal', 'total_tramite', 'resuelto_mes', 'tramite_mes']],
+        nuevo['tramites'].drop(columns='periodo'), check_dtype=False,
+    )
+    pd.testing.assert_frame_equal(anterior['carga'], nuevo['carga'], check_dtype=False)
+
+
+def comparar_materias(esperado, obtenido):
+    def ordenar(df):
+        df = df.assign(materia=df['materia'].astype(str))[['periodo', 'materia', 'cantidad']]
+        return df.sort_values(['periodo', 'materia']).reset_index(drop=True)
+    pd.testing.assert_frame_equal(ordenar(esperado), ordenar(obtenido), check_dtype=False)
+
+
+def generar_excel_carga(filas=50_000, anio=2025, mes=12):
+    # El mismo export como lo entrega el sistema fiscal: columnas originales y fechas dd/mm/aaaa
+    import io
+
+    df = generar_export_carga(filas=filas, anio=anio, mes=mes)
+    df = df.rename(columns={
+        'nombre_fiscal': 'no_fiscal', 'fecha_ingreso': 'fe_ing_caso', 'fecha_conclusion': 'fe_conclusion',
+        'estado': 'de_estado', 'materia_delito': 'de_mat_deli',
+    })
+    for columna in ('fe_ing_caso', 'fe_conclusion'):
+        df[columna] = df[columna].dt.strftime('%d/%m/%Y')
+    archivo = io.BytesIO()
+    df.to_excel(archivo, index=False)
+    return archivo
+
+
+def benchmark_backfill(filas=50_000, anio=2025, meses=12):
+    # Cargar un año de historia: el export leído una vez por mes o una sola vez para todo el rango.
+    # Sin base de datos: lectura del Excel, normalización y agregación.
+    from apps.api.esquemas import ESQUEMAS
+    from apps.api.functions import agregar_carga_laboral, normalizar_carga_laboral
+    from apps.api.ingestas import formatear_periodo, formatear_rango
+    from apps.api.lectura import leer_excel
+    from apps.api.pipeline import Contexto
+
+    archivo = generar_excel_carga(filas=filas, anio=anio, mes=meses)
+
+    def procesar(periodo):
+        contexto = Contexto(archivo, 'DEP', periodo, None)
+        df = leer_excel(archivo, ESQUEMAS['carga_laboral'])
+        return agregar_carga_laboral(normalizar_carga_laboral(df, contexto), contexto)
+
+    t0 = time.perf_counter()
+    por_mes = [procesar(formatear_periodo(mes, anio)) for mes in range(1, meses + 1)]
+    t1 = time.perf_counter()
+    rango = procesar(formatear_rango(1, anio, formatear_periodo(meses, anio)))
+    t2 = time.perf_counter()
+
+    # Cada mes queda igual; en MateriaDelito el mes anterior de cada carga mensual es el mismo conteo
+    for tabla, claves in (('tramites', ['periodo', 'nombre_fiscal']), ('carga', ['nombre_fiscal', 'fecha'])):
+        esperado = pd.concat([resultado[tabla] for resultado in por_mes], ignore_index=True)
+        pd.testing.assert_frame_equal(
+            esperado.sort_values(claves, ignore_index=True), rango[tabla].sort_values(claves, ignore_index=True),
+            check_dtype=False, check_categorical=False,
+        )
+    materias = pd.concat([resultado['materias'] for resultado in por_mes]).drop_duplicates(['periodo', 'materia'])
+    comparar_materias(materias, rango['materias'])
+
+    print(f'Carga laboral de {meses} meses desde un export de {filas} filas ({archivo.tell() / 2**20:.1f} MiB)')
+    print(f'  una lectura por mes:    {t1 - t0:8.2f} s')
+    print(f'  una lectura del rango:  {t2 - t1:8.2f} s  (x{(t1 - t0) / (t2 - t1):.1f})')
+
+
+def generar_export_plazos_detallado(filas=100_000, fiscales=60, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'fiscal': np.array([f'FISCAL {i:03d} PEÑA' for i in range(fiscales)])[rng.integers(0, fiscales, filas)],
+        'etapa': np.array(['CALIFICACIÓN', 'INVESTIGACIÓN PRELIMINAR', 'INVESTIGACIÓN PREPARATORIA'])[rng.integers(0, 3, filas)],
+        'estado': np.array(['EN TRÁMITE', 'RESUELTO'])[rng.integers(0, 2, filas)],
+        'color': np.array(['verde.jpg', 'amarillo.jpg', 'rojo.jpg'])[rng.integers(0, 3, filas)],
+        'plazo': rng.integers(10, 120, filas),
+        'dias': rng.integers(0, 150, filas),
+    })
+
+
+def benchmark_codificacion(filas=100_000):
+    import io
+
+    import chardet
+
+    from apps.api.lectura import TIEMPOS_CODIFICACION, detectar_codificacion
+
+    df = generar_export_plazos_detallado(filas=filas)
+    for encoding in ('utf-8', 'latin1'):
+        contenido = df.to_csv(index=False).encode(encoding)
+
+        t0 = time.perf_counter()
+        completo = chardet.detect(contenido)['encoding']
+        t1 = time.perf_counter()
+        archivo = io.BytesIO(contenido)
+        primera = detectar_codificacion(archivo, fuente=('benchmark', encoding))
+        t2 = time.perf_counter()
+        segunda = detectar_codificacion(archivo, fuente=('benchmark', encoding))
+        t3 = time.perf_counter()
+
+        print(f'Codificación {encoding} ({len(contenido) / 2**20:.1f} MiB)')
+        print(f'  chardet archivo completo: {t1 - t0:8.3f} s  -> {completo}')
+        print(f'  muestra acotada:          {t2 - t1:8.3f} s  -> {primera}')
+        print(f'  misma fuente otra vez:    {t3 - t2:8.3f} s  -> {segunda}')
+    print('  ' + ', '.join(f"{metodo}: {t['veces']}" for metodo, t in TIEMPOS_CODIFICACION.items()))
+
+
+def benchmark_excel(filas=20_000, columnas_extra=14):
+    import io
+    import tracemalloc
+
+    from apps.api.esquemas import ESQUEMAS
+    from apps.api.lectura import leer_excel
+
+    # Los exports traen muchas más columnas de las que usa el procesador
+    df = generar_export_plazos_detallado(filas=filas)
+    for i in range(columnas_extra):
+        df[f'campo_{i}'] = df['fiscal'] if i % 2 else df['plazo']
+    archivo = io.BytesIO()
+    df.to_excel(archivo, index=False)
+
+    def ida_y_vuelta_csv(file):
+        file.seek(0)
+        excel_df = pd.read_excel(file)
+        csv_buffer = io.StringIO()
+        excel_df.to_csv(csv_buffer, index=False, encoding='utf-8')
+        csv_buffer.seek(0)
+        return pd.read_csv(csv_buffer)
+
+    tiempos = {}
+    for nombre, lector in [
+        ('read_excel -> CSV -> read_csv', ida_y_vuelta_csv),
+        ('leer_excel (usecols, dtype)', lambda file: leer_excel(file, ESQUEMAS['plazos_detallado'])),
+    ]:
+        # tracemalloc encarece mucho las asignaciones de openpyxl: tiempo y memoria se miden por separado
+        t0 = time.perf_counter()
+        resultado = lector(archivo)
+        segundos = time.perf_counter() - t0
+        assert len(resultado) == filas
+        tracemalloc.start()
+        lector(archivo)
+        tiempos[nombre] = (segundos, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    print(f'Excel plazos detallado ({filas} filas, {len(df.columns)} columnas, {archivo.tell() / 2**20:.1f} MiB)')
+    for nombre, (segundos, pico) in tiempos.items():
+        print(f'  {nombre:30} {segundos:8.2f} s  pico {pico / 2**20:6.1f} MiB')
+
+
+def benchmark_esquemas(filas=300_000, columnas_extra=30):
+    import io
+    import tracemalloc
+
+    from apps.api.esquemas import ESQUEMAS
+    from apps.api.lectura import leer_tabla
+
+    df = generar_export_plazos_detallado(filas=filas)
+    for i in range(columnas_extra):
+        df[f'campo_{i}'] = df['fiscal'] if i % 2 else df['plazo']
+    archivo = io.BytesIO(df.to_csv(index=False).encode('utf-8'))
+    archivo.name = 'plazos_detallado.csv'
+
+    def todas_las_columnas(file):
+        file.seek(0)
+        return [pd.read_csv(file, encoding='utf-8')]
+
+    def con_esquema(file):
+        # Se conservan todos los bloques para comparar con el archivo completo en memoria
+        return list(leer_tabla(file, 'utf-8', None, ESQUEMAS['plazos_detallado']))
+
+    print(f'CSV plazos detallado ({filas} filas, {len(df.columns)} columnas, {len(archivo.getvalue()) / 2**20:.1f} MiB)')
+    for nombre, lector in [('todas las columnas', todas_las_columnas), ('esquema (usecols, dtype)', con_esquema)]:
+        t0 = time.perf_counter()
+        lector(archivo)
+        segundos = time.perf_counter() - t0
+        tracemalloc.start()
+        lector(archivo)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f'  {nombre:26} {segundos:8.2f} s  pico {pico / 2**20:6.1f} MiB')
+
+
+def benchmark_categorias(filas=500_000):
+    import tracemalloc
+
+    from apps.api.functions import normalizar_categorias
+
+    df = generar_export_carga(filas=filas)
+    columnas = ['estado', 'condicion', 'materia_delito', 'nombre_fiscal']
+
+    def normalizar(valores):
+        return valores.str.upper().str.normalize('NFKD').str.encode('ascii', errors='ignore').str.decode('utf-8').str.strip()
+
+    def por_fila(df):
+        return df.assign(**{columna: normalizar(df[columna].astype(str)) for columna in columnas})
+
+    def por_categoria(df):
+        return df.assign(**{columna: normalizar_categorias(df[columna], normalizar) for columna in columnas})
+
+    print(f'Normalización de {len(columnas)} columnas de texto ({filas} filas)')
+    for nombre, funcion in [('cadenas fila por fila', por_fila), ('valores distintos', por_categoria)]:
+        t0 = time.perf_counter()
+        resultado = funcion(df)
+        t1 = time.perf_counter()
+        agrupado = resultado.groupby(['nombre_fiscal', 'estado'], observed=True).size()
+        t2 = time.perf_counter()
+        tracemalloc.start()
+        funcion(df)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        memoria = resultado[columnas].memory_usage(deep=True).sum()
+        print(f'  {nombre:22} normalizar {t1 - t0:6.2f} s  groupby {t2 - t1:6.3f} s  '
+              f'pico {pico / 2**20:6.1f} MiB  columnas {memoria / 2**20:6.1f} MiB  ({len(agrupado)} grupos)')
+
+
+def generar_export_plazos(filas=50_000, semilla=0):
+    # Una fila por fiscal con las seis tripletas v/a/r; cerca de la mitad de las tripletas en cero
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        'ap_fiscal': [f'APELLIDO {i}' for i in range(filas)],
+        'no_fiscal': [f'NOMBRE {i}' for i in range(filas)],
+    })
+    for i in range(1, 7):
+        activa = rng.random(filas) < 0.5
+        for prefijo in 'var':
+            df[f'{prefijo}{i}'] = np.where(activa, rng.integers(0, 20, filas), 0)
+    return df
+
+
+def benchmark_plazos(filas=50_000):
+    from apps.api.functions import expandir_plazos
+
+    df = generar_export_plazos(filas=filas)
+    t0 = time.perf_counter()
+    anterior = plazos_por_filas(df)
+    t1 = time.perf_counter()
+    nuevo = expandir_plazos(df)
+    t2 = time.perf_counter()
+
+    pd.testing.assert_frame_equal(anterior, nuevo, check_dtype=False)
+
+    print(f'Plazos ({filas} filas, {len(nuevo)} registros Plazos)')
+    print(f'  iterrows x tripletas: {t1 - t0:8.2f} s')
+    print(f'  columnas por tripleta: {t2 - t1:7.3f} s  (x{(t1 - t0) / (t2 - t1):.0f})')
+
+
+def generar_export_carga_total(filas=50_000, semilla=0):
+    # Export ResumenCarga: una fila por fiscal con nombres con espacios y conteos por etapa
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        'apell': [f' APELLIDO {i} ' for i in range(filas)],
+        'nomb': [f'NOMBRE {i} ' for i in range(filas)],
+    })
+    for columna in ('pend', 'calif', 'preli', 'pnp', 'prepa', 'inter', 'juzga'):
+        df[columna] = rng.integers(0, 50, filas)
+    df['asig'] = df[['pend', 'calif', 'preli', 'pnp', 'prepa', 'inter', 'juzga']].sum(axis=1) + rng.integers(0, 500, filas)
+    return df
+
+
+def benchmark_carga_total(filas=50_000):
+    from apps.api.functions import resumir_carga_total
+
+    df = generar_export_carga_total(filas=filas)
+    t0 = time.perf_counter()
+    anterior = carga_total_por_filas(df)
+    t1 = time.perf_counter()
+    nuevo = resumir_carga_total(df)
+    t2 = time.perf_counter()
+
+    pd.testing.assert_frame_equal(anterior, nuevo[anterior.columns], check_dtype=False)
+
+    print(f'Carga total ({filas} filas)')
+    print(f'  iterrows y row.get:   {t1 - t0:8.2f} s')
+    print(f'  operaciones de columna: {t2 - t1:6.3f} s  (x{(t1 - t0) / (t2 - t1):.0f})')
+
+
+def benchmark_arrow(filas=300_000):
+    # Lectura de los CSV con el parser de C por bloques (predeterminado) y con pyarrow, más la
+    # agregación de cada fuente para comprobar que el resultado es el mismo.
+    # La memoria de Arrow no pasa por tracemalloc: se compara el tamaño de lo leído.
+    import io
+
+    from django.test import override_settings
+
+    from apps.api.esquemas import ESQUEMAS
+    from apps.api.functions import (
+        agregar_plazos_detallado, expandir_plazos, limpiar_plazos_detallado, resumir_carga_total,
+    )
+    from apps.api.lectura import leer_tabla, sumar_parciales
+
+    def plazos_detallado(bloques):
+        parciales = [agregar_plazos_detallado(limpiar_plazos_detallado(df)) for df in bloques]
+        return sumar_parciales(parciales, ['fiscal', 'etapa', 'estado'])
+
+    fuentes = [
+        ('plazos', generar_export_plazos(filas=filas), lambda bloques: expandir_plazos(pd.concat(bloques, ignore_index=True))),
+        ('carga_total', generar_export_carga_total(filas=filas), lambda bloques: resumir_carga_total(pd.concat(bloques, ignore_index=True))),
+        ('plazos_detallado', generar_export_plazos_detallado(filas=filas), plazos_detallado),
+    ]
+    print(f'CSV con el parser de C y con pyarrow ({filas} filas por fuente)')
+    for tipo, df, agregar in fuentes:
+        archivo = io.BytesIO(df.to_csv(index=False).encode('latin1'))
+        archivo.name = f'{tipo}.csv'
+        resultados = {}
+        for motor in ('c', 'pyarrow'):
+            with override_settings(INGESTA_MOTOR_CSV=motor):
+                t0 = time.perf_counter()
+                bloques = list(leer_tabla(archivo, 'latin1', None, ESQUEMAS[tipo]))
+                t1 = time.perf_counter()
+                resultados[motor] = agregar(bloques)
+                t2 = time.perf_counter()
+            memoria = sum(bloque.memory_usage(deep=True).sum() for bloque in bloques)
+            print(f'  {tipo:17} {motor:8} leer {t1 - t0:6.2f} s  agregar {t2 - t1:6.2f} s  '
+                  f'leído {memoria / 2**20:6.1f} MiB  ({len(archivo.getvalue()) / 2**20:.1f} MiB de CSV)')
+        pd.testing.assert_frame_equal(
+            resultados['c'], resultados['pyarrow'], check_dtype=False, check_categorical=False, check_index_type=False,
+        )
+
+
+def benchmark_motores(filas=1_000_000):
+    # Agrupamiento de las etapas de agregación con el motor de pandas y con el de Polars sobre los
+    # mismos datos; los resultados deben ser idénticos, tipos incluidos
+    from apps.api.functions import (
+        agregar_carga_laboral, agregar_plazos_detallado, contar_carga_siatf, limpiar_carga_siatf,
+        limpiar_plazos_detallado, normalizar_carga_laboral,
+    )
+    from apps.api.lectura import sumar_parciales
+    from apps.api.motores import PANDAS, MotorPolars
+    from apps.api.pipeline import Contexto
+
+    rng = np.random.default_rng(0)
+    contexto = Contexto(None, 'DEP', '2024-04:2025-03', None)
+    carga = normalizar_carga_laboral(generar_export_carga(filas=filas), contexto)
+    export_plazos = generar_export_plazos_detallado(filas=filas)
+    plazos = limpiar_plazos_detallado(export_plazos.copy())
+    siatf = limpiar_carga_siatf(pd.DataFrame({
+        'de_esp': np.array([' PENAL', 'FAMILIA ', 'CIVIL', None], dtype=object)[rng.integers(0, 4, filas)],
+        'de_estado': np.array(['EN TRAMITE', 'RESUELTO ', 'ARCHIVADO'])[rng.integers(0, 3, filas)],
+    }))
+
+    def plazos_por_bloques(motor):
+        # Cuatro bloques limpiados por separado, como los del CSV: cada uno tiene sus propias
+        # categorías, así que los parciales se suman con claves de texto
+        paso = -(-filas // 4)
+        parciales = [
+            agregar_plazos_detallado(limpiar_plazos_detallado(export_plazos.iloc[i:i + paso].copy()), motor)
+            for i in range(0, filas, paso)
+        ]
+        return sumar_parciales(parciales, ['fiscal', 'etapa', 'estado'], motor)
+
+    def carga_laboral(motor):
+        contexto.motor = motor
+        return agregar_carga_laboral(carga, contexto)
+
+    etapas = [
+        ('carga_laboral', carga_laboral),
+        ('plazos_detallado', lambda motor: agregar_plazos_detallado(plazos, motor)),
+        ('plazos por bloques', plazos_por_bloques),
+        ('carga_siatf', lambda motor: contar_carga_siatf(siatf, motor)),
+    ]
+    print(f'Motores de agregación ({filas} filas por fuente)')
+    for nombre, funcion in etapas:
+        resultados = {}
+        for motor in (PANDAS, MotorPolars()):
+            t0 = time.perf_counter()
+            resultados[motor.nombre] = funcion(motor)
+            print(f'  {nombre:18} {motor.nombre:7} {time.perf_counter() - t0:6.3f} s')
+        esperado, obtenido = resultados['pandas'], resultados['polars']
+        if isinstance(esperado, dict):
+            for tabla in esperado:
+                pd.testing.assert_frame_equal(esperado[tabla], obtenido[tabla])
+        else:
+            pd.testing.assert_frame_equal(esperado, obtenido)
+
+
+BENCHMARKS = {
+    'carga': benchmark_carga_diaria,
+    'fechas': benchmark_fechas_carga,
+    'backfill': benchmark_backfill,
+    'codificacion': benchmark_codificacion,
+    'excel': benchmark_excel,
+    'esquemas': benchmark_esquemas,
+    'categorias': benchmark_categorias,
+    'plazos': benchmark_plazos,
+    'carga_total': benchmark_carga_total,
+    'arrow': benchmark_arrow,
+    'motores': benchmark_motores,
+}
+
+if __name__ == '__main__':
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'back.settings')
+    django.setup()
+
+    import argparse
+
+    from django.db import connection
+
+    from apps.api.benchmarks_base import BENCHMARKS_BASE
+
+    parser = argparse.ArgumentParser(description='Benchmarks de la ingesta')
+    parser.add_argument('nombres', nargs='*', choices=[*BENCHMARKS, *BENCHMARKS_BASE], metavar='nombre',
+                        help=f'Por defecto todos los que no usan la base: {", ".join(BENCHMARKS)}')
+    parser.add_argument('--usar-base', action='store_true',
+                        help=f'Permite {", ".join(BENCHMARKS_BASE)} sobre una base cuyo nombre no empieza con test_')
+    argumentos = parser.parse_args()
+
+    nombres = argumentos.nombres or list(BENCHMARKS)
+    con_base = [nombre for nombre in nombres if nombre in BENCHMARKS_BASE]
+    base = connection.settings_dict['NAME']
+    if con_base and not argumentos.usar_base and not str(base).startswith('test_'):
+        parser.error(f'{", ".join(con_base)} bloquean y modifican la base {base}; use una base test_* o --usar-base')
+    for nombre in nombres:
+        {**BENCHMARKS, **BENCHMARKS_BASE}[nombre]()
@@ -0,0 +1,227 @@
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from apps.api.benchmarks import ESTADOS, MATERIAS
+
+# Benchmarks de consultas contra la base configurada. Se corren con
+# python apps/api/benchmarks.py indices|particiones
+
+
+def sembrar_historial(anios=3, dependencias=20, fiscales=30, densidad=0.5, semilla=0):
+    # Varios años de Carga, MateriaDelito, TramitesMensual y PlazosDetalle para medir consultas
+    from apps.api.persistencia import EscritorMasivo
+    from apps.modelos.models import Carga, MateriaDelito, PlazosDetalle, TramitesMensual
+
+    rng = np.random.default_rng(semilla)
+    dias = pd.date_range(end=pd.Timestamp.today().normalize(), periods=365 * anios).date
+    meses = sorted({(dia.year, dia.month) for dia in dias})
+    nombres_dependencias = [f'DEPENDENCIA {i:02d}' for i in range(dependencias)]
+    nombres_fiscales = [f'FISCAL {i:03d}' for i in range(fiscales)]
+
+    with EscritorMasivo(Carga, usar_copy=True) as escritor:
+        for dependencia in nombres_dependencias:
+            for fiscal in nombres_fiscales:
+                for dia in dias[rng.random(len(dias)) < densidad]:
+                    escritor.agregar(Carga(
+                        dependencia=dependencia, nombre_fiscal=fiscal, fecha=dia,
+                        casos_ingresados=int(rng.integers(0, 5)), casos_resueltos=int(rng.integers(0, 3)),
+                    ))
+    with EscritorMasivo(MateriaDelito, usar_copy=True) as escritor:
+        for dependencia in nombres_dependencias:
+            for anio, mes in meses:
+                escritor.agregar_todos(
+                    MateriaDelito(dependencia=dependencia, periodo=date(anio, mes, 1), materia=materia, cantidad=int(rng.integers(0, 50)))
+                    for materia in MATERIAS
+                )
+    with EscritorMasivo(TramitesMensual, usar_copy=True) as escritor:
+        for dependencia in nombres_dependencias:
+            for fiscal in nombres_fiscales:
+                escritor.agregar_todos(
+                    TramitesMensual(dependencia=dependencia, nombre_fiscal=fiscal, periodo=date(anio, mes, 1), total_tramite=int(rng.integers(0, 100)))
+                    for anio, mes in meses
+                )
+    with EscritorMasivo(PlazosDetalle, usar_copy=True) as escritor:
+        for dependencia in nombres_dependencias:
+            for anio, mes in meses:
+                escritor.agregar_todos(
+                    PlazosDetalle(dependencia=dependencia, nombre_fiscal=fiscal, etapa='CALIFICACION', estado=estado, vencidos=int(rng.integers(0, 20)))
+                    for fiscal in nombres_fiscales for estado in ESTADOS
+                )
+    return nombres_dependencias, nombres_fiscales, dias, meses
+
+
+def benchmark_indices(anios=3, dependencias=20, fiscales=30, repeticiones=200):
+    import random
+
+    from django.db import connection, transaction
+    from django.db.models import Sum
+
+    from apps.modelos.models import Carga, MateriaDelito, PlazosDetalle, TramitesMensual
+
+    class Deshacer(Exception):
+        pass
+
+    def medir(consultas):
+        tiempos = {}
+        for nombre, consulta in consultas.items():
+            azar = random.Random(0)
+            t0 = time.perf_counter()
+            for _ in range(repeticiones):
+                consulta(azar)
+            tiempos[nombre] = (time.perf_counter() - t0) / repeticiones * 1000
+        return tiempos
+
+    def analizar():
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    try:
+        with transaction.atomic():
+            t0 = time.perf_counter()
+            nombres_dependencias, nombres_fiscales, dias, meses = sembrar_historial(anios, dependencias, fiscales)
+            print(f'Historial sembrado: {Carga.objects.count()} Carga, {MateriaDelito.objects.count()} MateriaDelito, '
+                  f'{TramitesMensual.objects.count()} TramitesMensual, {PlazosDetalle.objects.count()} PlazosDetalle '
+                  f'({time.perf_counter() - t0:.1f} s)')
+
+            def mes_al_azar(azar):
+                anio, mes = azar.choice(meses)
+                inicio = date(anio, mes, 1)
+                return inicio, (pd.Timestamp(inicio) + pd.offsets.MonthEnd(0)).date()
+
+            consultas = {
+                'Carga por dependencia, fiscal y día': lambda azar: Carga.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), nombre_fiscal=azar.choice(nombres_fiscales),
+                    fecha=azar.choice(dias)).first(),
+                'Carga del mes por fiscal (dashboard)': lambda azar: list(Carga.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), fecha__range=mes_al_azar(azar)[:2])
+                    .values('nombre_fiscal').annotate(Sum('casos_ingresados'))),
+                'Carga de un fiscal en el año': lambda azar: Carga.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), nombre_fiscal=azar.choice(nombres_fiscales),
+                    fecha__year=azar.choice(meses)[0]).aggregate(Sum('casos_resueltos')),
+                'TramitesMensual por dependencia, fiscal y mes': lambda azar: TramitesMensual.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), nombre_fiscal=azar.choice(nombres_fiscales),
+                    periodo=mes_al_azar(azar)[0]).first(),
+                'MateriaDelito por dependencia y mes': lambda azar: list(MateriaDelito.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), periodo=mes_al_azar(azar)[0]).order_by('-cantidad')),
+                'MateriaDelito de una dependencia en un año': lambda azar: list(MateriaDelito.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), periodo__year=azar.choice(meses)[0])
+                    .values('materia').annotate(Sum('cantidad'))),
+                'PlazosDetalle por dependencia y fiscal': lambda azar: PlazosDetalle.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), nombre_fiscal=azar.choice(nombres_fiscales))
+                    .aggregate(Sum('vencidos')),
+            }
+
+            analizar()
+            con_indices = medir(consultas)
+
+            # Mismas consultas sin los índices ni las restricciones únicas de esos modelos.
+            # Las FK diferidas de la siembra deben verificarse antes de poder alterar las tablas.
+            with connection.cursor() as cursor:
+                cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            with connection.schema_editor() as editor:
+                for modelo in (Carga, MateriaDelito, TramitesMensual, PlazosDetalle):
+                    for indice in modelo._meta.indexes:
+                        editor.remove_index(modelo, indice)
+                    for restriccion in modelo._meta.constraints:
+                        editor.remove_constraint(modelo, restriccion)
+            analizar()
+            sin_indices = medir(consultas)
+            raise Deshacer
+    except Deshacer:
+        pass
+
+    print(f'Consultas ({repeticiones} repeticiones, ms por consulta)')
+    for nombre in consultas:
+        print(f'  {nombre:46} sin índices {sin_indices[nombre]:8.2f}  con índices {con_indices[nombre]:6.2f}  '
+              f'(x{sin_indices[nombre] / con_indices[nombre]:.0f})')
+
+
+def benchmark_particiones(anios=3, dependencias=20, fiscales=30, repeticiones=50):
+    # Carga con el historial en una sola tabla y luego convertida en una partición por mes
+    import random
+
+    from django.db import connection, transaction
+    from django.db.models import Sum
+
+    from apps.api.particiones import convertir_carga, separar_particion
+    from apps.modelos.models import Carga
+
+    class Deshacer(Exception):
+        pass
+
+    def medir(operaciones):
+        tiempos = {}
+        for nombre, operacion in operaciones.items():
+            azar = random.Random(0)
+            total = 0.0
+            for _ in range(repeticiones):
+                # Cada repetición se deshace para que las escrituras no alteren las siguientes
+                try:
+                    with transaction.atomic():
+                        t0 = time.perf_counter()
+                        operacion(azar)
+                        total += time.perf_counter() - t0
+                        raise Deshacer
+                except Deshacer:
+                    pass
+            tiempos[nombre] = total / repeticiones * 1000
+        return tiempos
+
+    def analizar():
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    try:
+        with transaction.atomic():
+            nombres_dependencias, _, _, meses = sembrar_historial(anios, dependencias, fiscales)
+            print(f'Historial sembrado: {Carga.objects.count()} Carga en {len(meses)} meses')
+            mas_antiguo = meses[0]
+
+            def rango_mes(anio, mes):
+                inicio = date(anio, mes, 1)
+                return inicio, (pd.Timestamp(inicio) + pd.offsets.MonthEnd(0)).date()
+
+            def mes_al_azar(azar):
+                return rango_mes(*azar.choice(meses))
+
+            operaciones = {
+                'Carga del mes por fiscal (dashboard)': lambda azar: list(Carga.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), fecha__range=mes_al_azar(azar))
+                    .values('nombre_fiscal').annotate(Sum('casos_ingresados'))),
+                'Totales de un mes para todas las dependencias': lambda azar: list(Carga.objects.filter(
+                    fecha__range=mes_al_azar(azar)).values('dependencia').annotate(Sum('casos_ingresados'))),
+                'Reemplazo del mes de una dependencia (delete)': lambda azar: Carga.objects.filter(
+                    dependencia=azar.choice(nombres_dependencias), fecha__range=mes_al_azar(azar)).delete(),
+                'Retirar el mes más antiguo (delete)': lambda azar: Carga.objects.filter(
+                    fecha__range=rango_mes(*mas_antiguo)).delete(),
+            }
+            analizar()
+            sin_particiones = medir(operaciones)
+
+            with connection.cursor() as cursor:
+                cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            t0 = time.perf_counter()
+            convertir_carga()
+            print(f'Conversión a tabla particionada: {time.perf_counter() - t0:.1f} s')
+            operaciones['Retirar el mes más antiguo (delete)'] = lambda azar: separar_particion(*mas_antiguo, eliminar=True)
+            analizar()
+            con_particiones = medir(operaciones)
+            raise Deshacer
+    except Deshacer:
+        pass
+
+    print(f'Operaciones ({repeticiones} repeticiones, ms por operación; el retiro particionado es DETACH + DROP)')
+    for nombre in operaciones:
+        print(f'  {nombre:46} tabla única {sin_particiones[nombre]:8.2f}  particionada {con_particiones[nombre]:8.2f}')
+
+
+# Estos siembran filas en la base configurada, quitan índices y restricciones y convierten Carga en
+# particionada con LOCK ACCESS EXCLUSIVE durante minutos. Todo se deshace al final, pero la tabla queda
+# bloqueada mientras tanto: nunca corren por defecto y solo contra una base de pruebas o con --usar-base.
+BENCHMARKS_BASE = {
+    'indices': benchmark_indices,
+    'particiones': benchmark_particiones,
+}
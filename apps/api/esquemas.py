@@ -0,0 +1,62 @@
+# Columnas que se leen de cada export y cómo se interpretan al leerlas:
+#   'texto'     cadena
+#   'categoria' cadena con pocos valores distintos que se repiten (fiscales, estados, etapas...)
+#   'numero'    lo infiere el parser; si la columna trae texto se convierte con errors='coerce'
+#   'fecha'     se convierte una sola vez con dayfirst=True; lo que no es fecha queda NaT
+# Las demás columnas del archivo no se cargan.
+# Las claves son los tipos de RegistroIngesta; entre paréntesis la carpeta de data/ de cada fuente.
+
+ESQUEMAS = {
+    # (PlazosDetallado)
+    'plazos_detallado': {
+        'fiscal': 'categoria',
+        'etapa': 'categoria',
+        'estado': 'categoria',
+        'color': 'categoria',
+        'plazo': 'numero',
+        'dias': 'numero',
+    },
+    # (Plazos) conteos dentro de plazo (v), por vencer (a) y vencidos (r) de los seis tipos de caso
+    'plazos': {
+        'ap_fiscal': 'texto',
+        'no_fiscal': 'texto',
+        **{f'{prefijo}{i}': 'numero' for i in range(1, 7) for prefijo in 'var'},
+    },
+    # (ResumenCarga)
+    'carga_total': {
+        'apell': 'texto',
+        'nomb': 'texto',
+        'asig': 'numero',
+        'pend': 'numero',
+        'calif': 'numero',
+        'preli': 'numero',
+        'pnp': 'numero',
+        'prepa': 'numero',
+        'inter': 'numero',
+        'juzga': 'numero',
+    },
+    # (CargaTotal)
+    'carga_laboral': {
+        'no_fiscal': 'categoria',
+        'fe_ing_caso': 'fecha',
+        'fe_conclusion': 'fecha',
+        'de_estado': 'categoria',
+        'condicion': 'categoria',
+        'de_mat_deli': 'categoria',
+    },
+    # (CargaSiatf)
+    'carga_siatf': {
+        'de_esp': 'categoria',
+        'de_estado': 'categoria',
+    },
+}
+
+# dtype con el que pandas lee cada tipo de columna; números y fechas se resuelven después
+TIPOS_LECTURA = {
+    'texto': str,
+    'categoria': 'category',
+}
+
+
+def tipos_lectura(esquema):
+    return {columna: TIPOS_LECTURA[tipo] for columna, tipo in esquema.items() if tipo in TIPOS_LECTURA}
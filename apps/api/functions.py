@@ -1,452 +1,482 @@
-import io
-import locale
-import traceback
-from calendar import monthrange
-from datetime import datetime, timedelta
+import unicodedata
+from datetime import timedelta
 
 import pandas as pd
-from django.db import transaction
-import chardet
-from rest_framework import status
+from django.conf import settings
 
 
 from apps.modelos.models import Plazos, Carga, TramitesMensual, MateriaDelito, CargaTotal, CargaSiatf,PlazosDetalle
+from .indicadores import (
+    rango_periodo, refrescar_indicadores_carga, refrescar_indicadores_materias, refrescar_indicadores_plazos,
+)
+from .ingestas import formatear_periodo, formatear_rango, meses_periodo
+from .esquemas import ESQUEMAS
+from .lectura import leer_excel, leer_tabla
+from .particiones import asegurar_particiones_carga
+from .motores import PANDAS
+from .persistencia import EscritorMasivo
+from .pipeline import Pipeline
+
+def normalizar_categorias(serie, normalizar):
+    # Columnas como estado, etapa o nombre_fiscal repiten unos pocos valores en cientos de miles
+    # de filas: se normalizan solo los valores distintos y cada fila recibe el suyo por su código.
+    # Valores que quedan iguales tras normalizar se funden en una sola categoría.
+    # Igual que con astype(str), los vacíos se normalizan como el texto 'nan'.
+    serie = serie.astype('category')
+    valores = pd.Series(list(serie.cat.categories.astype(str)) + ['nan'])
+    codigos, categorias = pd.factorize(normalizar(valores), sort=True)
+    # El código -1 (vacío) toma el último valor, el de 'nan'
+    return pd.Series(
+        pd.Categorical.from_codes(codigos[serie.cat.codes], categories=categorias),
+        index=serie.index,
+        name=serie.name,
+    )
+
+
 #plazos detallado
 
-@transaction.atomic
-def procesar_archivo_plazos_detallado(file, dependencia):
-    try:
-        filename = file.name.lower()
-        if filename.endswith('.csv'):
-            file.seek(0)
-            raw_data = file.read()
-            detected = chardet.detect(raw_data)
-            encoding_detected = detected['encoding'] or 'utf-8'
-            
-            try:
-                decoded_data = raw_data.decode(encoding_detected, errors='replace')
-                df = pd.read_csv(io.StringIO(decoded_data), sep=',', on_bad_lines='skip')
-            except Exception as e:
-                # Si falla con el encoding detectado, intentar con utf-8
-                try:
-                    decoded_data = raw_data.decode('utf-8', errors='replace')
-                    df = pd.read_csv(io.StringIO(decoded_data), sep=',', on_bad_lines='skip')
-                except Exception as e2:
-                    # Si también falla, intentar con latin1
-                    decoded_data = raw_data.decode('latin1', errors='replace')
-                    df = pd.read_csv(io.StringIO(decoded_data), sep=',', on_bad_lines='skip')
-        else:
-            excel_df = pd.read_excel(file)
-            csv_buffer = io.StringIO()
-            excel_df.to_csv(csv_buffer, index=False, encoding='utf-8')
-            csv_buffer.seek(0)
-            df = pd.read_csv(csv_buffer)
-
-        df.columns = df.columns.str.strip()
-        
-        # Limpiar datos preservando caracteres especiales como ñ
-        df['fiscal'] = df['fiscal'].astype(str).str.strip()
-        df['etapa'] = df['etapa'].astype(str).str.strip()
-        df['estado'] = df['estado'].astype(str).str.strip()
-        df['color'] = df['color'].astype(str).str.strip()
-        df['plazo'] = pd.to_numeric(df['plazo'], errors='coerce').fillna(0)
-        df['dias'] = pd.to_numeric(df['dias'], errors='coerce').fillna(0)
-        
-        # Normalizar caracteres especiales pero preservar ñ
-        def normalize_text(text):
-            if pd.isna(text):
-                return text
-            text = str(text)
-            # Normalizar caracteres pero preservar ñ
-            import unicodedata
-            # Normalizar a NFD para separar caracteres base de diacríticos
-            text = unicodedata.normalize('NFD', text)
-            # Reemplazar ñ normalizada por ñ simple
-            text = text.replace('\u0303n', 'ñ').replace('\u0303N', 'Ñ')
-            # Normalizar a NFC para recomponer caracteres
-            text = unicodedata.normalize('NFC', text)
-            return text.strip()
-        
-        # Aplicar normalización a columnas de texto
-        df['fiscal'] = df['fiscal'].apply(normalize_text)
-        df['etapa'] = df['etapa'].apply(normalize_text)
-        df['estado'] = df['estado'].apply(normalize_text)
-        
-        # Agrupar por fiscal, etapa y estado para contar casos
-        conteo_casos = df.groupby(['fiscal', 'etapa', 'estado']).size().reset_index(name='cantidad')
-        
-        for _, row in conteo_casos.iterrows():
-            fiscal = row['fiscal']
-            etapa = row['etapa']
-            estado = row['estado']
-            cantidad = row['cantidad']
-            
-            # Filtrar datos para este fiscal, etapa y estado específicos
-            datos_filtrados = df[
-                (df['fiscal'] == fiscal) & 
-                (df['etapa'] == etapa) & 
-                (df['estado'] == estado)
-            ]
-            
-            # Calcular estadísticas de plazos
-            dentro_plazo = 0
-            por_vencer = 0
-            vencidos = 0
-            
-            for _, caso in datos_filtrados.iterrows():
-                dias_transcurridos = caso['dias']
-                plazo_establecido = caso['plazo']
-                color = caso['color']
-                
-                # Lógica para clasificar según el estado del plazo
-                if color == 'verde.jpg':
-                    # Caso dentro de plazo
-                    dentro_plazo += 1
-                elif color == 'rojo.jpg':
-                    # Caso vencido
-                    vencidos += 1
-                else:
-                    # Caso por vencer (amarillo o sin color específico)
-                    if dias_transcurridos < plazo_establecido:
-                        por_vencer += 1
-                    else:
-                        vencidos += 1
-            
-            # Solo crear registro si hay casos
-            if dentro_plazo > 0 or por_vencer > 0 or vencidos > 0:
-                PlazosDetalle.objects.create(
-                    dependencia=dependencia,
-                    nombre_fiscal=fiscal,
-                    etapa=etapa,
-                    estado=estado,
-                    dentro_plazo=dentro_plazo,
-                    por_vencer=por_vencer,
-                    vencidos=vencidos
-                )
-        
-        return True, 'Datos cargados correctamente.'
-    except Exception as e:
-        return False, str(e)
-
-@transaction.atomic
-def procesar_archivo_plazos(file, dependencia):
-    try:
-        file.seek(0)
-        raw_data = file.read()
-        detected = chardet.detect(raw_data)
-        encoding_detected = detected['encoding'] or 'latin1'
-
-        try:
-            decoded_data = raw_data.decode(encoding_detected, errors='replace')
-            df = pd.read_csv(io.StringIO(decoded_data), sep=',', on_bad_lines='skip')
-        except Exception as e:
-            return False, f'Error al leer CSV: {str(e)}'
-
-        df.columns = df.columns.str.strip()
-
-        tipos = [
-            'Calificación','Investigación Preliminar(Fiscal)','Investigación Preliminar(P.N.P.)',
-            'Investigación Preparatoria','Conclusión de Investigación','Investigación Preliminar Pérdida Dominio'
-        ]
-
-        for _, row in df.iterrows():
-            for i in range(1, 7):
-                v_key, a_key, r_key = f'v{i}', f'a{i}', f'r{i}'
-                if v_key in df.columns and a_key in df.columns and r_key in df.columns:
-                    v_val = row[v_key]
-                    a_val = row[a_key]
-                    r_val = row[r_key]
-                    if v_val == 0 and a_val == 0 and r_val == 0:
-                        continue
-                    Plazos.objects.create(
-                        dentro_plazo=v_val,
-                        por_vencer=a_val,
-                        vencidos=r_val,
-                        nombre_fiscal=f"{row['ap_fiscal']} {row['no_fiscal']}",
-                        dependencia=dependencia,
-                        tipo_caso=tipos[i-1] if i-1 < len(tipos) else None
-                    )
-        return True, 'Datos cargados correctamente.'
-    except Exception as e:
-        return False, str(e)
-
-
-@transaction.atomic
-def procesar_carga_laboral(file, dependencia, mes, anio):
-    anio = int(anio)
-    mes = int(mes)
-    try:
-        locale.setlocale(locale.LC_TIME, 'es-ES')
-
-
-        try:
-            df = pd.read_excel(file,engine='xlrd')
-        except Exception as e:
-            error_message = f"{str(e)}\n{traceback.format_exc()}"
-            return {'error': f'Error al leer Excel:\n{error_message}'}, status.HTTP_400_BAD_REQUEST
-
-        df = df.rename(columns={
-            'no_fiscal': 'nombre_fiscal',
-            'fe_ing_caso': 'fecha_ingreso',
-            'fe_conclusion': 'fecha_conclusion',
-            'de_estado': 'estado',
-            'condicion': 'condicion',
-            'de_mat_deli': 'materia_delito'
+# Normalizar caracteres especiales pero preservar ñ
+def normalize_text(text):
+    if pd.isna(text):
+        return text
+    text = str(text)
+    # Normalizar a NFD para separar caracteres base de diacríticos
+    text = unicodedata.normalize('NFD', text)
+    # Reemplazar ñ normalizada por ñ simple
+    text = text.replace('\u0303n', 'ñ').replace('\u0303N', 'Ñ')
+    # Normalizar a NFC para recomponer caracteres
+    text = unicodedata.normalize('NFC', text)
+    return text.strip()
+
+
+def limpiar_plazos_detallado(df):
+    df.columns = df.columns.str.strip()
+
+    # Limpiar datos preservando caracteres especiales como ñ
+    for columna in ('fiscal', 'etapa', 'estado'):
+        df[columna] = normalizar_categorias(df[columna], lambda valores: valores.str.strip().map(normalize_text))
+    df['color'] = normalizar_categorias(df['color'], lambda valores: valores.str.strip())
+    df['plazo'] = pd.to_numeric(df['plazo'], errors='coerce').fillna(0)
+    df['dias'] = pd.to_numeric(df['dias'], errors='coerce').fillna(0)
+    return df
+
+
+def agregar_plazos_detallado(df, motor=PANDAS):
+    # verde.jpg: dentro de plazo; rojo.jpg: vencido; cualquier otro color (amarillo o vacío)
+    # queda por vencer si aún no se cumplieron los días del plazo y vencido en caso contrario.
+    # Cada caso suma en exactamente un contador, así que todo grupo tiene al menos un caso.
+    es_verde = df['color'] == 'verde.jpg'
+    es_rojo = df['color'] == 'rojo.jpg'
+    en_plazo = df['dias'] < df['plazo']
+
+    clasificacion = pd.DataFrame({
+        'fiscal': df['fiscal'],
+        'etapa': df['etapa'],
+        'estado': df['estado'],
+        'dentro_plazo': es_verde.astype(int),
+        'por_vencer': (~es_verde & ~es_rojo & en_plazo).astype(int),
+        'vencidos': (~es_verde & (es_rojo | ~en_plazo)).astype(int),
+    })
+    return motor.sumar(clasificacion, ['fiscal', 'etapa', 'estado'])
+
+def escribir_plazos_detallado(resultados, contexto):
+    with EscritorMasivo(PlazosDetalle) as escritor:
+        for conteo_casos in resultados:
+            for fila in conteo_casos.itertuples(index=False):
+                escritor.agregar(PlazosDetalle(
+                    dependencia=contexto.dependencia,
+                    nombre_fiscal=fila.fiscal,
+                    etapa=fila.etapa,
+                    estado=fila.estado,
+                    dentro_plazo=fila.dentro_plazo,
+                    por_vencer=fila.por_vencer,
+                    vencidos=fila.vencidos,
+                    ingesta=contexto.registro
+                ))
+
+
+# Clasificar cada bloque y acumular los conteos por fiscal, etapa y estado
+PIPELINE_PLAZOS_DETALLADO = Pipeline(
+    'plazos_detallado',
+    leer=lambda contexto: leer_tabla(
+        contexto.file, 'utf-8', ('plazos_detallado', contexto.dependencia), ESQUEMAS['plazos_detallado']
+    ),
+    normalizar=lambda df, contexto: limpiar_plazos_detallado(df),
+    agregar=lambda df, contexto: agregar_plazos_detallado(df, contexto.motor),
+    claves=['fiscal', 'etapa', 'estado'],
+    escribir=escribir_plazos_detallado,
+    refrescar=lambda contexto: refrescar_indicadores_plazos(contexto.registro),
+)
+
+
+def procesar_archivo_plazos_detallado(file, dependencia, periodo=None):
+    return PIPELINE_PLAZOS_DETALLADO.ejecutar(file, dependencia, periodo)
+
+# Tipo de caso de cada tripleta v{i}, a{i}, r{i} del export de Plazos
+TIPOS_CASO_PLAZOS = [
+    'Calificación','Investigación Preliminar(Fiscal)','Investigación Preliminar(P.N.P.)',
+    'Investigación Preparatoria','Conclusión de Investigación','Investigación Preliminar Pérdida Dominio'
+]
+
+
+def expandir_plazos(df):
+    # Pasa cada fila del export (una por fiscal, con seis tripletas dentro de plazo / por vencer /
+    # vencidos) a una fila por fiscal y tipo de caso, descartando las tripletas en cero.
+    # Las filas quedan en el orden del archivo: fiscal por fiscal y, dentro de cada uno, por tipo de caso.
+    # Los vacíos quedan como 'nan' también cuando el CSV se leyó con Arrow (que los escribiría '<NA>')
+    nombre_fiscal = df['ap_fiscal'].fillna('nan').astype(str) + ' ' + df['no_fiscal'].fillna('nan').astype(str)
+    tripletas = []
+    for i, tipo_caso in enumerate(TIPOS_CASO_PLAZOS, start=1):
+        columnas = [f'v{i}', f'a{i}', f'r{i}']
+        if not all(columna in df.columns for columna in columnas):
+            continue
+        tripleta = pd.DataFrame({
+            'nombre_fiscal': nombre_fiscal,
+            'tipo_caso': tipo_caso,
+            'dentro_plazo': df[columnas[0]],
+            'por_vencer': df[columnas[1]],
+            'vencidos': df[columnas[2]],
         })
+        tripletas.append(tripleta[(df[columnas] != 0).any(axis=1)])
+
+    if not tripletas:
+        return pd.DataFrame(columns=['nombre_fiscal', 'tipo_caso', 'dentro_plazo', 'por_vencer', 'vencidos'])
+    return pd.concat(tripletas).sort_index(kind='stable').reset_index(drop=True)
 
-        df['estado'] = (
-            df['estado']
-            .astype(str)
-            .str.upper()
-            .str.normalize('NFKD')
-            .str.encode('ascii', errors='ignore')
-            .str.decode('utf-8')
-            .str.strip()
-        )
-        df['condicion'] = df['condicion'].astype(str).str.strip().str.upper()
-        df['nombre_fiscal'] = df['nombre_fiscal'].astype(str).str.strip().str.upper()
-        df['materia_delito'] = df['materia_delito'].astype(str).str.strip().str.upper()
-
-        inicio_mes = datetime(anio, mes, 1)
-        mes_anterior = (inicio_mes - timedelta(days=1)).replace(day=1)
-
-        rangos = [
-            (inicio_mes.strftime('%B').upper(), inicio_mes.date(), (inicio_mes + pd.offsets.MonthEnd(0)).date()),
-            (mes_anterior.strftime('%B').upper(), mes_anterior.date(), (mes_anterior + pd.offsets.MonthEnd(0)).date())
-        ]
-
-        df['fecha_ingreso'] = pd.to_datetime(df['fecha_ingreso'], dayfirst=True, errors='coerce').dt.date
-        df['fecha_conclusion'] = pd.to_datetime(df['fecha_conclusion'], dayfirst=True, errors='coerce').dt.date
-        inicio_mes = datetime(anio, mes, 1).date()
-        ultimo_dia = monthrange(anio, mes)[1]
-        fin_mes = datetime(anio, mes, ultimo_dia).date()
-        dias_mes = [inicio_mes + timedelta(days=i) for i in range((fin_mes - inicio_mes).days + 1)]
-
-        fiscales = df['nombre_fiscal'].dropna().unique()
-
-        # Guardar conteo por materia delito para mes actual y anterior
-        for label, inicio, fin in rangos:
-            df_filtrado = df[(df['fecha_ingreso'] >= inicio) & (df['fecha_ingreso'] <= fin)]
-            conteo = df_filtrado['materia_delito'].value_counts()
-            for materia, cantidad in conteo.items():
-                MateriaDelito.objects.create(
-                    materia=materia,
-                    cantidad=cantidad,
-                    mes=label,
-                    dependencia=dependencia
-                )
 
-        # Filtrar registros solo del mes actual
-        df_mes_actual = df[(df['fecha_ingreso'] >= inicio_mes) & (df['fecha_ingreso'] <= fin_mes)].copy()
-
-        df_mes_actual['fecha_ingreso_valida'] = pd.to_datetime(df_mes_actual['fecha_ingreso'], errors='coerce')
-
-        errores_ingreso = df_mes_actual[
-            df_mes_actual['fecha_ingreso'].notna() & df_mes_actual['fecha_ingreso_valida'].isna()]
-
-        for _, row in errores_ingreso.iterrows():
-            print(f"Error en fecha_ingreso: '{row['fecha_ingreso']}' del fiscal {row['nombre_fiscal']}")
-
-        # Asegurar fechas correctas
-        df_mes_actual['fecha_ingreso'] = pd.to_datetime(df_mes_actual['fecha_ingreso'], errors='coerce')
-        df_mes_actual['fecha_conclusion'] = pd.to_datetime(df_mes_actual['fecha_conclusion'], errors='coerce')
-
-        # Limpieza de 'estado' y 'condicion'
-        df_mes_actual['estado'] = df_mes_actual['estado'].astype(str).str.strip().str.upper()
-        df_mes_actual['condicion'] = df_mes_actual['condicion'].astype(str).str.strip().str.upper()
-
-        # Reemplazar NaT por None para evitar problemas
-        df_mes_actual['fecha_ingreso'] = df_mes_actual['fecha_ingreso'].where(df_mes_actual['fecha_ingreso'].notna(), None)
-        df_mes_actual['fecha_conclusion'] = df_mes_actual['fecha_conclusion'].where(df_mes_actual['fecha_conclusion'].notna(), None)
-
-        # Columnas auxiliares para conteos binarios
-        df_mes_actual['resuelto_bin'] = (df_mes_actual['condicion'] == 'RESUELTO').astype(int)
-        df_mes_actual['tramite_bin'] = (df_mes_actual['condicion'] == 'EN TRAMITE').astype(int)
-
-        # Agrupar y calcular agregados por fiscal
-        conteo_fiscales = df_mes_actual.groupby('nombre_fiscal').agg(
-            total_tramite=('estado', 'count'),
-            resuelto_mes=('resuelto_bin', 'sum'),
-            tramite_mes=('tramite_bin', 'sum'),
-            fecha_ingreso=('fecha_ingreso', 'min'),
-            fecha_conclusion=('fecha_conclusion', 'max'),
-        ).reset_index()
-
-        nombre_mes = inicio_mes.strftime('%B').upper()
-
-        for _, row in conteo_fiscales.iterrows():
-            # fecha_ingreso = row['fecha_ingreso']
-            # fecha_conclusion = row['fecha_conclusion']
-
-            TramitesMensual.objects.update_or_create(
-                dependencia=dependencia,
-                nombre_fiscal=row['nombre_fiscal'],
-                mes=nombre_mes,
-                defaults={
-                    # 'fecha_ingreso': fecha_ingreso if pd.notnull(fecha_ingreso) else None,
-                    # 'fecha_conclusion': fecha_conclusion if pd.notnull(fecha_conclusion) else None,
-                    'total_tramite': row['total_tramite'],
-                    'tramite_mes': row['tramite_mes'],
-                    'resuelto_mes': row['resuelto_mes'],
-                }
+def escribir_plazos(resultados, contexto):
+    with EscritorMasivo(Plazos) as escritor:
+        for plazos in resultados:
+            escritor.agregar_todos(
+                Plazos(dependencia=contexto.dependencia, ingesta=contexto.registro, **fila)
+                for fila in plazos.to_dict('records')
             )
 
-        # Crear registros diarios
-        for fiscal in fiscales:
-            registros_fiscal = df[df['nombre_fiscal'] == fiscal]
-            for dia in dias_mes:
-                casos_resueltos = registros_fiscal[
-                    (registros_fiscal['condicion'] == 'RESUELTO') &
-                    (registros_fiscal['fecha_conclusion'] == dia)
-                    ].shape[0]
-
-                casos_ingresados = registros_fiscal[
-                    registros_fiscal['fecha_ingreso'] == dia
-                    ].shape[0]
-
-                casos_en_tramite = registros_fiscal[
-                    (registros_fiscal['condicion'] == 'EN TRAMITE') &
-                    (registros_fiscal['fecha_ingreso'] == dia)
-                    ].shape[0]
-
-                archivos_preliminar = registros_fiscal[
-                    (registros_fiscal['estado'] == 'CON ARCHIVO (PRELIMINAR)') &
-                    (registros_fiscal['fecha_conclusion'] == dia)
-                    ].shape[0]
-
-                archivo_califica = registros_fiscal[
-                    (registros_fiscal['estado'] == 'CON ARCHIVO (CALIFICA)') &
-                    (registros_fiscal['fecha_conclusion'] == dia)
-                    ].shape[0]
-
-                archivos_consentidos = registros_fiscal[
-                    (registros_fiscal['estado'] == 'ARCHIVO CONSENTIDO') &
-                    (registros_fiscal['fecha_conclusion'] == dia)
-                    ].shape[0]
-
-                sentencias = registros_fiscal[
-                    (registros_fiscal['estado'] == 'CON SENTENCIA') &
-                    (registros_fiscal['fecha_conclusion'] == dia)
-                    ].shape[0]
-                fecha_dia = dia if pd.notnull(dia) else None
-
-                if any([
-                    casos_resueltos, casos_ingresados, casos_en_tramite,
-                    archivos_preliminar, archivo_califica, archivos_consentidos, sentencias
-                ]):
-                    Carga.objects.create(
-                        nombre_fiscal=fiscal,
-                        casos_resueltos=casos_resueltos,
-                        casos_ingresados=casos_ingresados,
-                        casos_en_tramite=casos_en_tramite,
-                        dependencia=dependencia,
-                        fecha=fecha_dia,
-                        sentencias=sentencias,
-                        archivos_consentidos=archivos_consentidos,
-                        archivo_califica=archivo_califica,
-                        archivo_preliminar=archivos_preliminar
-                    )
-
-        return {'mensaje': 'Carga laboral del mes procesada correctamente.'}, status.HTTP_201_CREATED
-
-
-    except Exception as e:
-
-
-        print("Error general:", e)
-
-        print(traceback.format_exc())
-
-        return {'error': str(e)}, status.HTTP_400_BAD_REQUEST
-
-
-@transaction.atomic
-def procesar_carga_total(file, dependencia):
-
-    try:
-        file.seek(0)
-        raw_data = file.read()
-        detected = chardet.detect(raw_data)
-        encoding_detected = detected['encoding'] or 'latin1'
-
-        try:
-            decoded_data = raw_data.decode(encoding_detected, errors='replace')
-            df = pd.read_csv(io.StringIO(decoded_data), sep=',', on_bad_lines='skip')
-        except Exception as e:
-            return {'error': f'Error al leer CSV: {str(e)}'}, status.HTTP_400_BAD_REQUEST
-
-        df.columns = df.columns.str.strip()
-
-        for _, row in df.iterrows():
-            asignados = row.get('asig', 0)
-            total_tramite = (
-                    row.get('pend', 0) + row.get('calif', 0) + row.get('preli', 0) +
-                    row.get('pnp', 0) + row.get('prepa', 0) + row.get('inter', 0) +
-                    row.get('juzga', 0)
+
+# Cada bloque del export se expande y se escribe antes de leer el siguiente
+PIPELINE_PLAZOS = Pipeline(
+    'plazos',
+    leer=lambda contexto: leer_tabla(contexto.file, 'latin1', ('plazos', contexto.dependencia), ESQUEMAS['plazos']),
+    agregar=lambda df, contexto: expandir_plazos(df),
+    escribir=escribir_plazos,
+    refrescar=lambda contexto: refrescar_indicadores_plazos(contexto.registro),
+)
+
+
+def procesar_archivo_plazos(file, dependencia, periodo=None):
+    return PIPELINE_PLAZOS.ejecutar(file, dependencia, periodo)
+
+
+# Contadores diarios de Carga: (campo, columna de fecha, columna de filtro, valor esperado)
+CONTADORES_CARGA = [
+    ('casos_resueltos', 'fecha_conclusion', 'condicion', 'RESUELTO'),
+    ('casos_ingresados', 'fecha_ingreso', None, None),
+    ('casos_en_tramite', 'fecha_ingreso', 'condicion', 'EN TRAMITE'),
+    ('archivo_preliminar', 'fecha_conclusion', 'estado', 'CON ARCHIVO (PRELIMINAR)'),
+    ('archivo_califica', 'fecha_conclusion', 'estado', 'CON ARCHIVO (CALIFICA)'),
+    ('archivos_consentidos', 'fecha_conclusion', 'estado', 'ARCHIVO CONSENTIDO'),
+    ('sentencias', 'fecha_conclusion', 'estado', 'CON SENTENCIA'),
+]
+
+
+def agregar_carga_diaria(df, inicio, fin, motor=PANDAS):
+    # Cada caso aporta a lo sumo un evento por fecha de ingreso y otro por fecha de conclusion;
+    # se marcan los contadores de cada evento y se suman en un solo groupby (fiscal, fecha).
+    # Las fechas llegan como datetime64 sin hora; solo las del resultado pasan a date.
+    campos = [campo for campo, _, _, _ in CONTADORES_CARGA]
+    inicio, fin = pd.Timestamp(inicio), pd.Timestamp(fin)
+    eventos = []
+    for columna_fecha in ('fecha_ingreso', 'fecha_conclusion'):
+        fechas = df[columna_fecha]
+        en_rango = (fechas >= inicio) & (fechas <= fin)
+        bloque = pd.DataFrame({'nombre_fiscal': df['nombre_fiscal'], 'fecha': fechas})
+        contadores = [c for c in CONTADORES_CARGA if c[1] == columna_fecha]
+        for campo, _, filtro, valor in contadores:
+            marca = en_rango if filtro is None else en_rango & (df[filtro] == valor)
+            bloque[campo] = marca.astype(int)
+        eventos.append(bloque[bloque[[c[0] for c in contadores]].any(axis=1)])
+
+    eventos = pd.concat(eventos, ignore_index=True)
+    eventos[campos] = eventos[campos].fillna(0).astype(int)
+
+    carga = motor.sumar(eventos[['nombre_fiscal', 'fecha'] + campos], ['nombre_fiscal', 'fecha'])
+    carga['fecha'] = carga['fecha'].dt.date
+    return carga
+
+
+def rangos_carga_laboral(periodo):
+    # [(primer día, último día)] de los meses de Carga y TramitesMensual que cubre el periodo de la
+    # ingesta (un mes, o AAAA-MM:AAAA-MM al cargar varios meses del mismo export) y de los meses de
+    # MateriaDelito, que suman el mes anterior al primero
+    meses = meses_periodo(periodo)
+    if not meses:
+        raise ValueError(f'Periodo inválido: {periodo}')
+    maximo = getattr(settings, 'INGESTA_MAX_MESES_RANGO', 24)
+    if len(meses) > maximo:
+        raise ValueError(f'El periodo {periodo} abarca más de {maximo} meses')
+    meses = [rango_periodo(formatear_periodo(mes, anio)) for anio, mes in meses]
+    anterior = meses[0][0] - timedelta(days=1)
+    return meses, [rango_periodo(formatear_periodo(anterior.month, anterior.year))] + meses
+
+
+def primer_dia_mes(fechas):
+    # datetime64 del primer día del mes de cada fecha (NaT se mantiene)
+    return pd.Series(fechas.values.astype('datetime64[M]').astype('datetime64[ns]'), index=fechas.index)
+
+
+def leer_carga_laboral(contexto):
+    return [leer_excel(contexto.file, ESQUEMAS['carga_laboral'], engine='xlrd')]
+
+
+def normalizar_carga_laboral(df, contexto):
+    df = df.rename(columns={
+        'no_fiscal': 'nombre_fiscal',
+        'fe_ing_caso': 'fecha_ingreso',
+        'fe_conclusion': 'fecha_conclusion',
+        'de_estado': 'estado',
+        'condicion': 'condicion',
+        'de_mat_deli': 'materia_delito'
+    })
+
+    df['estado'] = normalizar_categorias(df['estado'], lambda valores: (
+        valores
+        .str.upper()
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('utf-8')
+        .str.strip()
+    ))
+    for columna in ('condicion', 'nombre_fiscal', 'materia_delito'):
+        df[columna] = normalizar_categorias(df[columna], lambda valores: valores.str.strip().str.upper())
+
+    # El esquema ya las leyó como datetime64 (NaT si no son fecha); solo se descarta la hora
+    for columna in ('fecha_ingreso', 'fecha_conclusion'):
+        df[columna] = df[columna].dt.normalize()
+    return df
+
+
+def agregar_carga_laboral(df, contexto):
+    # Un export da tres resultados para todos los meses del periodo en una pasada: conteo por
+    # materia delito de cada mes (y del anterior al primero), trámites por fiscal y mes, y
+    # contadores diarios de Carga. Los meses salen de agrupar por el primer día del mes de
+    # ingreso; los rangos se filtran comparando datetime64 contra Timestamp, sin copiar el export.
+    meses, meses_materia = rangos_carga_laboral(contexto.periodo)
+    fecha_ingreso = df['fecha_ingreso']
+    periodo = primer_dia_mes(fecha_ingreso)
+
+    en_rango = fecha_ingreso.between(pd.Timestamp(meses_materia[0][0]), pd.Timestamp(meses_materia[-1][1]))
+    materias = pd.DataFrame({
+        'periodo': periodo[en_rango],
+        'materia': df['materia_delito'][en_rango],
+    })
+    materias = contexto.motor.contar(materias, ['periodo', 'materia'])
+    materias['periodo'] = materias['periodo'].dt.date
+
+    # Trámites del mes por fiscal: casos con estado, resueltos y en trámite
+    en_rango = fecha_ingreso.between(pd.Timestamp(meses[0][0]), pd.Timestamp(meses[-1][1]))
+    condicion = df['condicion'][en_rango]
+    conteo_fiscales = pd.DataFrame({
+        'periodo': periodo[en_rango],
+        'nombre_fiscal': df['nombre_fiscal'][en_rango],
+        'total_tramite': df['estado'][en_rango].notna(),
+        'resuelto_mes': condicion == 'RESUELTO',
+        'tramite_mes': condicion == 'EN TRAMITE',
+    })
+    conteo_fiscales = contexto.motor.sumar(conteo_fiscales, ['periodo', 'nombre_fiscal'])
+    conteo_fiscales['periodo'] = conteo_fiscales['periodo'].dt.date
+
+    return {
+        'materias': materias,
+        'tramites': conteo_fiscales,
+        'carga': agregar_carga_diaria(df, meses[0][0], meses[-1][1], contexto.motor),
+    }
+
+
+def escribir_carga_laboral(resultados, contexto):
+    dependencia = contexto.dependencia
+    meses, meses_materia = rangos_carga_laboral(contexto.periodo)
+    reemplazar = contexto.opciones.get('reemplazar')
+    if reemplazar is None:
+        reemplazar = getattr(settings, 'INGESTA_REEMPLAZAR_PERIODO', True)
+
+    if reemplazar:
+        # Todo lo del periodo para la dependencia, venga de esta ingesta, de otra o de antes del
+        # registro de ingestas. Son DELETE por rango sobre los índices (dependencia, fecha/periodo).
+        Carga.objects.filter(dependencia=dependencia, fecha__range=(meses[0][0], meses[-1][1])).delete()
+        MateriaDelito.objects.filter(dependencia=dependencia, periodo__in=[inicio for inicio, _ in meses_materia]).delete()
+        TramitesMensual.objects.filter(dependencia=dependencia, periodo__in=[inicio for inicio, _ in meses]).delete()
+    asegurar_particiones_carga([(inicio.year, inicio.month) for inicio, _ in meses])
+
+    # Un escritor por tabla para todos los meses del periodo
+    for resultado in resultados:
+        with EscritorMasivo(MateriaDelito) as escritor:
+            escritor.agregar_todos(
+                MateriaDelito(dependencia=dependencia, ingesta=contexto.registro, **fila)
+                for fila in resultado['materias'].to_dict('records')
             )
-            tramite_historico = asignados - total_tramite
-
-            nombre_fiscal = f"{row.get('apell', '').strip()} {row.get('nomb', '').strip()}"
-
-            CargaTotal.objects.create(
-                nombre_fiscal=nombre_fiscal,
-                total_tramite=total_tramite,
-                tramite_historico=tramite_historico,
-                asignados=asignados,
-                pendientes=row.get('pend', 0),
-                calificados=row.get('calif', 0),
-                dependencia=dependencia,
-                preliminares=row.get('preli', 0),
-                investigacion_pnp=row.get('pnp', 0),
-                investigacion_preparatoria=row.get('prepa', 0),
-                etapa_intermedia=row.get('inter', 0),
-                etapa_juzgamiento=row.get('juzga', 0),
+
+        # Sin reemplazo se actualizan los fiscales del export y se conservan los demás
+        campos_unicos = None if reemplazar else ['dependencia', 'nombre_fiscal', 'periodo']
+        with EscritorMasivo(TramitesMensual, campos_unicos=campos_unicos) as escritor:
+            escritor.agregar_todos(
+                TramitesMensual(dependencia=dependencia, ingesta=contexto.registro, **fila)
+                for fila in resultado['tramites'].to_dict('records')
+            )
+
+        # Crear registros diarios. Sin reemplazo los días de fiscal que ya están (carga_fiscal_dia_unico)
+        # toman los contadores del export y pasan a esta ingesta
+        escritor_carga = EscritorMasivo(Carga) if reemplazar else EscritorMasivo(
+            Carga,
+            campos_unicos=['dependencia', 'nombre_fiscal', 'fecha'],
+            campos_actualizar=[campo for campo, _, _, _ in CONTADORES_CARGA] + ['ingesta', 'fecha_modificacion'],
+        )
+        with escritor_carga as escritor:
+            escritor.agregar_todos(
+                Carga(dependencia=dependencia, ingesta=contexto.registro, **fila)
+                for fila in resultado['carga'].to_dict('records')
+            )
+
+
+def refrescar_carga_laboral(contexto):
+    meses, meses_materia = rangos_carga_laboral(contexto.periodo)
+    refrescar_indicadores_carga(contexto.dependencia, [formatear_periodo(inicio.month, inicio.year) for inicio, _ in meses])
+    refrescar_indicadores_materias(contexto.registro, [inicio for inicio, _ in meses_materia])
+
+
+PIPELINE_CARGA_LABORAL = Pipeline(
+    'carga_laboral',
+    leer=leer_carga_laboral,
+    normalizar=normalizar_carga_laboral,
+    agregar=agregar_carga_laboral,
+    escribir=escribir_carga_laboral,
+    refrescar=refrescar_carga_laboral,
+    mensaje='Carga laboral del mes procesada correctamente.',
+)
+
+
+def procesar_carga_laboral(file, dependencia, mes, anio, reemplazar=None, hasta=None):
+    # Con `hasta` (AAAA-MM) se cargan de una vez todos los meses desde mes/anio hasta ese inclusive
+    return PIPELINE_CARGA_LABORAL.ejecutar(
+        file, dependencia, formatear_rango(mes, anio, hasta), reemplazar=reemplazar
+    )
+
+
+# Columnas de conteos del export ResumenCarga y el campo de CargaTotal de cada una.
+# total_tramite suma todo menos lo asignado; tramite_historico es lo asignado que ya no está en trámite.
+CAMPOS_CARGA_TOTAL = {
+    'asig': 'asignados',
+    'pend': 'pendientes',
+    'calif': 'calificados',
+    'preli': 'preliminares',
+    'pnp': 'investigacion_pnp',
+    'prepa': 'investigacion_preparatoria',
+    'inter': 'etapa_intermedia',
+    'juzga': 'etapa_juzgamiento',
+}
+
+
+def resumir_carga_total(df):
+    # Una fila de CargaTotal por fiscal del export, con columnas enteras: los conteos vacíos,
+    # no numéricos o de columnas que faltan cuentan como 0
+    conteos = pd.DataFrame({
+        campo: pd.to_numeric(df[columna], errors='coerce') if columna in df.columns else 0
+        for columna, campo in CAMPOS_CARGA_TOTAL.items()
+    }, index=df.index).fillna(0).astype('int64')
+    conteos['total_tramite'] = conteos[[campo for columna, campo in CAMPOS_CARGA_TOTAL.items() if columna != 'asig']].sum(axis=1)
+    conteos['tramite_historico'] = conteos['asignados'] - conteos['total_tramite']
+
+    def texto(columna):
+        return df[columna].fillna('').astype(str).str.strip() if columna in df.columns else ''
+
+    conteos.insert(0, 'nombre_fiscal', texto('apell') + ' ' + texto('nomb'))
+    return conteos.reset_index(drop=True)
+
+
+def escribir_carga_total(resultados, contexto):
+    with EscritorMasivo(CargaTotal) as escritor:
+        for carga_total in resultados:
+            escritor.agregar_todos(
+                CargaTotal(dependencia=contexto.dependencia, ingesta=contexto.registro, **fila)
+                for fila in carga_total.to_dict('records')
             )
 
-        return {'mensaje': 'Carga total registrada correctamente.'}, status.HTTP_201_CREATED
-
-    except Exception as e:
-        return {'error': str(e)}, status.HTTP_400_BAD_REQUEST
-
-@transaction.atomic
-def procesar_carga_siatf(file, dependencia):
-    try:
-        file.seek(0)
-        raw_data = file.read()
-        detected = chardet.detect(raw_data)
-        encoding_detected = detected['encoding'] or 'latin1'
-        
-        try:
-            df = pd.read_excel(io.BytesIO(raw_data), engine='openpyxl')
-        except Exception as e:
-            return {'error': f'Error al leer Excel: {str(e)}'}, status.HTTP_400_BAD_REQUEST
-        
-        df = df.rename(columns={
-            'de_esp': 'Especialidad',
-            'de_estado': 'Estado'
-        })
 
-        df.columns = df.columns.str.strip()
-        
-        # Limpiar datos
-        df['Especialidad'] = df['Especialidad'].astype(str).str.strip()
-        df['Estado'] = df['Estado'].astype(str).str.strip()
-        
-        # Contar casos por especialidad y estado
-        conteo_casos = df.groupby(['Especialidad', 'Estado']).size().reset_index(name='cantidad')
-
-        for _, row in conteo_casos.iterrows():
-            CargaSiatf.objects.update_or_create(
-                dependencia=dependencia,
-                especialidad=row['Especialidad'],
-                estado=row['Estado'],
-                defaults={'cantidad': row['cantidad'],
-                         'casos_ingresados': row['cantidad']}
+PIPELINE_CARGA_TOTAL = Pipeline(
+    'carga_total',
+    leer=lambda contexto: leer_tabla(
+        contexto.file, 'latin1', ('carga_total', contexto.dependencia), ESQUEMAS['carga_total']
+    ),
+    agregar=lambda df, contexto: resumir_carga_total(df),
+    escribir=escribir_carga_total,
+    mensaje='Carga total registrada correctamente.',
+)
+
+
+def procesar_carga_total(file, dependencia, periodo=None):
+    return PIPELINE_CARGA_TOTAL.ejecutar(file, dependencia, periodo)
+
+
+def limpiar_carga_siatf(df):
+    df = df.rename(columns={
+        'de_esp': 'Especialidad',
+        'de_estado': 'Estado'
+    })
+
+    df.columns = df.columns.str.strip()
+
+    # Limpiar datos
+    df['Especialidad'] = normalizar_categorias(df['Especialidad'], lambda valores: valores.str.strip())
+    df['Estado'] = normalizar_categorias(df['Estado'], lambda valores: valores.str.strip())
+    return df
+
+
+def contar_carga_siatf(df, motor=PANDAS):
+    return motor.contar(df, ['Especialidad', 'Estado'])
+
+
+def leer_carga_siatf(contexto):
+    if contexto.file.name.lower().endswith('.csv'):
+        return leer_tabla(contexto.file, 'latin1', ('carga_siatf', contexto.dependencia), ESQUEMAS['carga_siatf'])
+    # El xlsx es binario: no hay codificación que detectar
+    return [leer_excel(contexto.file, ESQUEMAS['carga_siatf'], engine='openpyxl')]
+
+
+def escribir_carga_siatf(resultados, contexto):
+    with EscritorMasivo(CargaSiatf, campos_unicos=['dependencia', 'especialidad', 'estado']) as escritor:
+        for conteo_casos in resultados:
+            escritor.agregar_todos(
+                CargaSiatf(
+                    dependencia=contexto.dependencia,
+                    especialidad=fila['Especialidad'],
+                    estado=fila['Estado'],
+                    cantidad=fila['cantidad'],
+                    casos_ingresados=fila['cantidad'],
+                    ingesta=contexto.registro,
+                )
+                for fila in conteo_casos.to_dict('records')
             )
 
-        return {'mensaje': 'Carga SIATF registrada correctamente.'}, status.HTTP_201_CREATED
-    except Exception as e:
-        return {'error': str(e)}, status.HTTP_400_BAD_REQUEST
 
+# Contar casos por especialidad y estado en cada bloque y acumular los conteos
+PIPELINE_CARGA_SIATF = Pipeline(
+    'carga_siatf',
+    leer=leer_carga_siatf,
+    normalizar=lambda df, contexto: limpiar_carga_siatf(df),
+    agregar=lambda df, contexto: contar_carga_siatf(df, contexto.motor),
+    claves=['Especialidad', 'Estado'],
+    escribir=escribir_carga_siatf,
+    mensaje='Carga SIATF registrada correctamente.',
+)
+
+
+def procesar_carga_siatf(file, dependencia, periodo=None):
+    return PIPELINE_CARGA_SIATF.ejecutar(file, dependencia, periodo)
 
 
+# Pipelines por tipo de RegistroIngesta
+PIPELINES = {
+    pipeline.tipo: pipeline
+    for pipeline in (
+        PIPELINE_PLAZOS_DETALLADO, PIPELINE_PLAZOS, PIPELINE_CARGA_LABORAL, PIPELINE_CARGA_TOTAL, PIPELINE_CARGA_SIATF,
+    )
+}
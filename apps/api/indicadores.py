@@ -0,0 +1,87 @@
+from calendar import monthrange
+from datetime import date
+
+from django.db.models import Sum
+
+from apps.modelos.models import (
+    Carga, IndicadorCarga, IndicadorMateriaDelito, IndicadorPlazos, MateriaDelito, Plazos, PlazosDetalle,
+)
+from .ingestas import formatear_periodo
+from .persistencia import EscritorMasivo
+
+# Los indicadores se recalculan al final de cada ingesta y solo para lo que esa ingesta tocó
+# (una dependencia y uno o dos meses), así que el costo no crece con el historial.
+# Cada refresco reemplaza las filas de su clave: un fiscal que desaparece del export deja de figurar.
+
+CAMPOS_CARGA = [
+    'casos_ingresados', 'casos_resueltos', 'casos_en_tramite', 'sentencias',
+    'archivos_consentidos', 'archivo_califica', 'archivo_preliminar',
+]
+
+MODELOS_PLAZOS = {
+    'plazos': Plazos,
+    'plazos_detallado': PlazosDetalle,
+}
+
+
+def rango_periodo(periodo):
+    anio, mes = (int(parte) for parte in periodo.split('-'))
+    return date(anio, mes, 1), date(anio, mes, monthrange(anio, mes)[1])
+
+
+def refrescar_indicadores_carga(dependencia, periodos):
+    for periodo in periodos:
+        inicio, fin = rango_periodo(periodo)
+        totales = (
+            Carga.objects.filter(dependencia=dependencia, fecha__range=(inicio, fin))
+            .values('nombre_fiscal')
+            .annotate(**{campo: Sum(campo) for campo in CAMPOS_CARGA})
+            .order_by('nombre_fiscal')
+        )
+        IndicadorCarga.objects.filter(dependencia=dependencia, periodo=periodo).delete()
+        with EscritorMasivo(IndicadorCarga) as escritor:
+            escritor.agregar_todos(
+                IndicadorCarga(dependencia=dependencia, periodo=periodo, **fila) for fila in totales
+            )
+
+
+def refrescar_indicadores_plazos(registro):
+    totales = (
+        MODELOS_PLAZOS[registro.tipo].objects.filter(ingesta=registro)
+        .values('nombre_fiscal')
+        .annotate(dentro_plazo=Sum('dentro_plazo'), por_vencer=Sum('por_vencer'), vencidos=Sum('vencidos'))
+        .order_by('nombre_fiscal')
+    )
+    IndicadorPlazos.objects.filter(
+        fuente=registro.tipo, dependencia=registro.dependencia, periodo=registro.periodo
+    ).delete()
+    with EscritorMasivo(IndicadorPlazos) as escritor:
+        for fila in totales:
+            total = fila['dentro_plazo'] + fila['por_vencer'] + fila['vencidos']
+            escritor.agregar(IndicadorPlazos(
+                dependencia=registro.dependencia,
+                periodo=registro.periodo,
+                fuente=registro.tipo,
+                total=total,
+                cumplimiento=fila['dentro_plazo'] / total if total else 0,
+                **fila
+            ))
+
+
+def refrescar_indicadores_materias(registro, meses):
+    # meses: primer día de cada mes a recalcular. El export de carga laboral cubre el mes
+    # procesado y el anterior; cada mes queda con el ranking del último export que lo incluyó.
+    for inicio in meses:
+        periodo = formatear_periodo(inicio.month, inicio.year)
+        conteo = (
+            MateriaDelito.objects.filter(ingesta=registro, periodo=inicio)
+            .values('materia')
+            .annotate(cantidad=Sum('cantidad'))
+            .order_by('-cantidad', 'materia')
+        )
+        IndicadorMateriaDelito.objects.filter(dependencia=registro.dependencia, periodo=periodo).delete()
+        with EscritorMasivo(IndicadorMateriaDelito) as escritor:
+            escritor.agregar_todos(
+                IndicadorMateriaDelito(dependencia=registro.dependencia, periodo=periodo, posicion=posicion, **fila)
+                for posicion, fila in enumerate(conteo, start=1)
+            )
@@ -0,0 +1,98 @@
+import hashlib
+import os
+
+from django.utils import timezone
+
+from apps.modelos.models import (
+    Carga, CargaSiatf, CargaTotal, MateriaDelito, Plazos, PlazosDetalle, RegistroIngesta, TramitesMensual,
+)
+
+# Modelos cuyas filas guardan la ingesta que las generó
+MODELOS_CON_INGESTA = [Carga, CargaSiatf, CargaTotal, MateriaDelito, Plazos, PlazosDetalle, TramitesMensual]
+
+MENSAJE_YA_PROCESADO = 'El archivo ya fue procesado; no se registraron cambios.'
+
+PATRON_PERIODO = r'^\d{4}-(0[1-9]|1[0-2])$'
+
+
+def calcular_hash(file, tamano_bloque=1024 * 1024):
+    file.seek(0)
+    sha = hashlib.sha256()
+    for bloque in iter(lambda: file.read(tamano_bloque), b''):
+        sha.update(bloque)
+    file.seek(0)
+    return sha.hexdigest()
+
+
+def formatear_periodo(mes, anio):
+    return f'{int(anio):04d}-{int(mes):02d}'
+
+
+def formatear_rango(mes, anio, hasta=None):
+    # Periodo de una ingesta que cubre varios meses del mismo export: 'AAAA-MM:AAAA-MM'
+    desde = formatear_periodo(mes, anio)
+    return f'{desde}:{hasta}' if hasta and hasta != desde else desde
+
+
+def leer_periodo(periodo):
+    anio, mes = (int(parte) for parte in periodo.split('-'))
+    return anio, mes
+
+
+def mes_siguiente(anio, mes):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def meses_entre(desde, hasta):
+    actual = desde
+    while actual <= hasta:
+        yield actual
+        actual = mes_siguiente(*actual)
+
+
+def contar_meses(desde, hasta):
+    # Meses de desde a hasta (AAAA-MM) inclusive; 0 o negativo si hasta es anterior
+    (anio_desde, mes_desde), (anio_hasta, mes_hasta) = leer_periodo(desde), leer_periodo(hasta)
+    return (anio_hasta - anio_desde) * 12 + mes_hasta - mes_desde + 1
+
+
+def meses_periodo(periodo):
+    # [(anio, mes)] que cubre el periodo de una ingesta, sea un mes o un rango
+    desde, _, hasta = periodo.partition(':')
+    return list(meses_entre(leer_periodo(desde), leer_periodo(hasta or desde)))
+
+
+def resolver_periodo(periodo=None):
+    # Los archivos sin periodo propio se registran en el mes en curso
+    return periodo or timezone.localdate().strftime('%Y-%m')
+
+
+def nombre_archivo(file):
+    return os.path.basename(getattr(file, 'name', '') or '')
+
+
+def preparar_ingesta(file, tipo, dependencia, periodo=None):
+    # Debe llamarse dentro de la transacción del procesador. Devuelve (registro, ya_procesado):
+    # si el mismo contenido ya se ingirió para (tipo, dependencia, periodo) no hay nada que hacer;
+    # si el contenido cambió, se eliminan las filas que generó la versión anterior del archivo.
+    periodo = resolver_periodo(periodo)
+    hash_contenido = calcular_hash(file)
+    archivo = nombre_archivo(file)
+
+    registro, creado = RegistroIngesta.objects.select_for_update().get_or_create(
+        tipo=tipo,
+        dependencia=dependencia,
+        periodo=periodo,
+        defaults={'hash_contenido': hash_contenido, 'archivo': archivo},
+    )
+    if creado:
+        return registro, False
+    if registro.hash_contenido == hash_contenido:
+        return registro, True
+
+    for modelo in MODELOS_CON_INGESTA:
+        modelo.objects.filter(ingesta=registro).delete()
+    registro.hash_contenido = hash_contenido
+    registro.archivo = archivo
+    registro.save(update_fields=['hash_contenido', 'archivo', 'fecha_modificacion'])
+    return registro, False
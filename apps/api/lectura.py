@@ -0,0 +1,206 @@
+import codecs
+import importlib.util
+import logging
+import time
+
+import chardet
+import pandas as pd
+from django.conf import settings
+
+from .esquemas import tipos_lectura
+from .mediciones import etapa
+from .motores import PANDAS
+
+logger = logging.getLogger(__name__)
+
+# Última codificación detectada por chardet para cada fuente (tipo de archivo, dependencia).
+# Los exports de una misma dependencia salen siempre del mismo sistema, así que no hace
+# falta volver a analizarlos mientras el proceso siga vivo.
+CODIFICACIONES = {}
+
+# chardet es lento (del orden de segundos por MB), así que solo analiza el inicio de la muestra
+MUESTRA_CHARDET = 64 * 1024
+
+# Los exports vienen de sistemas en castellano. chardet puede dar por más probable una
+# codificación asiática (Johab) para textos latin1 con eñes y tildes, así que de sus
+# candidatas solo se toma la primera de estas.
+CODIFICACIONES_ACEPTADAS = {'iso8859-1', 'iso8859-15', 'cp1252', 'cp850', 'mac-roman', 'utf-8', 'utf-16'}
+
+# Veces y segundos acumulados por cada forma de resolver la codificación
+TIEMPOS_CODIFICACION = {
+    metodo: {'veces': 0, 'segundos': 0.0}
+    for metodo in ('utf-8', 'cache', 'chardet', 'predeterminada')
+}
+
+
+def _es_utf8(muestra):
+    # El decodificador incremental acepta un carácter multibyte cortado al final de la muestra
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(muestra, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _detectar_con_chardet(muestra):
+    for candidata in chardet.detect_all(muestra):
+        encoding = candidata['encoding']
+        if encoding and codecs.lookup(encoding).name in CODIFICACIONES_ACEPTADAS:
+            return encoding
+    # La muestra no es UTF-8, así que no sirve el valor por defecto de la fuente si lo es
+    return 'latin1'
+
+
+def detectar_codificacion(file, predeterminada='latin1', fuente=None):
+    # Solo se analiza una muestra acotada del inicio del archivo. Primero se valida UTF-8,
+    # que es barato; si no lo es se usa lo recordado para la fuente y, en último caso, chardet.
+    # Si la muestra es ASCII puro no dice nada del resto y se usa lo recordado o el valor por defecto.
+    with etapa('decodificacion'):
+        return _detectar_codificacion(file, predeterminada, fuente)
+
+
+def _detectar_codificacion(file, predeterminada, fuente):
+    inicio = time.perf_counter()
+    file.seek(0)
+    muestra = file.read(getattr(settings, 'INGESTA_MUESTRA_CODIFICACION', 1024 * 1024))
+    file.seek(0)
+
+    if muestra.isascii():
+        encoding = CODIFICACIONES.get(fuente)
+        metodo = 'cache' if encoding else 'predeterminada'
+        encoding = encoding or predeterminada
+    elif _es_utf8(muestra):
+        encoding, metodo = 'utf-8', 'utf-8'
+    elif CODIFICACIONES.get(fuente, 'utf-8') != 'utf-8':
+        encoding, metodo = CODIFICACIONES[fuente], 'cache'
+    else:
+        encoding, metodo = _detectar_con_chardet(muestra[:MUESTRA_CHARDET]), 'chardet'
+
+    if fuente is not None and metodo in ('utf-8', 'chardet'):
+        CODIFICACIONES[fuente] = encoding
+
+    tiempos = TIEMPOS_CODIFICACION[metodo]
+    tiempos['veces'] += 1
+    tiempos['segundos'] += time.perf_counter() - inicio
+    return encoding
+
+
+def flujo_binario(file):
+    # Los archivos subidos llegan envueltos en un UploadedFile de Django, que pandas toma por texto:
+    # ignora `encoding` y, con encoding_errors='replace', los acentos latin1 se guardan como '�'.
+    # Se le pasa el flujo binario que hay debajo (BytesIO o archivo temporal).
+    return getattr(file, 'file', file)
+
+
+def leer_csv_por_bloques(file, encoding, chunksize=None, **kwargs):
+    # pandas decodifica el archivo binario por partes: nunca hay una copia completa
+    # del contenido en memoria, solo el bloque de filas que se está procesando
+    file = flujo_binario(file)
+    file.seek(0)
+    return pd.read_csv(
+        file,
+        sep=',',
+        on_bad_lines='skip',
+        encoding=encoding,
+        encoding_errors='replace',
+        chunksize=chunksize or getattr(settings, 'INGESTA_CHUNKSIZE', 100_000),
+        **kwargs
+    )
+
+
+def leer_csv_arrow(file, encoding, columnas=None, dtype=None):
+    # Con INGESTA_MOTOR_CSV = 'pyarrow' el parser de Arrow lee los bytes del archivo en varios
+    # hilos y el texto queda como cadenas de Arrow en lugar de objetos Python. No lee por bloques:
+    # el archivo entero es un único bloque, que en Arrow ocupa bastante menos memoria.
+    file = flujo_binario(file)
+    file.seek(0)
+    return pd.read_csv(
+        file,
+        sep=',',
+        engine='pyarrow',
+        dtype_backend='pyarrow',
+        on_bad_lines='skip',
+        encoding=encoding,
+        usecols=columnas,
+        dtype=dtype,
+    )
+
+
+def motor_csv():
+    motor = getattr(settings, 'INGESTA_MOTOR_CSV', 'c')
+    if motor == 'pyarrow' and importlib.util.find_spec('pyarrow') is None:
+        logger.warning("INGESTA_MOTOR_CSV = 'pyarrow' pero pyarrow no está instalado; se usa el parser de C")
+        return 'c'
+    return motor
+
+
+def _filtro_columnas(esquema):
+    # Los encabezados de los exports suelen traer espacios; se comparan sin ellos
+    if esquema is None:
+        return None
+    return lambda columna: str(columna).strip() in esquema
+
+
+def aplicar_esquema(df, esquema, convertir_tipos=False):
+    df.columns = df.columns.astype(str).str.strip()
+    if esquema is None:
+        return df
+    if convertir_tipos:
+        df = df.astype({columna: tipo for columna, tipo in tipos_lectura(esquema).items() if columna in df.columns})
+    for columna, tipo in esquema.items():
+        if columna not in df.columns:
+            continue
+        if tipo == 'numero' and not pd.api.types.is_numeric_dtype(df[columna]):
+            df[columna] = pd.to_numeric(df[columna], errors='coerce')
+        elif tipo == 'fecha':
+            df[columna] = pd.to_datetime(df[columna], dayfirst=True, errors='coerce')
+    return df
+
+
+def leer_excel(file, esquema=None, **kwargs):
+    # Lee xls/xlsx directamente al DataFrame, sin pasar por un CSV intermedio,
+    # cargando solo las columnas del esquema de la fuente
+    file.seek(0)
+    df = pd.read_excel(file, usecols=_filtro_columnas(esquema), **kwargs)
+    return aplicar_esquema(df, esquema, convertir_tipos=True)
+
+
+def _leer_encabezados(file, encoding):
+    file = flujo_binario(file)
+    file.seek(0)
+    columnas = pd.read_csv(file, sep=',', nrows=0, encoding=encoding, encoding_errors='replace').columns
+    file.seek(0)
+    return columnas
+
+
+def leer_tabla(file, predeterminada='latin1', fuente=None, esquema=None):
+    # Un CSV se lee por bloques con los dtype del esquema ya aplicados por el parser;
+    # un Excel se carga completo como único bloque
+    if not file.name.lower().endswith('.csv'):
+        return [leer_excel(file, esquema)]
+
+    encoding = detectar_codificacion(file, predeterminada, fuente)
+    dtype = None
+    if esquema is not None:
+        # dtype se indexa con el encabezado tal como viene en el archivo, con sus espacios
+        encabezados = _leer_encabezados(file, encoding)
+        tipos = tipos_lectura(esquema)
+        dtype = {columna: tipos[str(columna).strip()] for columna in encabezados if str(columna).strip() in tipos}
+
+    if motor_csv() == 'pyarrow':
+        # Arrow no acepta usecols como función ni necesita dtype=str: el texto ya es cadena de Arrow
+        columnas = None if esquema is None else [c for c in encabezados if str(c).strip() in esquema]
+        if dtype is not None:
+            dtype = {columna: tipo for columna, tipo in dtype.items() if tipo == 'category'}
+        return [aplicar_esquema(leer_csv_arrow(file, encoding, columnas, dtype), esquema)]
+
+    bloques = leer_csv_por_bloques(file, encoding, usecols=_filtro_columnas(esquema), dtype=dtype)
+    return (aplicar_esquema(df, esquema) for df in bloques)
+
+
+def sumar_parciales(parciales, claves, motor=PANDAS):
+    # Combina los agregados de cada bloque en el agregado del archivo completo
+    parciales = [parcial for parcial in parciales if not parcial.empty]
+    if not parciales:
+        return pd.DataFrame(columns=claves)
+    return motor.sumar(pd.concat(parciales, ignore_index=True), claves)
@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.api.ingestas import mes_siguiente, meses_entre
+from apps.api.particiones import (
+    carga_particionada, convertir_carga, crear_particion, listar_particiones, separar_particion,
+)
+
+
+def leer_periodo(valor):
+    try:
+        anio, mes = (int(parte) for parte in valor.split('-'))
+    except ValueError:
+        raise CommandError(f'Periodo inválido: {valor} (se espera AAAA-MM)')
+    if not 1 <= mes <= 12:
+        raise CommandError(f'Periodo inválido: {valor} (se espera AAAA-MM)')
+    return anio, mes
+
+
+class Command(BaseCommand):
+    help = 'Administra el particionado mensual de Carga por fecha (solo PostgreSQL)'
+
+    def add_arguments(self, parser):
+        acciones = parser.add_subparsers(dest='accion', required=True)
+        acciones.add_parser('convertir', help='Convierte Carga en tabla particionada y reparte las filas existentes')
+        acciones.add_parser('listar', help='Lista las particiones de Carga')
+        crear = acciones.add_parser('crear', help='Crea las particiones de un rango de meses')
+        crear.add_argument('--desde', help='AAAA-MM; por defecto el mes actual')
+        crear.add_argument('--hasta', help='AAAA-MM; por defecto el mes siguiente a --desde')
+        separar = acciones.add_parser('separar', help='Separa de Carga la partición de un mes')
+        separar.add_argument('periodo', help='AAAA-MM')
+        separar.add_argument('--eliminar', action='store_true', help='Elimina la tabla separada con sus filas')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        accion = options['accion']
+        particionada = carga_particionada()
+
+        if accion == 'convertir':
+            if particionada:
+                raise CommandError('Carga ya está particionada')
+            try:
+                meses = convertir_carga()
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'Carga particionada: {len(meses)} particiones con datos')
+            return
+
+        if not particionada:
+            raise CommandError('Carga no está particionada; ejecute primero `particiones_carga convertir`')
+
+        if accion == 'listar':
+            for nombre, desde, hasta in listar_particiones():
+                self.stdout.write(f'{nombre}: {desde} a {hasta}')
+        elif accion == 'crear':
+            hoy = timezone.localdate()
+            desde = leer_periodo(options['desde']) if options['desde'] else (hoy.year, hoy.month)
+            hasta = leer_periodo(options['hasta']) if options['hasta'] else mes_siguiente(*desde)
+            creadas = [mes for mes in meses_entre(desde, hasta) if crear_particion(*mes)]
+            self.stdout.write(f'Particiones creadas: {len(creadas)}')
+        elif accion == 'separar':
+            try:
+                nombre = separar_particion(*leer_periodo(options['periodo']), eliminar=options['eliminar'])
+            except DatabaseError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f'{nombre} {"eliminada" if options["eliminar"] else "separada"}')
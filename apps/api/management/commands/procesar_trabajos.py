@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.api.trabajos import ejecutar_trabajo, reclamar_trabajos_abandonados, tomar_siguiente_trabajo
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta los trabajos de ingesta encolados desde /plazos/masivo/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Procesa los trabajos pendientes y termina')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos entre consultas a la cola')
+        parser.add_argument(
+            '--abandonado-minutos', type=float, default=getattr(settings, 'INGESTA_TRABAJO_ABANDONADO_MINUTOS', 240),
+            help='Devuelve a la cola los trabajos EN_PROCESO que empezaron hace más de estos minutos',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            reclamados = reclamar_trabajos_abandonados(options['abandonado_minutos'])
+            if reclamados:
+                self.stdout.write(f'Trabajos abandonados devueltos a la cola: {reclamados}')
+            trabajo = tomar_siguiente_trabajo()
+            if trabajo is None:
+                if options['una_vez']:
+                    return
+                time.sleep(options['intervalo'])
+                continue
+
+            self.stdout.write(f'Trabajo {trabajo.id}: {trabajo.mes}/{trabajo.anio}')
+            trabajo = ejecutar_trabajo(trabajo)
+            self.stdout.write(
+                f'Trabajo {trabajo.id}: {trabajo.estado} '
+                f'({trabajo.archivos_procesados}/{trabajo.total_archivos} archivos)'
+            )
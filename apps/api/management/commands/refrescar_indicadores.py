@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.functions import TruncMonth
+
+from apps.api.functions import rangos_carga_laboral
+from apps.api.indicadores import (
+    MODELOS_PLAZOS, refrescar_indicadores_carga, refrescar_indicadores_materias, refrescar_indicadores_plazos,
+)
+from apps.api.ingestas import formatear_periodo
+from apps.modelos.models import Carga, RegistroIngesta
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las tablas de indicadores a partir de los datos ya cargados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dependencia', help='Solo recalcula los indicadores de esta dependencia')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        cargas = Carga.objects.all()
+        registros = RegistroIngesta.objects.all()
+        if options['dependencia']:
+            cargas = cargas.filter(dependencia=options['dependencia'])
+            registros = registros.filter(dependencia=options['dependencia'])
+
+        meses = cargas.annotate(mes=TruncMonth('fecha')).values_list('dependencia', 'mes').distinct()
+        periodos = {}
+        for dependencia, mes in meses:
+            periodos.setdefault(dependencia, []).append(formatear_periodo(mes.month, mes.year))
+        for dependencia, periodos_dependencia in periodos.items():
+            refrescar_indicadores_carga(dependencia, periodos_dependencia)
+        self.stdout.write(f'Carga: {sum(len(p) for p in periodos.values())} meses')
+
+        registros_plazos = registros.filter(tipo__in=MODELOS_PLAZOS)
+        for registro in registros_plazos:
+            refrescar_indicadores_plazos(registro)
+        self.stdout.write(f'Plazos: {len(registros_plazos)} ingestas')
+
+        # En orden de periodo, para que cada mes quede con el último export que lo incluyó
+        registros_carga = registros.filter(tipo='carga_laboral').order_by('periodo')
+        for registro in registros_carga:
+            _, meses_materia = rangos_carga_laboral(registro.periodo)
+            refrescar_indicadores_materias(registro, [inicio for inicio, _ in meses_materia])
+        self.stdout.write(f'Materias: {len(registros_carga)} ingestas')
@@ -0,0 +1,153 @@
+import contextvars
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Etapas de una ingesta que se miden por separado. `decodificacion` es la detección de la
+# codificación del archivo; `indicadores` el refresco de las tablas resumen al final.
+ETAPAS = ('lectura', 'decodificacion', 'normalizacion', 'agregacion', 'persistencia', 'indicadores')
+
+# Medición de la ingesta en curso en este hilo; las funciones de lectura y escritura informan a
+# través de ella sin que haya que pasarla como argumento
+_medicion_actual = contextvars.ContextVar('medicion_ingesta', default=None)
+
+# tracemalloc es uno solo para todo el proceso: si dos ingestas lo usaran a la vez (hilos del servidor
+# web) una reiniciaría el pico de la otra o lo detendría antes de tiempo. Solo mide memoria la que
+# toma este lock; las que corren a la vez miden tiempo y filas, con la memoria en None.
+_tracemalloc_en_uso = threading.Lock()
+
+
+class Medicion:
+    # Tiempo, filas y pico de memoria de cada etapa de una ingesta. Las etapas se anidan (la
+    # escritura consume los bloques a medida que el lector los produce): al entrar en una etapa
+    # se pausa la que estaba en curso, así que los tiempos de las etapas no se solapan.
+    # La memoria se mide con tracemalloc, que hace más lenta la ingesta; por eso es opcional.
+
+    def __init__(self, medir_memoria=False):
+        self.medir_memoria = medir_memoria
+        self.etapas = {etapa: {'segundos': 0.0, 'filas': 0, 'memoria_pico': None} for etapa in ETAPAS}
+        self.duracion = None
+        self.memoria_pico = None
+        self._pila = []
+        self._inicio_tracemalloc = False
+
+    def __enter__(self):
+        if self.medir_memoria and not _tracemalloc_en_uso.acquire(blocking=False):
+            self.medir_memoria = False
+        if self.medir_memoria:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._inicio_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._memoria_inicial = tracemalloc.get_traced_memory()[0]
+            self._pico_absoluto = self._memoria_inicial
+        self._token = _medicion_actual.set(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duracion = time.perf_counter() - self._inicio
+        _medicion_actual.reset(self._token)
+        if self.medir_memoria:
+            self._pico_absoluto = max(self._pico_absoluto, tracemalloc.get_traced_memory()[1])
+            self.memoria_pico = self._pico_absoluto - self._memoria_inicial
+            if self._inicio_tracemalloc:
+                tracemalloc.stop()
+            _tracemalloc_en_uso.release()
+        return False
+
+    def _pausar(self):
+        # Cierra el intervalo de la etapa en curso
+        if not self._pila:
+            return
+        nombre, desde, base = self._pila[-1]
+        etapa = self.etapas[nombre]
+        etapa['segundos'] += time.perf_counter() - desde
+        if self.medir_memoria:
+            pico = tracemalloc.get_traced_memory()[1]
+            self._pico_absoluto = max(self._pico_absoluto, pico)
+            etapa['memoria_pico'] = max(etapa['memoria_pico'] or 0, pico - base)
+
+    def _reanudar(self):
+        # Abre un intervalo nuevo para la etapa en el tope de la pila
+        if not self._pila:
+            return
+        base = None
+        if self.medir_memoria:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        self._pila[-1] = (self._pila[-1][0], time.perf_counter(), base)
+
+    @contextmanager
+    def etapa(self, nombre):
+        self._pausar()
+        self._pila.append((nombre, None, None))
+        self._reanudar()
+        try:
+            yield
+        finally:
+            self._pausar()
+            self._pila.pop()
+            self._reanudar()
+
+    def contar(self, nombre, filas):
+        self.etapas[nombre]['filas'] += filas
+
+    def etapa_actual(self):
+        return self._pila[-1][0] if self._pila else None
+
+    def resumen(self):
+        return {
+            nombre: {**etapa, 'segundos': round(etapa['segundos'], 4)}
+            for nombre, etapa in self.etapas.items()
+        }
+
+
+@contextmanager
+def etapa(nombre):
+    # Atribuye lo que se ejecute dentro a la etapa `nombre` de la ingesta en curso, si la hay
+    medicion = _medicion_actual.get()
+    if medicion is None:
+        yield
+    else:
+        with medicion.etapa(nombre):
+            yield
+
+
+def contar_filas(nombre, filas):
+    medicion = _medicion_actual.get()
+    if medicion is not None:
+        medicion.contar(nombre, filas)
+
+
+def contar_escritas(filas):
+    # Las filas insertadas cuentan para la etapa en curso: las de los datos caen en
+    # `persistencia` y las de las tablas resumen en `indicadores`
+    medicion = _medicion_actual.get()
+    if medicion is not None and medicion.etapa_actual() is not None:
+        medicion.contar(medicion.etapa_actual(), filas)
+
+
+def filas_resultado(resultado):
+    # Filas de un bloque o resultado de agregación: DataFrame, Series o colecciones de ellos
+    if hasattr(resultado, 'shape'):
+        return len(resultado)
+    if isinstance(resultado, dict):
+        return sum(filas_resultado(valor) for valor in resultado.values())
+    if isinstance(resultado, (list, tuple)):
+        return sum(filas_resultado(valor) for valor in resultado)
+    return 0
+
+
+def medir_bloques(bloques, nombre='lectura'):
+    # El lector de CSV entrega los bloques de forma perezosa: el tiempo de leer cada uno
+    # se cuenta al pedirlo
+    iterador = iter(bloques)
+    while True:
+        with etapa(nombre):
+            df = next(iterador, None)
+        if df is None:
+            return
+        contar_filas(nombre, len(df))
+        yield df
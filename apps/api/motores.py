@@ -0,0 +1,98 @@
+import importlib.util
+import logging
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Motores de agregación. Las etapas de agregación arman en pandas las columnas a contar (claves y
+# marcas por fila) y le piden al motor el agrupamiento, que es lo más costoso con los exports grandes:
+#   sumar(df, claves)                -> suma de las demás columnas por cada combinación de claves
+#   contar(df, claves, nombre)       -> filas por cada combinación de claves, en la columna `nombre`
+# Los dos motores devuelven lo mismo: un DataFrame de pandas con una fila por combinación presente
+# (las claves vacías se descartan) ordenado por las claves, las claves categóricas como categorías
+# con las mismas categorías de entrada y los conteos enteros como int64.
+
+
+class MotorPandas:
+    nombre = 'pandas'
+
+    def sumar(self, df, claves):
+        return df.groupby(claves, sort=True, observed=True).sum().reset_index()
+
+    def contar(self, df, claves, nombre='cantidad'):
+        return df.groupby(claves, sort=True, observed=True).size().reset_index(name=nombre)
+
+
+class MotorPolars:
+    # Agrupa con el motor perezoso de Polars, que reparte el trabajo entre los núcleos.
+    # Las claves categóricas se agrupan y ordenan por su código, que sigue el orden de las
+    # categorías igual que pandas, y se vuelven a convertir en categorías al final.
+    nombre = 'polars'
+
+    def __init__(self):
+        import polars as pl
+        self.pl = pl
+
+    def _agrupar(self, df, claves, agregaciones):
+        pl = self.pl
+        categorias = {
+            columna: df[columna].cat.categories
+            for columna in claves if isinstance(df[columna].dtype, pd.CategoricalDtype)
+        }
+        marco = pl.DataFrame([
+            pl.from_pandas(df[columna].cat.codes if columna in categorias else df[columna]).alias(columna)
+            for columna in df.columns
+        ])
+        # Como en pandas, no hay grupo para las claves vacías (código -1 en las categóricas)
+        filtros = [
+            pl.col(columna) >= 0 if columna in categorias else pl.col(columna).is_not_null()
+            for columna in claves
+        ]
+        resultado = (
+            marco.lazy()
+            .filter(*filtros)
+            .group_by(claves)
+            .agg(agregaciones)
+            .sort(claves)
+            .collect()
+            .to_pandas()
+        )
+        for columna, valores in categorias.items():
+            resultado[columna] = pd.Categorical.from_codes(resultado[columna], categories=valores)
+        return resultado
+
+    def sumar(self, df, claves):
+        pl = self.pl
+        agregaciones = []
+        for columna in df.columns:
+            if columna in claves:
+                continue
+            expresion = pl.col(columna)
+            # pandas suma enteros y booleanos en int64; Polars conservaría el tipo (o u32 para booleanos)
+            if pd.api.types.is_bool_dtype(df[columna]) or pd.api.types.is_integer_dtype(df[columna]):
+                expresion = expresion.cast(pl.Int64)
+            agregaciones.append(expresion.sum())
+        return self._agrupar(df, claves, agregaciones)
+
+    def contar(self, df, claves, nombre='cantidad'):
+        return self._agrupar(df, claves, [self.pl.len().cast(self.pl.Int64).alias(nombre)])
+
+
+PANDAS = MotorPandas()
+
+
+def motor_agregacion(dependencia=None):
+    # INGESTA_MOTOR_AGREGACION vale para todas las dependencias salvo las que tengan el suyo en
+    # INGESTA_MOTOR_AGREGACION_DEPENDENCIAS
+    nombre = getattr(settings, 'INGESTA_MOTOR_AGREGACION_DEPENDENCIAS', {}).get(
+        dependencia, getattr(settings, 'INGESTA_MOTOR_AGREGACION', 'pandas')
+    )
+    if nombre != 'polars':
+        return PANDAS
+    # Polars pasa los DataFrames de y hacia pandas a través de Arrow
+    if importlib.util.find_spec('polars') is None or importlib.util.find_spec('pyarrow') is None:
+        logger.warning("Motor de agregación 'polars' sin polars o pyarrow instalados; se usa pandas")
+        return PANDAS
+    return MotorPolars()
@@ -0,0 +1,163 @@
+from datetime import date
+
+from django.db import connections, router
+
+from apps.modelos.models import Carga
+
+# Particionado opcional de Carga por rango de fecha, una partición por mes (solo PostgreSQL).
+# La tabla se convierte una vez con `manage.py particiones_carga convertir`; a partir de ahí la
+# ingesta crea la partición del mes que escribe y los meses viejos se separan sin borrar fila a fila.
+# La clave primaria de la tabla particionada pasa a ser (id, fecha): toda restricción única
+# nueva sobre Carga tiene que incluir fecha.
+
+
+def _conexion():
+    return connections[router.db_for_write(Carga)]
+
+
+def _tabla():
+    return Carga._meta.db_table
+
+
+def nombre_particion(anio, mes):
+    return f'{_tabla()}_p{anio:04d}_{mes:02d}'
+
+
+def limites_mes(anio, mes):
+    return date(anio, mes, 1), date(anio + mes // 12, mes % 12 + 1, 1)
+
+
+def carga_particionada():
+    conexion = _conexion()
+    if conexion.vendor != 'postgresql':
+        return False
+    with conexion.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s',
+            [_tabla()],
+        )
+        return cursor.fetchone() is not None
+
+
+def listar_particiones():
+    # [(nombre, desde, hasta)] ordenadas por fecha
+    with _conexion().cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT hija.relname, pg_get_expr(hija.relpartbound, hija.oid)
+            FROM pg_inherits i
+            JOIN pg_class padre ON padre.oid = i.inhparent
+            JOIN pg_class hija ON hija.oid = i.inhrelid
+            WHERE padre.relname = %s
+            ORDER BY hija.relname
+            """,
+            [_tabla()],
+        )
+        # La expresión es FOR VALUES FROM ('2025-03-01') TO ('2025-04-01')
+        return [(nombre, *limites.split("'")[1::2]) for nombre, limites in cursor.fetchall()]
+
+
+def crear_particion(anio, mes):
+    nombre = nombre_particion(anio, mes)
+    conexion = _conexion()
+    with conexion.cursor() as cursor:
+        # Se consulta antes para no pedir el bloqueo de la tabla padre cuando la partición ya existe
+        cursor.execute('SELECT to_regclass(%s)', [nombre])
+        if cursor.fetchone()[0] is not None:
+            return False
+        desde, hasta = limites_mes(anio, mes)
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {conexion.ops.quote_name(nombre)} PARTITION OF {conexion.ops.quote_name(_tabla())} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [desde, hasta],
+        )
+    return True
+
+
+def asegurar_particiones_carga(meses):
+    # meses: [(anio, mes)]. No hace nada si Carga no está particionada.
+    if not carga_particionada():
+        return
+    for anio, mes in meses:
+        crear_particion(anio, mes)
+
+
+def separar_particion(anio, mes, eliminar=False):
+    # La partición separada queda como tabla independiente con sus filas, salvo que se elimine
+    nombre = nombre_particion(anio, mes)
+    conexion = _conexion()
+    with conexion.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {conexion.ops.quote_name(_tabla())} DETACH PARTITION {conexion.ops.quote_name(nombre)}'
+        )
+        if eliminar:
+            cursor.execute(f'DROP TABLE {conexion.ops.quote_name(nombre)}')
+    return nombre
+
+
+def _definicion_restriccion(q, nombre, info):
+    columnas = ', '.join(q(columna) for columna in info['columns'])
+    if info['primary_key']:
+        return f'ALTER TABLE {q(_tabla())} ADD CONSTRAINT {q(nombre)} PRIMARY KEY ({columnas}, {q("fecha")})'
+    if info['foreign_key']:
+        tabla, columna = info['foreign_key']
+        return (
+            f'ALTER TABLE {q(_tabla())} ADD CONSTRAINT {q(nombre)} FOREIGN KEY ({columnas}) '
+            f'REFERENCES {q(tabla)} ({q(columna)}) DEFERRABLE INITIALLY DEFERRED'
+        )
+    if info['unique']:
+        if 'fecha' not in info['columns']:
+            raise ValueError(f'La restricción única {nombre} no incluye fecha y no puede existir en la tabla particionada')
+        if info['index']:
+            return f'CREATE UNIQUE INDEX {q(nombre)} ON {q(_tabla())} ({columnas})'
+        return f'ALTER TABLE {q(_tabla())} ADD CONSTRAINT {q(nombre)} UNIQUE ({columnas})'
+    return f'CREATE INDEX {q(nombre)} ON {q(_tabla())} ({columnas})'
+
+
+def convertir_carga():
+    # Reemplaza modelos_carga por una tabla particionada con las mismas columnas, restricciones
+    # e índices, y mueve las filas a una partición por mes. Debe correr dentro de una transacción.
+    conexion = _conexion()
+    q = conexion.ops.quote_name
+    tabla = _tabla()
+    anterior = f'{tabla}_anterior'
+
+    with conexion.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {q(tabla)} IN ACCESS EXCLUSIVE MODE')
+        # Los CHECK pasan con LIKE; el resto se vuelve a crear con el mismo nombre sobre la tabla nueva
+        restricciones = {
+            nombre: info for nombre, info in conexion.introspection.get_constraints(cursor, tabla).items()
+            if not info['check']
+        }
+        definiciones = [_definicion_restriccion(q, nombre, info) for nombre, info in restricciones.items()]
+
+        cursor.execute(f'ALTER TABLE {q(tabla)} RENAME TO {q(anterior)}')
+        for nombre, info in restricciones.items():
+            if info['index']:
+                cursor.execute(f'DROP INDEX {q(nombre)}')
+            else:
+                cursor.execute(f'ALTER TABLE {q(anterior)} DROP CONSTRAINT {q(nombre)}')
+
+        cursor.execute(
+            f'CREATE TABLE {q(tabla)} (LIKE {q(anterior)} INCLUDING CONSTRAINTS) PARTITION BY RANGE ({q("fecha")})'
+        )
+        cursor.execute(f"SELECT DISTINCT date_trunc('month', {q('fecha')})::date FROM {q(anterior)}")
+        meses = sorted((mes.year, mes.month) for mes, in cursor.fetchall())
+        for anio, mes in meses:
+            crear_particion(anio, mes)
+        cursor.execute(f'INSERT INTO {q(tabla)} SELECT * FROM {q(anterior)}')
+        cursor.execute(f'SELECT max({q("id")}) FROM {q(anterior)}')
+        ultimo_id = cursor.fetchone()[0]
+        # La secuencia de identidad se va con la tabla anterior; la tabla particionada usa una propia
+        cursor.execute(f'DROP TABLE {q(anterior)}')
+
+        secuencia = f'{tabla}_id_seq'
+        cursor.execute(f'CREATE SEQUENCE {q(secuencia)} OWNED BY {q(tabla)}.{q("id")}')
+        if ultimo_id is not None:
+            cursor.execute('SELECT setval(%s, %s)', [secuencia, ultimo_id])
+        cursor.execute(f"ALTER TABLE {q(tabla)} ALTER COLUMN {q('id')} SET DEFAULT nextval('{secuencia}')")
+
+        # Las restricciones e índices se crean después de copiar las filas, que es más rápido
+        for definicion in definiciones:
+            cursor.execute(definicion)
+    return meses
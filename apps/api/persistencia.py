@@ -0,0 +1,92 @@
+import io
+
+from django.conf import settings
+from django.db import connections, router
+
+from .mediciones import contar_escritas
+
+
+class EscritorMasivo:
+    # Acumula instancias de un modelo y las inserta por lotes con bulk_create,
+    # o con COPY cuando la base es PostgreSQL y INGESTA_USAR_COPY está activo.
+    # Con campos_unicos los lotes se escriben como upsert (INSERT ... ON CONFLICT DO UPDATE)
+    # sobre la restricción única formada por esos campos.
+
+    def __init__(self, modelo, batch_size=None, usar_copy=None, campos_unicos=None, campos_actualizar=None):
+        self.modelo = modelo
+        self.batch_size = batch_size or getattr(settings, 'INGESTA_BATCH_SIZE', 2000)
+        self.usar_copy = getattr(settings, 'INGESTA_USAR_COPY', False) if usar_copy is None else usar_copy
+        self.campos_unicos = campos_unicos
+        self.campos_actualizar = campos_actualizar
+        if campos_unicos and campos_actualizar is None:
+            self.campos_actualizar = [
+                f.name for f in modelo._meta.concrete_fields
+                if not f.primary_key and f.name not in campos_unicos and not getattr(f, 'auto_now_add', False)
+            ]
+        self.pendientes = []
+        self.total = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def agregar(self, instancia):
+        self.pendientes.append(instancia)
+        if len(self.pendientes) >= self.batch_size:
+            self.flush()
+
+    def agregar_todos(self, instancias):
+        for instancia in instancias:
+            self.agregar(instancia)
+
+    def flush(self):
+        if not self.pendientes:
+            return
+        alias = router.db_for_write(self.modelo)
+        if self.campos_unicos:
+            self.modelo.objects.using(alias).bulk_create(
+                self.pendientes,
+                batch_size=self.batch_size,
+                update_conflicts=True,
+                unique_fields=self.campos_unicos,
+                update_fields=self.campos_actualizar,
+            )
+        elif self.usar_copy and connections[alias].vendor == 'postgresql':
+            self._copiar(alias)
+        else:
+            self.modelo.objects.using(alias).bulk_create(self.pendientes, batch_size=self.batch_size)
+        self.total += len(self.pendientes)
+        contar_escritas(len(self.pendientes))
+        self.pendientes = []
+
+    def _copiar(self, alias):
+        connection = connections[alias]
+        campos = [f for f in self.modelo._meta.concrete_fields if not f.primary_key]
+
+        buffer = io.StringIO()
+        for instancia in self.pendientes:
+            buffer.write(','.join(
+                _valor_csv(campo.get_db_prep_save(campo.pre_save(instancia, True), connection))
+                for campo in campos
+            ))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        tabla = connection.ops.quote_name(self.modelo._meta.db_table)
+        columnas = ', '.join(connection.ops.quote_name(campo.column) for campo in campos)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(f'COPY {tabla} ({columnas}) FROM STDIN WITH (FORMAT csv)', buffer)
+
+
+def _valor_csv(valor):
+    # En el CSV de COPY un campo vacío sin comillas es NULL y "" es la cadena vacía.
+    # csv.QUOTE_NONNUMERIC también entrecomilla None, así que se arma cada campo a mano.
+    if valor is None:
+        return ''
+    if isinstance(valor, str):
+        return '"' + valor.replace('"', '""') + '"'
+    return str(valor)
@@ -0,0 +1,150 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+
+from apps.modelos.models import EjecucionIngesta
+from .ingestas import MENSAJE_YA_PROCESADO, nombre_archivo, preparar_ingesta, resolver_periodo
+from .lectura import sumar_parciales
+from .mediciones import Medicion, contar_filas, etapa, filas_resultado, medir_bloques
+from .motores import motor_agregacion
+
+logger = logging.getLogger(__name__)
+
+# Toda ingesta, venga de una vista o de la carga masiva, pasa por las mismas etapas:
+#   leer(contexto)                   -> bloques (DataFrames) del archivo
+#   normalizar(df, contexto)         -> bloque con columnas renombradas y valores limpios
+#   agregar(df, contexto)            -> resultado parcial del bloque, agrupando con contexto.motor
+#   escribir(resultados, contexto)   -> inserta los resultados en la base
+#   refrescar(contexto)              -> recalcula los indicadores que dependen de lo escrito
+# Con `claves` los parciales de cada bloque se suman en un único resultado antes de escribir;
+# sin ellas cada parcial se escribe a medida que sale, sin juntar el archivo en memoria.
+# Cada ejecución queda en EjecucionIngesta con el tiempo, las filas y la memoria de cada etapa.
+
+
+class ErrorLectura(Exception):
+    pass
+
+
+class Contexto:
+    # Lo que las etapas saben de la ingesta en curso; `opciones` son los parámetros propios de la fuente
+    def __init__(self, file, dependencia, periodo, registro, **opciones):
+        self.file = file
+        self.dependencia = dependencia
+        self.periodo = periodo
+        self.registro = registro
+        self.opciones = opciones
+        # Motor con el que las etapas de agregación agrupan (pandas o Polars, según la dependencia)
+        self.motor = motor_agregacion(dependencia)
+
+
+def _sin_cambios(df, contexto):
+    return df
+
+
+class Pipeline:
+
+    def __init__(self, tipo, leer, escribir, normalizar=None, agregar=None, claves=None, refrescar=None,
+                 mensaje='Datos cargados correctamente.'):
+        self.tipo = tipo
+        self.leer = leer
+        self.normalizar = normalizar or _sin_cambios
+        self.agregar = agregar or _sin_cambios
+        self.claves = claves
+        self.escribir = escribir
+        self.refrescar = refrescar
+        self.mensaje = mensaje
+
+    def _leer(self, contexto):
+        formato = 'CSV' if contexto.file.name.lower().endswith('.csv') else 'Excel'
+        try:
+            with etapa('lectura'):
+                return self.leer(contexto)
+        except Exception as e:
+            raise ErrorLectura(f'Error al leer {formato}: {str(e)}')
+
+    def _parciales(self, contexto, contar=True):
+        for df in medir_bloques(self._leer(contexto)):
+            with etapa('normalizacion'):
+                df = self.normalizar(df, contexto)
+            contar_filas('normalizacion', len(df))
+            with etapa('agregacion'):
+                parcial = self.agregar(df, contexto)
+            if contar:
+                contar_filas('agregacion', filas_resultado(parcial))
+            yield parcial
+
+    def _resultados(self, contexto):
+        if self.claves is None:
+            return self._parciales(contexto)
+        parciales = list(self._parciales(contexto, contar=False))
+        with etapa('agregacion'):
+            resultado = sumar_parciales(parciales, self.claves, contexto.motor)
+        contar_filas('agregacion', len(resultado))
+        return [resultado]
+
+    @transaction.atomic
+    def _ejecutar(self, file, dependencia, periodo, opciones):
+        # Devuelve (datos, status HTTP, registro); ante cualquier error no queda nada escrito
+        try:
+            with etapa('lectura'):
+                registro, ya_procesado = preparar_ingesta(file, self.tipo, dependencia, periodo)
+            if ya_procesado:
+                return {'mensaje': MENSAJE_YA_PROCESADO}, status.HTTP_200_OK, registro
+
+            contexto = Contexto(file, dependencia, registro.periodo, registro, **opciones)
+            with etapa('persistencia'):
+                self.escribir(self._resultados(contexto), contexto)
+            if self.refrescar:
+                with etapa('indicadores'):
+                    self.refrescar(contexto)
+            return {'mensaje': self.mensaje}, status.HTTP_201_CREATED, registro
+        except Exception as e:
+            logger.exception('Error al procesar %s de %s', self.tipo, dependencia)
+            transaction.set_rollback(True)
+            return {'error': str(e)}, status.HTTP_400_BAD_REQUEST, None
+
+    def ejecutar(self, file, dependencia, periodo=None, **opciones):
+        periodo = resolver_periodo(periodo)
+        with Medicion(getattr(settings, 'INGESTA_MEDIR_MEMORIA', False)) as medicion:
+            datos, estado, registro = self._ejecutar(file, dependencia, periodo, opciones)
+        self._registrar(file, dependencia, periodo, datos, estado, registro, medicion)
+        return datos, estado
+
+    def _registrar(self, file, dependencia, periodo, datos, estado, registro, medicion):
+        if estado == status.HTTP_201_CREATED:
+            resultado = EjecucionIngesta.PROCESADO
+        elif estado == status.HTTP_200_OK:
+            resultado = EjecucionIngesta.OMITIDO
+        else:
+            resultado = EjecucionIngesta.ERROR
+        etapas = medicion.resumen()
+
+        logger.log(
+            logging.INFO if resultado != EjecucionIngesta.ERROR else logging.WARNING,
+            'Ingesta %s %s %s: %s en %.3f s, %d filas leídas, %d escritas, memoria pico %s (%s)',
+            self.tipo, dependencia, periodo, resultado, medicion.duracion,
+            etapas['lectura']['filas'], etapas['persistencia']['filas'],
+            'sin medir' if medicion.memoria_pico is None else f'{medicion.memoria_pico / 2**20:.1f} MiB',
+            ', '.join(f'{nombre} {datos_etapa["segundos"]:.3f} s' for nombre, datos_etapa in etapas.items()),
+        )
+        # El registro de la ejecución no debe hacer fallar una ingesta que ya terminó
+        try:
+            with transaction.atomic():
+                EjecucionIngesta.objects.create(
+                    tipo=self.tipo,
+                    dependencia=dependencia,
+                    periodo=periodo,
+                    archivo=nombre_archivo(file),
+                    estado=resultado,
+                    mensaje=datos.get('mensaje') or datos.get('error') or '',
+                    duracion=medicion.duracion,
+                    filas_leidas=etapas['lectura']['filas'],
+                    filas_escritas=etapas['persistencia']['filas'],
+                    memoria_pico=medicion.memoria_pico,
+                    etapas=etapas,
+                    ingesta=registro,
+                )
+        except Exception:
+            logger.exception('No se pudo guardar la ejecución de %s de %s', self.tipo, dependencia)
@@ -1,7 +1,43 @@
+import multiprocessing
 import os
 import shutil
-from apps.api.functions import procesar_archivo_plazos, procesar_carga_total, procesar_carga_laboral, procesar_carga_siatf,procesar_archivo_plazos_detallado
-from apps.modelos.models import Plazos  # Asegúrate de tener configurado Django
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections
+
+from apps.api.arranque import iniciar_proceso
+
+
+# (tipo, carpeta dentro de data/ y dataprocesada/, extensiones aceptadas; None acepta cualquiera)
+CARPETAS = [
+    ('Plazos Detallado', 'PlazosDetallado', ('.csv',)),
+    ('Plazos', 'Plazos', ('.csv',)),
+    ('Carga Total', 'ResumenCarga', ('.csv',)),
+    ('Carga Laboral', 'CargaTotal', None),
+    ('Carga SIATF', 'CargaSiatf', ('.xlsx', '.csv')),
+]
+
+
+def procesadores():
+    # Los archivos sin periodo propio quedan registrados con el mes y año del lote.
+    # `hasta` (AAAA-MM) solo aplica a la carga laboral: carga del mismo export todos los meses del rango.
+    # Se importan al usarlos: los procesos del pool importan este módulo y los procesadores
+    # importan los modelos, que solo pueden cargarse después de django.setup()
+    from apps.api.functions import (
+        procesar_archivo_plazos, procesar_archivo_plazos_detallado, procesar_carga_laboral, procesar_carga_siatf,
+        procesar_carga_total,
+    )
+    from apps.api.ingestas import formatear_periodo
+
+    return {
+        'Plazos Detallado': lambda f, dependencia, mes, anio, hasta: procesar_archivo_plazos_detallado(f, dependencia, formatear_periodo(mes, anio)),
+        'Plazos': lambda f, dependencia, mes, anio, hasta: procesar_archivo_plazos(f, dependencia, formatear_periodo(mes, anio)),
+        'Carga Total': lambda f, dependencia, mes, anio, hasta: procesar_carga_total(f, dependencia, formatear_periodo(mes, anio)),
+        'Carga Laboral': lambda f, dependencia, mes, anio, hasta: procesar_carga_laboral(f, dependencia, mes, anio, hasta=hasta),
+        'Carga SIATF': lambda f, dependencia, mes, anio, hasta: procesar_carga_siatf(f, dependencia, formatear_periodo(mes, anio)),
+    }
 
 
 def extraer_dependencia_desde_nombre(nombre_archivo):
@@ -9,142 +45,90 @@ def extraer_dependencia_desde_nombre(nombre_archivo):
     dependencia = base.split('_')[0]
     return dependencia
 
-def procesar_archivos(mes, anio):
-    resultados = []
-    
-    # -------------plazos detallado---------
-    carpeta_plazos_detallado = 'data/PlazosDetallado'
-    carpeta_destino_plazos_detallado = 'dataprocesada/PlazosDetallado'
-    os.makedirs(carpeta_destino_plazos_detallado, exist_ok=True)
-    if os.path.exists(carpeta_plazos_detallado):
-        archivos_plazos_detallado = [f for f in os.listdir(carpeta_plazos_detallado) if f.endswith('.csv')]
-        for archivo in archivos_plazos_detallado:
-            dependencia = extraer_dependencia_desde_nombre(archivo)
-            ruta_archivo = os.path.join(carpeta_plazos_detallado, archivo)
-            try:
-                with open(ruta_archivo, 'rb') as f:
-                    success, mensaje = procesar_archivo_plazos_detallado(f, dependencia)
-            except Exception as e:
-                resultados.append({
-                    'tipo': 'Plazos Detallado',
-                    'dependencia': dependencia,
-                    'error': str(e)
-                })
-            if success:
-                shutil.move(ruta_archivo, os.path.join(carpeta_destino_plazos_detallado, archivo))  
-            else:
-                resultados.append({
-                    'tipo': 'Plazos Detallado',
-                    'dependencia': dependencia,
-                    'error': mensaje
-                })      
-  
-
-    # ---------- PLAZOS ----------
-    carpeta_plazos = 'data/Plazos'
-    carpeta_destino_plazos = 'dataprocesada/Plazos'
-    os.makedirs(carpeta_destino_plazos, exist_ok=True)
-
-    if os.path.exists(carpeta_plazos):
-        archivos_plazos = [f for f in os.listdir(carpeta_plazos) if f.endswith('.csv')]
-
-        for archivo in archivos_plazos:
-            dependencia = extraer_dependencia_desde_nombre(archivo)
-            ruta_archivo = os.path.join(carpeta_plazos, archivo)
-
-            try:
-                with open(ruta_archivo, 'rb') as f:
-                    success, mensaje = procesar_archivo_plazos(f, dependencia)
-
-                if success:
-                    shutil.move(ruta_archivo, os.path.join(carpeta_destino_plazos, archivo))
-
-            except Exception as e:
-                resultados.append({
-                    'tipo': 'Plazos',
-                    'dependencia': dependencia,
-                    'error': str(e)
-                })
-
-    # ---------- RESUMEN CARGA TOTAL ----------
-    carpeta_carga = 'data/ResumenCarga'
-    carpeta_destino_carga = 'dataprocesada/ResumenCarga'
-    os.makedirs(carpeta_destino_carga, exist_ok=True)
-
-    if os.path.exists(carpeta_carga):
-        archivos_carga = [f for f in os.listdir(carpeta_carga) if f.endswith('.csv')]
-
-        for archivo in archivos_carga:
-            dependencia = extraer_dependencia_desde_nombre(archivo)
-            ruta_archivo = os.path.join(carpeta_carga, archivo)
-
-            try:
-                with open(ruta_archivo, 'rb') as f:
-                    response_data, response_status = procesar_carga_total(f, dependencia)
-
-                if response_status == 201:
-                    shutil.move(ruta_archivo, os.path.join(carpeta_destino_carga, archivo))
-            except Exception as e:
-                resultados.append({
-                    'tipo': 'Carga Total',
-                    'dependencia': dependencia,
-                    'error': str(e)
-                })
-
-    # ---------- CARGA LABORAL ----------
-    carpeta_laboral = 'data/CargaTotal'
-    carpeta_destino_laboral = 'dataprocesada/CargaTotal'
-    os.makedirs(carpeta_destino_laboral, exist_ok=True)
-
-    if os.path.exists(carpeta_laboral):
-        archivos_laboral = [f for f in os.listdir(carpeta_laboral)]
-
-        for archivo in archivos_laboral:
-            dependencia = extraer_dependencia_desde_nombre(archivo)
-            ruta_archivo = os.path.join(carpeta_laboral, archivo)
-
-            try:
-                with open(ruta_archivo, 'rb') as f:
-                    response_data, response_status = procesar_carga_laboral(f, dependencia, mes, anio)
-
-                if response_status == 201:
-                    shutil.move(ruta_archivo, os.path.join(carpeta_destino_laboral, archivo))
-                else:
-                    resultados.append({
-                        'tipo': 'Carga Laboral',
-                        'dependencia': dependencia,
-                        'error': response_data.get('detalle') or 'No se pudo procesar el archivo'
-                    })
-            except Exception as e:
-                resultados.append({
-                    'tipo': 'Carga Laboral',
-                    'dependencia': dependencia,
-                    'error': str(e)
-                })
-
-    # ---------- CARGA SIATF ----------
-    carpeta_siatf = 'data/CargaSiatf'
-    carpeta_destino_siatf = 'dataprocesada/CargaSiatf'
-    os.makedirs(carpeta_destino_siatf, exist_ok=True)
-
-    if os.path.exists(carpeta_siatf):
-        archivos_siatf = [f for f in os.listdir(carpeta_siatf) if f.endswith('.xlsx')]
-
-        for archivo in archivos_siatf:
-            dependencia = extraer_dependencia_desde_nombre(archivo)
-            ruta_archivo = os.path.join(carpeta_siatf, archivo)
-
-            try:
-                with open(ruta_archivo, 'rb') as f:
-                    response_data, response_status = procesar_carga_siatf(f, dependencia)
-
-                if response_status == 201:
-                    shutil.move(ruta_archivo, os.path.join(carpeta_destino_siatf, archivo))
-            except Exception as e:
-                resultados.append({
-                    'tipo': 'Carga SIATF',
-                    'dependencia': dependencia,
-                    'error': str(e)
-                })
 
+def crear_tarea(tipo, archivo, carpeta_datos='data', carpeta_procesados='dataprocesada'):
+    carpeta = next(carpeta for tipo_carpeta, carpeta, _ in CARPETAS if tipo_carpeta == tipo)
+    destino = os.path.join(carpeta_procesados, carpeta)
+    os.makedirs(destino, exist_ok=True)
+    return {
+        'tipo': tipo,
+        'archivo': archivo,
+        'dependencia': extraer_dependencia_desde_nombre(archivo),
+        'ruta': os.path.join(carpeta_datos, carpeta, archivo),
+        'destino': os.path.join(destino, archivo),
+    }
+
+
+def listar_tareas(carpeta_datos='data', carpeta_procesados='dataprocesada'):
+    tareas = []
+    for tipo, carpeta, extensiones in CARPETAS:
+        origen = os.path.join(carpeta_datos, carpeta)
+        os.makedirs(os.path.join(carpeta_procesados, carpeta), exist_ok=True)
+        if not os.path.exists(origen):
+            continue
+        for archivo in os.listdir(origen):
+            if extensiones and not archivo.endswith(extensiones):
+                continue
+            tareas.append(crear_tarea(tipo, archivo, carpeta_datos, carpeta_procesados))
+    return tareas
+
+
+def interpretar_respuesta(respuesta):
+    # Los procesadores devuelven (datos, status HTTP), igual que a las vistas
+    datos, estado = respuesta
+    if estado in (200, 201):
+        return True, datos.get('mensaje')
+    return False, datos.get('error') or 'No se pudo procesar el archivo'
+
+
+def procesar_tarea(tarea, mes, anio, hasta=None):
+    inicio = time.perf_counter()
+    resultado = {'tipo': tarea['tipo'], 'dependencia': tarea['dependencia'], 'archivo': tarea['archivo']}
+    try:
+        with open(tarea['ruta'], 'rb') as f:
+            exito, mensaje = interpretar_respuesta(
+                procesadores()[tarea['tipo']](f, tarea['dependencia'], mes, anio, hasta)
+            )
+        if exito:
+            shutil.move(tarea['ruta'], tarea['destino'])
+            resultado['mensaje'] = mensaje or 'Archivo procesado correctamente'
+        else:
+            resultado['error'] = mensaje
+    except Exception as e:
+        resultado['error'] = str(e)
+    resultado['duracion'] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+def ejecutar_tareas(tareas, mes, anio, procesos=None, al_terminar=None, hasta=None):
+    procesos = int(procesos or getattr(settings, 'INGESTA_PROCESOS', 1))
+
+    if procesos <= 1 or len(tareas) <= 1:
+        resultados = []
+        for tarea in tareas:
+            resultado = procesar_tarea(tarea, mes, anio, hasta)
+            resultados.append(resultado)
+            if al_terminar:
+                al_terminar(tarea, resultado)
+        return resultados
+
+    # Las conexiones abiertas no se comparten con los procesos hijos
+    connections.close_all()
+    resultados = [None] * len(tareas)
+    with ProcessPoolExecutor(
+        max_workers=min(procesos, len(tareas)),
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=iniciar_proceso,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'back.settings'),),
+    ) as pool:
+        futuros = {pool.submit(procesar_tarea, tarea, mes, anio, hasta): i for i, tarea in enumerate(tareas)}
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            resultados[i] = futuro.result()
+            if al_terminar:
+                al_terminar(tareas[i], resultados[i])
     return resultados
+
+
+def procesar_archivos(mes, anio, procesos=None, hasta=None):
+    return ejecutar_tareas(listar_tareas(), mes, anio, procesos=procesos, hasta=hasta)
@@ -0,0 +1,121 @@
+import pandas as pd
+
+# Implementaciones anteriores de las etapas de agregación, fila por fila o con fechas como objetos
+# Python. No las usa la ingesta: apps/api/benchmarks.py las compara en tiempo y resultado con las
+# actuales.
+
+
+def carga_diaria_por_mascaras(df, inicio, fin):
+    # Carga diaria: fiscal x día x máscara, con las fechas como date
+    from apps.api.functions import CONTADORES_CARGA
+
+    df = df.assign(fecha_ingreso=df['fecha_ingreso'].dt.date, fecha_conclusion=df['fecha_conclusion'].dt.date)
+    dias = pd.date_range(inicio, fin).date
+    filas = []
+    for fiscal in df['nombre_fiscal'].dropna().unique():
+        registros_fiscal = df[df['nombre_fiscal'] == fiscal]
+        for dia in dias:
+            conteos = {}
+            for campo, columna_fecha, filtro, valor in CONTADORES_CARGA:
+                mascara = registros_fiscal[columna_fecha] == dia
+                if filtro is not None:
+                    mascara &= registros_fiscal[filtro] == valor
+                conteos[campo] = int(mascara.sum())
+            if any(conteos.values()):
+                filas.append({'nombre_fiscal': fiscal, 'fecha': dia, **conteos})
+    return pd.DataFrame(filas)
+
+
+def carga_laboral_con_fechas_python(df, contexto):
+    # Fechas de la carga laboral: normalizar las pasaba a date (dtype object), cada máscara
+    # comparaba objetos date y agregar las volvía a convertir sobre una copia del mes
+    from apps.api.functions import CONTADORES_CARGA, rangos_carga_laboral
+
+    df['fecha_ingreso'] = pd.to_datetime(df['fecha_ingreso'], dayfirst=True, errors='coerce').dt.date
+    df['fecha_conclusion'] = pd.to_datetime(df['fecha_conclusion'], dayfirst=True, errors='coerce').dt.date
+    meses, rangos = rangos_carga_laboral(contexto.periodo)
+    (inicio_mes, fin_mes), = meses
+
+    materias = []
+    for inicio, fin in rangos:
+        df_filtrado = df[(df['fecha_ingreso'] >= inicio) & (df['fecha_ingreso'] <= fin)]
+        conteo = df_filtrado['materia_delito'].value_counts()
+        materias.append((inicio, conteo[conteo > 0]))
+
+    df_mes_actual = df[(df['fecha_ingreso'] >= inicio_mes) & (df['fecha_ingreso'] <= fin_mes)].copy()
+    df_mes_actual['fecha_ingreso'] = pd.to_datetime(df_mes_actual['fecha_ingreso'], errors='coerce')
+    df_mes_actual['fecha_conclusion'] = pd.to_datetime(df_mes_actual['fecha_conclusion'], errors='coerce')
+    df_mes_actual['fecha_ingreso'] = df_mes_actual['fecha_ingreso'].where(df_mes_actual['fecha_ingreso'].notna(), None)
+    df_mes_actual['fecha_conclusion'] = df_mes_actual['fecha_conclusion'].where(df_mes_actual['fecha_conclusion'].notna(), None)
+    df_mes_actual['resuelto_bin'] = (df_mes_actual['condicion'] == 'RESUELTO').astype(int)
+    df_mes_actual['tramite_bin'] = (df_mes_actual['condicion'] == 'EN TRAMITE').astype(int)
+    conteo_fiscales = df_mes_actual.groupby('nombre_fiscal', observed=True).agg(
+        total_tramite=('estado', 'count'),
+        resuelto_mes=('resuelto_bin', 'sum'),
+        tramite_mes=('tramite_bin', 'sum'),
+        fecha_ingreso=('fecha_ingreso', 'min'),
+        fecha_conclusion=('fecha_conclusion', 'max'),
+    ).reset_index()
+
+    campos = [campo for campo, _, _, _ in CONTADORES_CARGA]
+    eventos = []
+    for columna_fecha in ('fecha_ingreso', 'fecha_conclusion'):
+        fechas = df[columna_fecha]
+        en_rango = (fechas >= inicio_mes) & (fechas <= fin_mes)
+        bloque = pd.DataFrame({'nombre_fiscal': df['nombre_fiscal'], 'fecha': fechas})
+        contadores = [c for c in CONTADORES_CARGA if c[1] == columna_fecha]
+        for campo, _, filtro, valor in contadores:
+            marca = en_rango if filtro is None else en_rango & (df[filtro] == valor)
+            bloque[campo] = marca.astype(int)
+        eventos.append(bloque[bloque[[c[0] for c in contadores]].any(axis=1)])
+    eventos = pd.concat(eventos, ignore_index=True)
+    eventos[campos] = eventos[campos].fillna(0).astype(int)
+    carga = eventos.groupby(['nombre_fiscal', 'fecha'], sort=True, observed=True)[campos].sum().reset_index()
+
+    return {'materias': materias, 'tramites': conteo_fiscales, 'carga': carga}
+
+
+def plazos_por_filas(df):
+    # Plazos: iterrows x seis tripletas
+    from apps.api.functions import TIPOS_CASO_PLAZOS
+
+    filas = []
+    for _, row in df.iterrows():
+        for i in range(1, 7):
+            v_val, a_val, r_val = row[f'v{i}'], row[f'a{i}'], row[f'r{i}']
+            if v_val == 0 and a_val == 0 and r_val == 0:
+                continue
+            filas.append({
+                'nombre_fiscal': f"{row['ap_fiscal']} {row['no_fiscal']}",
+                'tipo_caso': TIPOS_CASO_PLAZOS[i - 1],
+                'dentro_plazo': v_val,
+                'por_vencer': a_val,
+                'vencidos': r_val,
+            })
+    return pd.DataFrame(filas)
+
+
+def carga_total_por_filas(df):
+    # CargaTotal: iterrows con row.get por columna
+    filas = []
+    for _, row in df.iterrows():
+        asignados = row.get('asig', 0)
+        total_tramite = (
+                row.get('pend', 0) + row.get('calif', 0) + row.get('preli', 0) +
+                row.get('pnp', 0) + row.get('prepa', 0) + row.get('inter', 0) +
+                row.get('juzga', 0)
+        )
+        filas.append({
+            'nombre_fiscal': f"{row.get('apell', '').strip()} {row.get('nomb', '').strip()}",
+            'asignados': asignados,
+            'pendientes': row.get('pend', 0),
+            'calificados': row.get('calif', 0),
+            'preliminares': row.get('preli', 0),
+            'investigacion_pnp': row.get('pnp', 0),
+            'investigacion_preparatoria': row.get('prepa', 0),
+            'etapa_intermedia': row.get('inter', 0),
+            'etapa_juzgamiento': row.get('juzga', 0),
+            'total_tramite': total_tramite,
+            'tramite_historico': asignados - total_tramite,
+        })
+    return pd.DataFrame(filas)
@@ -1,4 +1,5 @@
 import django
+import multiprocessing
 import os
 import sys
 
@@ -13,14 +14,19 @@ django.setup()
 from apps.api.procesar_archivos import procesar_archivos
 
 if __name__ == '__main__':
+    # El ejecutable de PyInstaller vuelve a arrancarse en cada proceso del pool (spawn); sin esto
+    # cada hijo ejecutaría el script completo en lugar de atender las tareas
+    multiprocessing.freeze_support()
     mes = input("Ingrese el mes (MM): ")
     anio = input("Ingrese el año (YYYY): ")
+    hasta = input("Carga laboral hasta (AAAA-MM, Enter = solo ese mes): ") or None
+    procesos = input("Procesos en paralelo (Enter = 1): ") or 1
 
-    resultados = procesar_archivos(mes, anio)
+    resultados = procesar_archivos(mes, anio, procesos=procesos, hasta=hasta)
 
     for r in resultados:
         if 'error' in r:
-            print(f"[ERROR] {r['tipo']} - {r['dependencia']}: {r['error']}")
+            print(f"[ERROR] {r['tipo']} - {r['dependencia']}: {r['error']} ({r['duracion']} s)")
         else:
-            print(f"[OK] {r['tipo']} - {r['dependencia']}: {r['mensaje']}")
+            print(f"[OK] {r['tipo']} - {r['dependencia']}: {r['mensaje']} ({r['duracion']} s)")
     input("\nPresiona Enter para salir...")
\ No newline at end of file
@@ -1,5 +1,22 @@
+from django.conf import settings
 from rest_framework import serializers
-from apps.modelos.models import CargaSiatf,PlazosDetalle
+from apps.modelos.models import CargaSiatf,PlazosDetalle, TrabajoIngesta, ArchivoTrabajo, IndicadorCarga, IndicadorPlazos, IndicadorMateriaDelito, EjecucionIngesta
+from apps.api.ingestas import PATRON_PERIODO, contar_meses, formatear_periodo
+
+
+def validar_hasta(datos):
+    # `hasta` no puede ser anterior a mes/anio ni abarcar más de INGESTA_MAX_MESES_RANGO meses:
+    # cada mes del rango se borra, se escribe y refresca sus indicadores en la misma transacción
+    if not datos['hasta']:
+        return datos
+    meses = contar_meses(formatear_periodo(datos['mes'], datos['anio']), datos['hasta'])
+    maximo = getattr(settings, 'INGESTA_MAX_MESES_RANGO', 24)
+    if meses < 1:
+        raise serializers.ValidationError({'hasta': 'Debe ser igual o posterior a mes/anio.'})
+    if meses > maximo:
+        raise serializers.ValidationError({'hasta': f'El rango no puede abarcar más de {maximo} meses.'})
+    return datos
+
 
 class PlazosDetalladoCrearSerializer(serializers.Serializer):
     file = serializers.FileField()
@@ -14,6 +31,32 @@ class CargaCrearSerializer(serializers.Serializer):
     dependencia = serializers.CharField()
     mes = serializers.IntegerField(min_value=1, max_value=12)
     anio = serializers.IntegerField(min_value=2000, max_value=2100)
+    # Sin indicarlo se usa INGESTA_REEMPLAZAR_PERIODO
+    reemplazar = serializers.BooleanField(required=False, allow_null=True, default=None)
+    # AAAA-MM: carga del mismo export todos los meses desde mes/anio hasta este inclusive
+    hasta = serializers.RegexField(PATRON_PERIODO, required=False, allow_null=True, default=None)
+
+    def validate(self, datos):
+        return validar_hasta(datos)
+
+class TrabajoIngestaCrearSerializer(serializers.Serializer):
+    mes = serializers.IntegerField(min_value=1, max_value=12)
+    anio = serializers.IntegerField(min_value=2000, max_value=2100)
+    # Sin indicarlo se usa INGESTA_PROCESOS
+    procesos = serializers.IntegerField(required=False, allow_null=True, default=None)
+    # AAAA-MM: la carga laboral se procesa para todos los meses desde mes/anio hasta este inclusive
+    hasta = serializers.RegexField(PATRON_PERIODO, required=False, allow_blank=True, default='')
+
+    def validate_procesos(self, procesos):
+        if procesos is None:
+            return getattr(settings, 'INGESTA_PROCESOS', 1)
+        maximo = getattr(settings, 'INGESTA_PROCESOS_MAX', 4)
+        if not 1 <= procesos <= maximo:
+            raise serializers.ValidationError(f'Debe estar entre 1 y {maximo}.')
+        return procesos
+
+    def validate(self, datos):
+        return validar_hasta(datos)
 
 class CargaTotalSerializer(serializers.Serializer):
     file = serializers.FileField()
@@ -23,8 +66,46 @@ class CargaSiatfSerializer(serializers.Serializer):
     file = serializers.FileField()
     dependencia = serializers.CharField()
 
+class ArchivoTrabajoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivoTrabajo
+        fields = ['tipo', 'archivo', 'dependencia', 'estado', 'mensaje', 'duracion']
+
+class TrabajoIngestaSerializer(serializers.ModelSerializer):
+    archivos = ArchivoTrabajoSerializer(many=True, read_only=True)
 
+    class Meta:
+        model = TrabajoIngesta
+        fields = [
+            'id', 'mes', 'anio', 'hasta', 'procesos', 'estado', 'total_archivos', 'archivos_procesados',
+            'error', 'fecha_creacion', 'fecha_inicio', 'fecha_fin', 'archivos',
+        ]
 
+class IndicadorCargaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IndicadorCarga
+        fields = [
+            'dependencia', 'nombre_fiscal', 'periodo', 'casos_ingresados', 'casos_resueltos', 'casos_en_tramite',
+            'sentencias', 'archivos_consentidos', 'archivo_califica', 'archivo_preliminar', 'fecha_actualizacion',
+        ]
 
+class IndicadorPlazosSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IndicadorPlazos
+        fields = [
+            'dependencia', 'nombre_fiscal', 'periodo', 'fuente', 'dentro_plazo', 'por_vencer', 'vencidos',
+            'total', 'cumplimiento', 'fecha_actualizacion',
+        ]
 
+class IndicadorMateriaDelitoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IndicadorMateriaDelito
+        fields = ['dependencia', 'periodo', 'posicion', 'materia', 'cantidad', 'fecha_actualizacion']
 
+class EjecucionIngestaSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EjecucionIngesta
+        fields = [
+            'id', 'tipo', 'dependencia', 'periodo', 'archivo', 'estado', 'mensaje', 'duracion',
+            'filas_leidas', 'filas_escritas', 'memoria_pico', 'etapas', 'ingesta', 'fecha_creacion',
+        ]
@@ -0,0 +1,502 @@
+import io
+import importlib.util
+from datetime import date
+from unittest import skipUnless
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.api.functions import (
+    agregar_carga_diaria, agregar_plazos_detallado, expandir_plazos, limpiar_plazos_detallado, procesar_carga_laboral,
+    procesar_carga_siatf, resumir_carga_total,
+)
+from apps.api.esquemas import ESQUEMAS
+from apps.api.ingestas import MENSAJE_YA_PROCESADO, preparar_ingesta
+from apps.api.lectura import CODIFICACIONES, detectar_codificacion, leer_tabla
+from apps.api.motores import PANDAS, MotorPolars
+from apps.api.persistencia import EscritorMasivo, _valor_csv
+from apps.api.pipeline import Pipeline
+from apps.modelos.models import (
+    Carga, CargaSiatf, CargaTotal, EjecucionIngesta, Plazos, PlazosDetalle, RegistroIngesta, TramitesMensual,
+    Usuario,
+)
+
+HAY_POLARS = all(importlib.util.find_spec(paquete) is not None for paquete in ('polars', 'pyarrow'))
+
+
+def motores():
+    return [PANDAS, MotorPolars()] if HAY_POLARS else [PANDAS]
+
+
+def fechas(*valores):
+    return pd.to_datetime(pd.Series(valores, dtype=object))
+
+
+class MotorPandasTests(SimpleTestCase):
+
+    def test_sumar_ordena_por_claves_y_descarta_vacias(self):
+        df = pd.DataFrame({
+            'fiscal': pd.Categorical(['B', 'A', None, 'B'], categories=['A', 'B', 'C']),
+            'casos': [1, 2, 3, 4],
+        })
+        resultado = PANDAS.sumar(df, ['fiscal'])
+        self.assertEqual(resultado['fiscal'].tolist(), ['A', 'B'])
+        self.assertEqual(resultado['casos'].tolist(), [2, 5])
+
+    def test_contar(self):
+        df = pd.DataFrame({'estado': ['X', 'Y', 'X', None]})
+        resultado = PANDAS.contar(df, ['estado'], 'total')
+        self.assertEqual(resultado.to_dict('records'), [{'estado': 'X', 'total': 2}, {'estado': 'Y', 'total': 1}])
+
+
+@skipUnless(HAY_POLARS, 'requiere polars y pyarrow')
+class MotorPolarsTests(SimpleTestCase):
+    # El motor de Polars tiene que devolver lo mismo que el de pandas, tipos y categorías incluidos
+
+    def setUp(self):
+        self.polars = MotorPolars()
+
+    def comparar(self, operacion, df, claves, *args):
+        esperado = getattr(PANDAS, operacion)(df.copy(), claves, *args)
+        obtenido = getattr(self.polars, operacion)(df.copy(), claves, *args)
+        pd.testing.assert_frame_equal(esperado, obtenido)
+        return obtenido
+
+    def test_sumar_claves_categoricas(self):
+        # Categorías fuera de orden alfabético y sin usar: se ordena por el orden de las categorías
+        df = pd.DataFrame({
+            'fiscal': pd.Categorical(['B', 'A', 'B', 'A', 'B'], categories=['B', 'A', 'Z']),
+            'etapa': pd.Categorical(['X', 'X', 'Y', 'X', 'X']),
+            'dentro_plazo': [1, 0, 1, 1, 0],
+            'vencidos': [True, False, True, True, False],
+        })
+        resultado = self.comparar('sumar', df, ['fiscal', 'etapa'])
+        self.assertEqual(resultado['fiscal'].tolist(), ['B', 'B', 'A'])
+        self.assertEqual(list(resultado['fiscal'].cat.categories), ['B', 'A', 'Z'])
+        self.assertEqual(resultado['vencidos'].dtype, np.int64)
+
+    def test_sumar_claves_vacias(self):
+        df = pd.DataFrame({
+            'fiscal': pd.Categorical(['A', None, 'B', 'A']),
+            'estado': ['X', 'X', None, np.nan],
+            'casos': [1, 2, 3, 4],
+        })
+        resultado = self.comparar('sumar', df, ['fiscal', 'estado'])
+        self.assertEqual(resultado.to_dict('records'), [{'fiscal': 'A', 'estado': 'X', 'casos': 1}])
+
+    def test_sumar_claves_de_texto(self):
+        # Parciales de bloques con categorías distintas se concatenan como texto
+        df = pd.DataFrame({'fiscal': ['PEÑA', 'PEREZ', 'ÁLVAREZ', 'PEÑA'], 'casos': [1, 2, 3, 4], 'horas': [0.5, 1.0, 1.5, 2.0]})
+        self.comparar('sumar', df, ['fiscal'])
+
+    def test_sumar_claves_de_fecha(self):
+        df = pd.DataFrame({
+            'nombre_fiscal': pd.Categorical(['A', 'A', 'B', 'A']),
+            'fecha': fechas('2025-03-02', '2025-03-01', '2025-03-01', None),
+            'casos_ingresados': [1, 1, 1, 1],
+        })
+        resultado = self.comparar('sumar', df, ['nombre_fiscal', 'fecha'])
+        self.assertEqual(len(resultado), 3)
+
+    def test_contar(self):
+        df = pd.DataFrame({
+            'periodo': fechas('2025-03-01', '2025-02-01', '2025-03-01', None),
+            'materia': pd.Categorical(['ROBO', 'HURTO', 'ROBO', 'ROBO']),
+        })
+        resultado = self.comparar('contar', df, ['periodo', 'materia'], 'cantidad')
+        self.assertEqual(resultado['cantidad'].tolist(), [1, 2])
+
+    def test_sin_filas(self):
+        df = pd.DataFrame({
+            'fiscal': pd.Categorical([], categories=['A']),
+            'fecha': pd.Series([], dtype='datetime64[ns]'),
+            'casos': pd.Series([], dtype='int64'),
+        })
+        self.comparar('sumar', df, ['fiscal', 'fecha'])
+        self.comparar('contar', df[['fiscal', 'fecha']], ['fiscal', 'fecha'], 'cantidad')
+
+    def test_sumar_datos_aleatorios(self):
+        rng = np.random.default_rng(0)
+        filas = 5_000
+        fiscal = pd.Series(np.array(['A', 'B', 'C', None], dtype=object)[rng.integers(0, 4, filas)])
+        df = pd.DataFrame({
+            'fiscal': fiscal.astype('category'),
+            'fecha': pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 60, filas), unit='D'),
+            'resueltos': rng.random(filas) < 0.3,
+            'ingresados': rng.integers(0, 3, filas),
+        })
+        self.comparar('sumar', df, ['fiscal', 'fecha'])
+        self.comparar('contar', df[['fiscal', 'fecha']], ['fiscal', 'fecha'], 'cantidad')
+
+
+class CargaDiariaTests(SimpleTestCase):
+    # Contadores diarios de Carga por fiscal: cada caso cuenta el día de ingreso y el de conclusión
+    # si caen en el mes; los fiscales vacíos y los días sin ningún contador no generan fila
+
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'nombre_fiscal': pd.Categorical(['F1', 'F1', 'F2', 'F2', None]),
+            'fecha_ingreso': fechas('2025-03-03', '2025-03-03', '2025-02-28', '2025-04-01', '2025-03-10'),
+            'fecha_conclusion': fechas('2025-03-05', None, '2025-03-01', None, None),
+            'estado': ['CON SENTENCIA', 'ARCHIVO CONSENTIDO', 'CON ARCHIVO (PRELIMINAR)', 'CON SENTENCIA', 'CON SENTENCIA'],
+            'condicion': ['RESUELTO', 'EN TRAMITE', 'RESUELTO', 'RESUELTO', 'RESUELTO'],
+        })
+
+    def fila(self, fiscal, dia, **contadores):
+        campos = [
+            'casos_resueltos', 'casos_ingresados', 'casos_en_tramite', 'archivo_preliminar',
+            'archivo_califica', 'archivos_consentidos', 'sentencias',
+        ]
+        return {'nombre_fiscal': fiscal, 'fecha': dia, **{campo: contadores.get(campo, 0) for campo in campos}}
+
+    def test_contadores_por_fiscal_y_dia(self):
+        esperado = [
+            self.fila('F1', date(2025, 3, 3), casos_ingresados=2, casos_en_tramite=1),
+            self.fila('F1', date(2025, 3, 5), casos_resueltos=1, sentencias=1),
+            self.fila('F2', date(2025, 3, 1), casos_resueltos=1, archivo_preliminar=1),
+        ]
+        for motor in motores():
+            with self.subTest(motor=motor.nombre):
+                carga = agregar_carga_diaria(self.df, date(2025, 3, 1), date(2025, 3, 31), motor)
+                self.assertEqual(carga.to_dict('records'), esperado)
+
+    def test_fuera_del_rango(self):
+        carga = agregar_carga_diaria(self.df, date(2025, 5, 1), date(2025, 5, 31))
+        self.assertEqual(len(carga), 0)
+
+
+class PlazosDetalladoTests(SimpleTestCase):
+    # verde.jpg cuenta dentro de plazo y rojo.jpg vencido; cualquier otro color queda por vencer
+    # mientras los días no alcancen el plazo y vencido después
+
+    def test_clasificacion_por_fiscal_etapa_y_estado(self):
+        df = limpiar_plazos_detallado(pd.DataFrame({
+            'fiscal': [' PEÑA ', 'PEÑA', 'PEÑA', 'PEÑA', 'PEÑA', 'PEÑA', 'ROJAS'],
+            'etapa': ['CALIFICACIÓN'] * 6 + ['PRELIMINAR'],
+            'estado': ['EN TRÁMITE'] * 6 + ['RESUELTO'],
+            'color': [' verde.jpg', 'rojo.jpg', 'amarillo.jpg', 'amarillo.jpg', None, 'amarillo.jpg', 'rojo.jpg'],
+            'plazo': ['30', 10, 10, 10, 5, 'x', 90],
+            'dias': [40, 1, 5, 10, 1, 3, 1],
+        }))
+        esperado = [
+            {'fiscal': 'PEÑA', 'etapa': 'CALIFICACIÓN', 'estado': 'EN TRÁMITE', 'dentro_plazo': 1, 'por_vencer': 2, 'vencidos': 3},
+            {'fiscal': 'ROJAS', 'etapa': 'PRELIMINAR', 'estado': 'RESUELTO', 'dentro_plazo': 0, 'por_vencer': 0, 'vencidos': 1},
+        ]
+        for motor in motores():
+            with self.subTest(motor=motor.nombre):
+                self.assertEqual(agregar_plazos_detallado(df.copy(), motor).to_dict('records'), esperado)
+
+
+class PlazosTests(SimpleTestCase):
+    # Cada fila del export da una fila por tipo de caso con algún conteo, en el orden del archivo
+
+    def export(self, **tripletas):
+        df = pd.DataFrame({'ap_fiscal': ['PEREZ', None], 'no_fiscal': ['JUAN', 'ANA']})
+        for i in range(1, 7):
+            for prefijo in 'var':
+                df[f'{prefijo}{i}'] = tripletas.get(f'{prefijo}{i}', [0, 0])
+        return df
+
+    def test_una_fila_por_tipo_de_caso_con_conteos(self):
+        df = self.export(v1=[1, 0], a3=[2, 0], r3=[3, 0], r6=[0, 1], v2=[0, 4])
+        self.assertEqual(expandir_plazos(df).to_dict('records'), [
+            {'nombre_fiscal': 'PEREZ JUAN', 'tipo_caso': 'Calificación', 'dentro_plazo': 1, 'por_vencer': 0, 'vencidos': 0},
+            {'nombre_fiscal': 'PEREZ JUAN', 'tipo_caso': 'Investigación Preliminar(P.N.P.)', 'dentro_plazo': 0, 'por_vencer': 2, 'vencidos': 3},
+            {'nombre_fiscal': 'nan ANA', 'tipo_caso': 'Investigación Preliminar(Fiscal)', 'dentro_plazo': 4, 'por_vencer': 0, 'vencidos': 0},
+            {'nombre_fiscal': 'nan ANA', 'tipo_caso': 'Investigación Preliminar Pérdida Dominio', 'dentro_plazo': 0, 'por_vencer': 0, 'vencidos': 1},
+        ])
+
+    def test_tripletas_incompletas_y_sin_conteos(self):
+        df = self.export(v6=[5, 0]).drop(columns=['r6'])
+        resultado = expandir_plazos(df)
+        self.assertEqual(len(resultado), 0)
+        self.assertEqual(list(resultado.columns), ['nombre_fiscal', 'tipo_caso', 'dentro_plazo', 'por_vencer', 'vencidos'])
+
+
+class CargaTotalTests(SimpleTestCase):
+    # total_tramite suma todos los conteos menos lo asignado y tramite_historico es la diferencia;
+    # los conteos vacíos, no numéricos o de columnas que no vienen en el export cuentan como 0
+
+    def test_resumen_por_fiscal(self):
+        df = pd.DataFrame({
+            'apell': [' PEREZ ', 'ROJAS'],
+            'nomb': ['JUAN ', ' ANA'],
+            'asig': [100, 'x'],
+            'pend': [1, 10],
+            'calif': [2, np.nan],
+            'preli': [3, 0],
+            'pnp': [4, 0],
+            'prepa': [5, 0],
+            'inter': [6, 0],
+        })
+        resultado = resumir_carga_total(df)
+        self.assertEqual(resultado.to_dict('records'), [
+            {
+                'nombre_fiscal': 'PEREZ JUAN', 'asignados': 100, 'pendientes': 1, 'calificados': 2, 'preliminares': 3,
+                'investigacion_pnp': 4, 'investigacion_preparatoria': 5, 'etapa_intermedia': 6, 'etapa_juzgamiento': 0,
+                'total_tramite': 21, 'tramite_historico': 79,
+            },
+            {
+                'nombre_fiscal': 'ROJAS ANA', 'asignados': 0, 'pendientes': 10, 'calificados': 0, 'preliminares': 0,
+                'investigacion_pnp': 0, 'investigacion_preparatoria': 0, 'etapa_intermedia': 0, 'etapa_juzgamiento': 0,
+                'total_tramite': 10, 'tramite_historico': -10,
+            },
+        ])
+        self.assertTrue(all(resultado[columna].dtype == np.int64 for columna in resultado.columns[1:]))
+
+
+class LecturaTests(SimpleTestCase):
+    # Los CSV latin1 subidos por las vistas llegan como UploadedFile de Django y tienen que
+    # decodificarse igual que el mismo archivo abierto en binario por la carga masiva
+
+    CONTENIDO = 'apell,nomb,asig\nPEÑA,MARÍA,3\nRÍOS,JUAN,1\n'.encode('latin1')
+
+    def leer(self, file):
+        return pd.concat(leer_tabla(file, 'latin1', None, ESQUEMAS['carga_total']), ignore_index=True)
+
+    def test_csv_latin1_subido(self):
+        df = self.leer(SimpleUploadedFile('carga.csv', self.CONTENIDO))
+        self.assertEqual(df['apell'].tolist(), ['PEÑA', 'RÍOS'])
+        self.assertEqual(df['nomb'].tolist(), ['MARÍA', 'JUAN'])
+
+    @skipUnless(importlib.util.find_spec('pyarrow'), 'requiere pyarrow')
+    @override_settings(INGESTA_MOTOR_CSV='pyarrow')
+    def test_csv_latin1_subido_con_arrow(self):
+        df = self.leer(SimpleUploadedFile('carga.csv', self.CONTENIDO))
+        self.assertEqual(df['apell'].tolist(), ['PEÑA', 'RÍOS'])
+        self.assertEqual(df['nomb'].tolist(), ['MARÍA', 'JUAN'])
+
+    def test_codificacion_latin1_con_utf8_predeterminada(self):
+        # chardet da Johab como la más probable para estos bytes
+        CODIFICACIONES.clear()
+        encoding = detectar_codificacion(io.BytesIO(self.CONTENIDO * 50), predeterminada='utf-8')
+        self.assertEqual((self.CONTENIDO * 50).decode(encoding), self.CONTENIDO.decode('latin1') * 50)
+
+
+class VistasIngestaTests(TestCase):
+    # Los mismos archivos latin1 que procesa la carga masiva, subidos por las vistas
+
+    def setUp(self):
+        CODIFICACIONES.clear()
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(Usuario.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+
+    def subir(self, url, nombre, lineas, **datos):
+        contenido = '\n'.join(lineas).encode('latin1')
+        archivo = SimpleUploadedFile(nombre, contenido, content_type='text/csv')
+        return self.cliente.post(url, {'file': archivo, 'dependencia': 'DEP', **datos}, format='multipart')
+
+    def test_carga_total_latin1(self):
+        respuesta = self.subir('/api/v1/cargaTotal/', 'resumen.csv', [
+            'apell,nomb,asig,pend,calif,preli,pnp,prepa,inter,juzga',
+            'PEÑA,MARÍA,10,1,1,1,1,1,1,1',
+            'RÍOS,JUAN,5,0,0,0,0,0,0,0',
+        ])
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertEqual(
+            sorted(CargaTotal.objects.values_list('nombre_fiscal', flat=True)), ['PEÑA MARÍA', 'RÍOS JUAN']
+        )
+
+    def test_plazos_latin1(self):
+        respuesta = self.subir('/api/v1/crearPlazos/', 'plazos.csv', [
+            'ap_fiscal,no_fiscal,' + ','.join(f'{prefijo}{i}' for i in range(1, 7) for prefijo in 'var'),
+            'PEÑA,MARÍA,1,2,3' + ',0' * 15,
+        ])
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertEqual(
+            list(Plazos.objects.values_list('nombre_fiscal', 'tipo_caso', 'dentro_plazo', 'por_vencer', 'vencidos')),
+            [('PEÑA MARÍA', 'Calificación', 1, 2, 3)],
+        )
+
+    def test_plazos_detallado_latin1(self):
+        respuesta = self.subir('/api/v1/plazosDetalle', 'detallado.csv', [
+            'fiscal,etapa,estado,color,plazo,dias',
+            'PEÑA MARÍA,CALIFICACIÓN,EN TRÁMITE,verde.jpg,30,5',
+            'PEÑA MARÍA,CALIFICACIÓN,EN TRÁMITE,rojo.jpg,30,50',
+        ])
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertEqual(
+            list(PlazosDetalle.objects.values_list('nombre_fiscal', 'etapa', 'estado', 'dentro_plazo', 'vencidos')),
+            [('PEÑA MARÍA', 'CALIFICACIÓN', 'EN TRÁMITE', 1, 1)],
+        )
+
+
+class CargaLaboralTests(TestCase):
+    # El export de carga laboral es un xls; se lee como lo devolvería read_excel, fechas en dd/mm/aaaa
+
+    def export(self, *casos):
+        return pd.DataFrame(casos, columns=['no_fiscal', 'fe_ing_caso', 'fe_conclusion', 'de_estado', 'condicion', 'de_mat_deli'])
+
+    def procesar(self, contenido, df, mes, anio, **opciones):
+        with patch.object(pd, 'read_excel', return_value=df):
+            return procesar_carga_laboral(SimpleUploadedFile('carga.xls', contenido), 'DEP', mes, anio, **opciones)
+
+    def test_sin_reemplazo_sobre_un_mes_del_rango(self):
+        primero = self.export(
+            ('PEÑA', '03/03/2025', None, 'EN TRAMITE', 'EN TRAMITE', 'ROBO'),
+            ('PEÑA', '07/04/2025', None, 'EN TRAMITE', 'EN TRAMITE', 'ROBO'),
+        )
+        _, estado = self.procesar(b'rango', primero, 3, 2025, reemplazar=True, hasta='2025-04')
+        self.assertEqual(estado, 201)
+
+        # El mismo día del mismo fiscal ya está: se actualizan sus contadores en lugar de duplicarlo
+        segundo = self.export(
+            ('PEÑA', '03/03/2025', None, 'EN TRAMITE', 'EN TRAMITE', 'ROBO'),
+            ('PEÑA', '03/03/2025', '10/03/2025', 'CON SENTENCIA', 'RESUELTO', 'ROBO'),
+        )
+        datos, estado = self.procesar(b'marzo', segundo, 3, 2025, reemplazar=False)
+        self.assertEqual(estado, 201, datos)
+        self.assertEqual(
+            list(Carga.objects.order_by('fecha').values_list('fecha', 'casos_ingresados', 'casos_resueltos')),
+            [(date(2025, 3, 3), 2, 0), (date(2025, 3, 10), 0, 1), (date(2025, 4, 7), 1, 0)],
+        )
+
+
+class RegistroIngestaTests(TestCase):
+    # Un archivo se reconoce por su hash dentro de (tipo, dependencia, periodo)
+
+    def siatf(self, *filas):
+        return SimpleUploadedFile('siatf.csv', '\n'.join(['de_esp,de_estado', *filas]).encode('latin1'))
+
+    def conteos(self):
+        return sorted(CargaSiatf.objects.values_list('especialidad', 'estado', 'cantidad'))
+
+    def test_preparar_ingesta(self):
+        archivo = self.siatf('CIVIL,EN TRAMITE')
+        with transaction.atomic():
+            registro, ya_procesado = preparar_ingesta(archivo, 'carga_siatf', 'DEP', '2025-03')
+        self.assertFalse(ya_procesado)
+        with transaction.atomic():
+            self.assertEqual(preparar_ingesta(archivo, 'carga_siatf', 'DEP', '2025-03'), (registro, True))
+        # Otro periodo es otro registro
+        with transaction.atomic():
+            otro, ya_procesado = preparar_ingesta(archivo, 'carga_siatf', 'DEP', '2025-04')
+        self.assertNotEqual(otro, registro)
+        self.assertFalse(ya_procesado)
+
+    def test_mismo_archivo_no_se_vuelve_a_escribir(self):
+        procesar_carga_siatf(self.siatf('CIVIL,EN TRAMITE', 'PENAL,EN TRAMITE'), 'DEP', '2025-03')
+        with patch('apps.api.functions.EscritorMasivo') as escritor:
+            datos, estado = procesar_carga_siatf(self.siatf('CIVIL,EN TRAMITE', 'PENAL,EN TRAMITE'), 'DEP', '2025-03')
+        self.assertEqual((datos, estado), ({'mensaje': MENSAJE_YA_PROCESADO}, 200))
+        escritor.assert_not_called()
+        self.assertEqual(self.conteos(), [('CIVIL', 'EN TRAMITE', 1), ('PENAL', 'EN TRAMITE', 1)])
+        self.assertEqual(EjecucionIngesta.objects.latest('id').estado, EjecucionIngesta.OMITIDO)
+
+    def test_archivo_cambiado_reemplaza_sus_filas(self):
+        procesar_carga_siatf(self.siatf('CIVIL,EN TRAMITE', 'PENAL,ARCHIVADO'), 'DEP', '2025-03')
+        _, estado = procesar_carga_siatf(self.siatf('CIVIL,EN TRAMITE', 'CIVIL,EN TRAMITE'), 'DEP', '2025-03')
+        self.assertEqual(estado, 201)
+        # PENAL solo estaba en la versión anterior del archivo
+        self.assertEqual(self.conteos(), [('CIVIL', 'EN TRAMITE', 2)])
+        self.assertEqual(RegistroIngesta.objects.count(), 1)
+
+    def test_error_en_una_etapa_no_deja_nada_escrito(self):
+        def escribir(resultados, contexto):
+            for df in resultados:
+                CargaSiatf.objects.create(dependencia='DEP', especialidad='CIVIL', estado='EN TRAMITE', ingesta=contexto.registro)
+
+        def refrescar(contexto):
+            raise ValueError('indicadores no disponibles')
+
+        pipeline = Pipeline('prueba', leer=lambda contexto: [pd.DataFrame({'a': [1]})], escribir=escribir, refrescar=refrescar)
+        datos, estado = pipeline.ejecutar(self.siatf('CIVIL,EN TRAMITE'), 'DEP', '2025-03')
+        self.assertEqual((datos, estado), ({'error': 'indicadores no disponibles'}, 400))
+        self.assertFalse(CargaSiatf.objects.exists())
+        self.assertFalse(RegistroIngesta.objects.exists())
+        self.assertEqual(EjecucionIngesta.objects.get().estado, EjecucionIngesta.ERROR)
+
+
+class ValorCsvTests(SimpleTestCase):
+    # Campos del CSV que se le pasa a COPY
+
+    def test_valores(self):
+        self.assertEqual(_valor_csv(None), '')
+        self.assertEqual(_valor_csv(''), '""')
+        self.assertEqual(_valor_csv('PEÑA, MARÍA "LA FISCAL"'), '"PEÑA, MARÍA ""LA FISCAL"""')
+        self.assertEqual(_valor_csv('línea\nsiguiente'), '"línea\nsiguiente"')
+        self.assertEqual(_valor_csv(date(2025, 3, 1)), '2025-03-01')
+        self.assertEqual(_valor_csv(True), 'True')
+        self.assertEqual(_valor_csv(False), 'False')
+        self.assertEqual(_valor_csv(7), '7')
+
+
+class EscritorMasivoTests(TestCase):
+
+    def tramite(self, fiscal, total=1, **campos):
+        return TramitesMensual(dependencia='DEP', nombre_fiscal=fiscal, periodo=date(2025, 3, 1), total_tramite=total, **campos)
+
+    def guardados(self):
+        return list(TramitesMensual.objects.order_by('nombre_fiscal').values_list('nombre_fiscal', 'total_tramite', 'ingesta'))
+
+    def test_inserta_por_lotes(self):
+        with patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=QuerySet.bulk_create) as bulk_create:
+            with EscritorMasivo(TramitesMensual, batch_size=2, usar_copy=False) as escritor:
+                escritor.agregar_todos(self.tramite(f'F{i}') for i in range(5))
+        self.assertEqual(escritor.total, 5)
+        self.assertEqual([len(llamada.args[1]) for llamada in bulk_create.call_args_list], [2, 2, 1])
+        self.assertEqual(TramitesMensual.objects.count(), 5)
+
+    def test_upsert_por_campos_unicos(self):
+        registro = RegistroIngesta.objects.create(tipo='carga_laboral', dependencia='DEP', periodo='2025-03', hash_contenido='x')
+        TramitesMensual.objects.bulk_create([self.tramite('F1', 1), self.tramite('F2', 2)])
+        with EscritorMasivo(TramitesMensual, campos_unicos=['dependencia', 'nombre_fiscal', 'periodo']) as escritor:
+            escritor.agregar_todos([self.tramite('F1', 10, ingesta=registro), self.tramite('F3', 3, ingesta=registro)])
+        self.assertEqual(self.guardados(), [('F1', 10, registro.id), ('F2', 2, None), ('F3', 3, registro.id)])
+
+    def test_upsert_solo_campos_actualizar(self):
+        TramitesMensual.objects.create(dependencia='DEP', nombre_fiscal='F1', periodo=date(2025, 3, 1), total_tramite=1, tramite_mes=5)
+        with EscritorMasivo(
+            TramitesMensual, campos_unicos=['dependencia', 'nombre_fiscal', 'periodo'], campos_actualizar=['total_tramite'],
+        ) as escritor:
+            escritor.agregar(self.tramite('F1', 10, tramite_mes=0))
+        self.assertEqual(
+            list(TramitesMensual.objects.values_list('total_tramite', 'tramite_mes')), [(10, 5)]
+        )
+
+    @skipUnless(connection.vendor == 'postgresql', 'COPY requiere PostgreSQL')
+    def test_copy(self):
+        fiscales = ['PEÑA, MARÍA', 'RÍOS "EL FISCAL"', '', 'OTRO\nRENGLÓN']
+        with EscritorMasivo(TramitesMensual, usar_copy=True) as escritor:
+            escritor.agregar_todos(self.tramite(fiscal, i) for i, fiscal in enumerate(fiscales))
+        self.assertEqual(escritor.total, 4)
+        self.assertEqual(
+            sorted(TramitesMensual.objects.values_list('nombre_fiscal', 'total_tramite', 'periodo', 'ingesta')),
+            sorted((fiscal, i, date(2025, 3, 1), None) for i, fiscal in enumerate(fiscales)),
+        )
+        # Las fechas auto_now_add también pasan por COPY
+        self.assertFalse(TramitesMensual.objects.filter(fecha_creacion__isnull=True).exists())
+
+
+class EjecucionIngestaViewTests(TestCase):
+
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(Usuario.objects.create_superuser('admin', 'admin@example.com', 'clave'))
+        EjecucionIngesta.objects.bulk_create(
+            EjecucionIngesta(tipo='plazos', dependencia='DEP', periodo='2025-03', estado=EjecucionIngesta.PROCESADO, duracion=0.1)
+            for _ in range(5)
+        )
+
+    def cantidad(self, limite):
+        respuesta = self.cliente.get('/api/v1/ingestas/ejecuciones/', {'limite': limite})
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        return len(respuesta.json())
+
+    @override_settings(INGESTA_MAX_EJECUCIONES=3)
+    def test_limite_acotado(self):
+        self.assertEqual(self.cantidad(2), 2)
+        self.assertEqual(self.cantidad(0), 1)
+        self.assertEqual(self.cantidad(-4), 1)
+        self.assertEqual(self.cantidad(10_000), 3)
+
+    def test_limite_no_numerico(self):
+        respuesta = self.cliente.get('/api/v1/ingestas/ejecuciones/', {'limite': 'todas'})
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn('limite', respuesta.json())
@@ -0,0 +1,84 @@
+import traceback
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.api.procesar_archivos import crear_tarea, ejecutar_tareas, listar_tareas
+from apps.modelos.models import ArchivoTrabajo, TrabajoIngesta
+
+
+def encolar_trabajo(mes, anio, procesos=1, hasta=''):
+    # Los archivos del trabajo se fijan al encolarlo. Los que ya esperan en otro trabajo sin terminar
+    # no se vuelven a tomar, así dos workers nunca procesan (ni mueven) el mismo archivo.
+    with transaction.atomic():
+        en_cola = set(
+            ArchivoTrabajo.objects.filter(
+                estado=ArchivoTrabajo.PENDIENTE,
+                trabajo__estado__in=[TrabajoIngesta.PENDIENTE, TrabajoIngesta.EN_PROCESO],
+            ).values_list('tipo', 'archivo')
+        )
+        tareas = [tarea for tarea in listar_tareas() if (tarea['tipo'], tarea['archivo']) not in en_cola]
+        trabajo = TrabajoIngesta.objects.create(
+            mes=mes, anio=anio, hasta=hasta or '', procesos=procesos or 1, total_archivos=len(tareas)
+        )
+        ArchivoTrabajo.objects.bulk_create([
+            ArchivoTrabajo(trabajo=trabajo, tipo=tarea['tipo'], archivo=tarea['archivo'], dependencia=tarea['dependencia'])
+            for tarea in tareas
+        ])
+    return trabajo
+
+
+def tomar_siguiente_trabajo():
+    # SKIP LOCKED permite que varios workers consulten la cola sin tomar el mismo trabajo
+    with transaction.atomic():
+        trabajo = (
+            TrabajoIngesta.objects.select_for_update(skip_locked=True)
+            .filter(estado=TrabajoIngesta.PENDIENTE)
+            .order_by('id')
+            .first()
+        )
+        if trabajo is None:
+            return None
+        trabajo.estado = TrabajoIngesta.EN_PROCESO
+        trabajo.fecha_inicio = timezone.now()
+        trabajo.save(update_fields=['estado', 'fecha_inicio'])
+    return trabajo
+
+
+def reclamar_trabajos_abandonados(minutos):
+    # Un trabajo cuyo worker murió queda EN_PROCESO para siempre: pasados `minutos` desde que empezó
+    # vuelve a la cola, y el worker que lo tome procesa solo los archivos que quedaron pendientes.
+    # El plazo tiene que superar lo que tarda el trabajo más largo, o se ejecutaría dos veces.
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TrabajoIngesta.objects.filter(estado=TrabajoIngesta.EN_PROCESO, fecha_inicio__lt=limite).update(
+        estado=TrabajoIngesta.PENDIENTE, fecha_inicio=None
+    )
+
+
+def ejecutar_trabajo(trabajo):
+    try:
+        archivos = list(trabajo.archivos.filter(estado=ArchivoTrabajo.PENDIENTE))
+        tareas = [crear_tarea(archivo.tipo, archivo.archivo) for archivo in archivos]
+        por_ruta = {tarea['ruta']: archivo for tarea, archivo in zip(tareas, archivos)}
+
+        def al_terminar(tarea, resultado):
+            archivo = por_ruta[tarea['ruta']]
+            archivo.estado = ArchivoTrabajo.ERROR if 'error' in resultado else ArchivoTrabajo.PROCESADO
+            archivo.mensaje = resultado.get('error') or resultado.get('mensaje') or ''
+            archivo.duracion = resultado['duracion']
+            archivo.save(update_fields=['estado', 'mensaje', 'duracion'])
+            TrabajoIngesta.objects.filter(pk=trabajo.pk).update(archivos_procesados=F('archivos_procesados') + 1)
+
+        ejecutar_tareas(
+            tareas, trabajo.mes, trabajo.anio, procesos=trabajo.procesos, al_terminar=al_terminar,
+            hasta=trabajo.hasta or None,
+        )
+        estado, error = TrabajoIngesta.TERMINADO, ''
+    except Exception:
+        estado, error = TrabajoIngesta.FALLIDO, traceback.format_exc()
+
+    TrabajoIngesta.objects.filter(pk=trabajo.pk).update(estado=estado, error=error, fecha_fin=timezone.now())
+    trabajo.refresh_from_db()
+    return trabajo
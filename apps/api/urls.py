@@ -1,6 +1,9 @@
 from django.urls import path
 from .views import CrearCargaSiatfView, CrearPlazosView, CargarCargaLaboralView, CrearCargaTotalView,CrearPlazosDetalleView
-from .viewss import ProcesarArchivosPlazosView
+from .viewss import (
+    ProcesarArchivosPlazosView, TrabajoIngestaView, IndicadorCargaView, IndicadorCargaDependenciaView,
+    IndicadorPlazosView, IndicadorMateriaDelitoView, EjecucionIngestaView,
+)
 
 
 urlpatterns = ([
@@ -9,7 +12,13 @@ urlpatterns = ([
     path('crearCarga/', CargarCargaLaboralView.as_view(), name='Crear Carga'),
     path('cargaTotal/', CrearCargaTotalView.as_view(), name='Carga total'),
     path('plazos/masivo/', ProcesarArchivosPlazosView.as_view(), name ='Cargar Plazos de forma masiva'),
+    path('plazos/masivo/<int:pk>/', TrabajoIngestaView.as_view(), name ='Estado de la carga masiva'),
     path('cargaSiatf',CrearCargaSiatfView.as_view(), name ='Cargar Carga SIATF de forma masiva'),
     path('plazosDetalle',CrearPlazosDetalleView.as_view(), name ='Cargar Plazos Detallado de forma masiva'),
+    path('indicadores/carga/', IndicadorCargaView.as_view(), name='Indicadores de carga por fiscal'),
+    path('indicadores/carga/dependencias/', IndicadorCargaDependenciaView.as_view(), name='Indicadores de carga por dependencia'),
+    path('indicadores/plazos/', IndicadorPlazosView.as_view(), name='Indicadores de cumplimiento de plazos'),
+    path('indicadores/materias/', IndicadorMateriaDelitoView.as_view(), name='Ranking de materias delito'),
+    path('ingestas/ejecuciones/', EjecucionIngestaView.as_view(), name='Ejecuciones de ingesta por etapa'),
 
 ])
\ No newline at end of file
@@ -1,196 +1,103 @@
-import os
-import shutil
-
 from rest_framework import status
+from django.conf import settings
+from django.db.models import Sum
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from django.db import transaction
 from rest_framework.permissions import DjangoModelPermissions
 
-from apps.api.functions import (
-    procesar_archivo_plazos,
-    procesar_carga_total,
-    procesar_carga_laboral,
-    procesar_carga_siatf,
-    procesar_archivo_plazos_detallado   
+from apps.api.indicadores import CAMPOS_CARGA
+from apps.api.trabajos import encolar_trabajo
+from apps.modelos.models import (
+    EjecucionIngesta, IndicadorCarga, IndicadorMateriaDelito, IndicadorPlazos, Plazos, TrabajoIngesta,
+)
+from .serializers import (
+    EjecucionIngestaSerializer, IndicadorCargaSerializer, IndicadorMateriaDelitoSerializer, IndicadorPlazosSerializer,
+    TrabajoIngestaCrearSerializer, TrabajoIngestaSerializer,
 )
-from apps.modelos.models import Plazos
-
 
-def extraer_dependencia_desde_nombre(nombre_archivo):
-    base = os.path.splitext(nombre_archivo)[0]
-    dependencia = base.split('_')[0]
-    return dependencia
 
 class ProcesarArchivosPlazosView(APIView):
     queryset = Plazos.objects.none()
     permission_classes = [DjangoModelPermissions]
 
     def post(self, request):
-        mes = request.data.get('mes')
-        anio = request.data.get('anio')
-
-        if not mes or not anio:
-            return Response({'error': 'Debe enviar mes y anio'}, status=status.HTTP_400_BAD_REQUEST)
-
-        resultados = []
-
-        #---------- PLAZOS DETALLADO---------
-        carpeta_plazos_detallado = 'data/PlazosDetallado'
-        carpeta_destino_plazos_detallado = 'dataprocesada/PlazosDetallado'
-        os.makedirs(carpeta_destino_plazos_detallado, exist_ok=True)
-        if os.path.exists(carpeta_plazos_detallado):
-            archivos_plazos_detallado = [f for f in os.listdir(carpeta_plazos_detallado) if f.endswith('.csv')]
-            for archivo in archivos_plazos_detallado:
-                dependencia = extraer_dependencia_desde_nombre(archivo) 
-                ruta_archivo = os.path.join(carpeta_plazos_detallado, archivo)
-                try:
-                    with open(ruta_archivo, 'rb') as f:
-                        success, mensaje = procesar_archivo_plazos_detallado(f, dependencia)
-                except Exception as e:
-                    resultados.append({
-                        'tipo': 'Plazos Detallado',
-                        'dependencia': dependencia,
-                        'error': str(e)
-                    })
-                if success:
-                    shutil.move(ruta_archivo, os.path.join(carpeta_destino_plazos_detallado, archivo))  
-                else:   
-                    resultados.append({
-                        'tipo': 'Plazos Detallado',
-                        'dependencia': dependencia,
-                        'error': mensaje
-                    })
-
-        # ---------- PLZAZOS ----------
-        carpeta_plazos = 'data/Plazos'
-        carpeta_destino_plazos = 'dataprocesada/Plazos'
-        os.makedirs(carpeta_destino_plazos, exist_ok=True)
-
-        if os.path.exists(carpeta_plazos):
-            archivos_plazos = [f for f in os.listdir(carpeta_plazos) if f.endswith('.csv')]
-
-            for archivo in archivos_plazos:
-                dependencia = extraer_dependencia_desde_nombre(archivo)
-                ruta_archivo = os.path.join(carpeta_plazos, archivo)
-
-                try:
-                    with open(ruta_archivo, 'rb') as f:
-                        success, mensaje = procesar_archivo_plazos(f, dependencia)
-
-                    if success:
-                        shutil.move(ruta_archivo, os.path.join(carpeta_destino_plazos, archivo))
-
-                    resultados.append({
-                        'tipo': 'Plazos',
-                        'dependencia': dependencia,
-                        'mensaje': 'Archivo procesado correctamente'
-                    })
-                except Exception as e:
-                    resultados.append({
-                        'tipo': 'Plazos',
-                        'dependencia': dependencia,
-                        'error': str(e)
-                    })
-
-        # ---------- RESUMEN CARGA TOTAL ----------
-        carpeta_carga = 'data/ResumenCarga'
-        carpeta_destino_carga = 'dataprocesada/ResumenCarga'
-        os.makedirs(carpeta_destino_carga, exist_ok=True)
-
-        if os.path.exists(carpeta_carga):
-            archivos_carga = [f for f in os.listdir(carpeta_carga) if f.endswith('.csv')]
-
-            for archivo in archivos_carga:
-                dependencia = extraer_dependencia_desde_nombre(archivo)
-                ruta_archivo = os.path.join(carpeta_carga, archivo)
-
-                try:
-                    with open(ruta_archivo, 'rb') as f:
-                        response_data, response_status = procesar_carga_total(f, dependencia)
-
-                    if response_status == status.HTTP_201_CREATED:
-                        shutil.move(ruta_archivo, os.path.join(carpeta_destino_carga, archivo))
-
-                    # resultados.append({
-                    #     'tipo': 'Plazos',
-                    #     'dependencia': dependencia,
-                    #     'mensaje': 'Archivo procesado correctamente'
-                    # })
-                except Exception as e:
-                    resultados.append({
-                        'tipo': 'Plazos',
-                        'dependencia': dependencia,
-                        'error': str(e)
-                    })
-
-        # ---------- CARGA LABORAL ----------
-        carpeta_laboral = 'data/CargaTotal'
-        carpeta_destino_laboral = 'dataprocesada/CargaTotal'
-        os.makedirs(carpeta_destino_laboral, exist_ok=True)
-
-        if os.path.exists(carpeta_laboral):
-            archivos_laboral = [f for f in os.listdir(carpeta_laboral)]
-            for archivo in archivos_laboral:
-                dependencia = extraer_dependencia_desde_nombre(archivo)
-                ruta_archivo = os.path.join(carpeta_laboral, archivo)
-
-                try:
-                    with open(ruta_archivo, 'rb') as f:
-                        response_data, response_status = procesar_carga_laboral(f, dependencia, mes, anio)
-
-                    if response_status==status.HTTP_201_CREATED:
-                        shutil.move(ruta_archivo, os.path.join(carpeta_destino_laboral, archivo))
-                        # resultados.append({
-                        #     'tipo': 'Plazos',
-                        #     'dependencia': dependencia,
-                        #     'mensaje': 'Archivo procesado correctamente'
-                        # })
-                    else:
-                        resultados.append({
-                            'tipo': 'Plazos',
-                            'dependencia': dependencia,
-                            'error': response_data.get('detalle') or 'No se pudo procesar el archivo'
-                        })
-                except Exception as e:
-                    resultados.append({
-                        'tipo': 'Plazos',
-                        'dependencia': dependencia,
-                        'error': str(e)
-                    })
-
-        # ---------- CARGA SIATF ----------
-        carpeta_siatf = 'data/CargaSiatf'
-        carpeta_destino_siatf = 'dataprocesada/CargaSiatf'
-        os.makedirs(carpeta_destino_siatf, exist_ok=True)
-        
-        if os.path.exists(carpeta_siatf):
-            archivos_siatf = [f for f in os.listdir(carpeta_siatf) if f.endswith('.xlsx')]
-            for archivo in archivos_siatf:
-                dependencia = extraer_dependencia_desde_nombre(archivo)
-                ruta_archivo = os.path.join(carpeta_siatf, archivo)
-                
-                try:
-                    with open(ruta_archivo, 'rb') as f:
-                        response_data, response_status = procesar_carga_siatf(f, dependencia)
-
-                    if response_status == status.HTTP_201_CREATED:
-                        shutil.move(ruta_archivo, os.path.join(carpeta_destino_siatf, archivo))
-                    else:
-                        resultados.append({
-                            'tipo': 'Carga SIATF',
-                            'dependencia': dependencia,
-                            'error': response_data.get('detalle') or 'No se pudo procesar el archivo'
-                        })
-                except Exception as e:
-                    resultados.append({
-                        'tipo': 'Carga SIATF',
-                        'dependencia': dependencia,
-                        'error': str(e)
-                    })
-        return Response(resultados, status=status.HTTP_200_OK)  
-
-
-
-
+        serializer = TrabajoIngestaCrearSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        datos = serializer.validated_data
+
+        # El worker (python manage.py procesar_trabajos) toma el trabajo de la cola
+        trabajo = encolar_trabajo(datos['mes'], datos['anio'], datos['procesos'], datos['hasta'])
+        return Response(TrabajoIngestaSerializer(trabajo).data, status=status.HTTP_202_ACCEPTED)
+
+
+class TrabajoIngestaView(RetrieveAPIView):
+    queryset = TrabajoIngesta.objects.prefetch_related('archivos')
+    serializer_class = TrabajoIngestaSerializer
+
+
+class IndicadorListView(ListAPIView):
+    # Lectura de las tablas de indicadores. Filtros opcionales por query string:
+    # los campos de `filtros` por igualdad, y desde/hasta (AAAA-MM) sobre el periodo
+    filtros = ['dependencia', 'periodo']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        for campo in self.filtros:
+            if params.get(campo):
+                queryset = queryset.filter(**{campo: params[campo]})
+        if params.get('desde'):
+            queryset = queryset.filter(periodo__gte=params['desde'])
+        if params.get('hasta'):
+            queryset = queryset.filter(periodo__lte=params['hasta'])
+        return queryset
+
+
+class IndicadorCargaView(IndicadorListView):
+    queryset = IndicadorCarga.objects.all()
+    serializer_class = IndicadorCargaSerializer
+    filtros = ['dependencia', 'nombre_fiscal', 'periodo']
+
+
+class IndicadorCargaDependenciaView(IndicadorListView):
+    # Totales por dependencia y mes, sumados sobre las filas por fiscal ya agregadas
+    queryset = IndicadorCarga.objects.all()
+
+    def list(self, request, *args, **kwargs):
+        totales = (
+            self.get_queryset()
+            .values('dependencia', 'periodo')
+            .annotate(**{campo: Sum(campo) for campo in CAMPOS_CARGA})
+            .order_by('dependencia', 'periodo')
+        )
+        return Response(list(totales))
+
+
+class IndicadorPlazosView(IndicadorListView):
+    queryset = IndicadorPlazos.objects.all()
+    serializer_class = IndicadorPlazosSerializer
+    filtros = ['dependencia', 'nombre_fiscal', 'periodo', 'fuente']
+
+
+class IndicadorMateriaDelitoView(IndicadorListView):
+    queryset = IndicadorMateriaDelito.objects.all()
+    serializer_class = IndicadorMateriaDelitoSerializer
+
+
+class EjecucionIngestaView(IndicadorListView):
+    # Últimas ejecuciones de ingesta con la duración, filas y memoria de cada etapa.
+    # `limite` acota cuántas se devuelven (100 por defecto, entre 1 e INGESTA_MAX_EJECUCIONES).
+    queryset = EjecucionIngesta.objects.all()
+    serializer_class = EjecucionIngestaSerializer
+    filtros = ['tipo', 'dependencia', 'periodo', 'estado']
+
+    def get_queryset(self):
+        try:
+            limite = int(self.request.query_params.get('limite', 100))
+        except ValueError:
+            raise ValidationError({'limite': 'Debe ser un número entero.'})
+        maximo = getattr(settings, 'INGESTA_MAX_EJECUCIONES', 1000)
+        return super().get_queryset()[:min(max(limite, 1), maximo)]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:23
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def eliminar_duplicados(apps, schema_editor):
+    # Conserva solo el registro más reciente de cada clave antes de crear las restricciones
+    claves = {
+        'TramitesMensual': ('dependencia', 'nombre_fiscal', 'mes'),
+        'CargaSiatf': ('dependencia', 'especialidad', 'estado'),
+    }
+    for nombre_modelo, campos in claves.items():
+        modelo = apps.get_model('modelos', nombre_modelo)
+        ultimos = modelo.objects.values(*campos).annotate(ultimo=Max('id')).values('ultimo')
+        modelo.objects.exclude(id__in=ultimos).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0011_plazosdetalle'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cargasiatf',
+            constraint=models.UniqueConstraint(fields=('dependencia', 'especialidad', 'estado'), name='cargasiatf_estado_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='tramitesmensual',
+            constraint=models.UniqueConstraint(fields=('dependencia', 'nombre_fiscal', 'mes'), name='tramitesmensual_periodo_unico'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0012_tramitesmensual_cargasiatf_unicos'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoIngesta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.IntegerField()),
+                ('anio', models.IntegerField()),
+                ('procesos', models.IntegerField(default=1)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('EN_PROCESO', 'En proceso'), ('TERMINADO', 'Terminado'), ('FALLIDO', 'Fallido')], default='PENDIENTE', max_length=20)),
+                ('total_archivos', models.IntegerField(default=0)),
+                ('archivos_procesados', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_inicio', models.DateTimeField(blank=True, null=True)),
+                ('fecha_fin', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivoTrabajo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=256)),
+                ('archivo', models.CharField(max_length=256)),
+                ('dependencia', models.CharField(max_length=256)),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESADO', 'Procesado'), ('ERROR', 'Error')], default='PENDIENTE', max_length=20)),
+                ('mensaje', models.TextField(blank=True, default='')),
+                ('duracion', models.FloatField(blank=True, null=True)),
+                ('trabajo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archivos', to='modelos.trabajoingesta')),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+    ]
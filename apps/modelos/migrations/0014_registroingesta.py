@@ -0,0 +1,55 @@
+# Generated by Django 5.2.1 on 2026-10-18 18:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0013_trabajoingesta_archivotrabajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroIngesta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=64)),
+                ('dependencia', models.CharField(max_length=256)),
+                ('periodo', models.CharField(max_length=7)),
+                ('hash_contenido', models.CharField(max_length=64)),
+                ('archivo', models.CharField(blank=True, default='', max_length=256)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_modificacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'dependencia', 'periodo'), name='registroingesta_unico')],
+            },
+        ),
+        migrations.AddField(
+            model_name='carga',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+        migrations.AddField(
+            model_name='cargatotal',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+        migrations.AddField(
+            model_name='materiadelito',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+        migrations.AddField(
+            model_name='plazos',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+        migrations.AddField(
+            model_name='plazosdetalle',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+    ]
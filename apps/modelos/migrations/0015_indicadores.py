@@ -0,0 +1,70 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0014_registroingesta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicadorCarga',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dependencia', models.CharField(max_length=256)),
+                ('nombre_fiscal', models.CharField(max_length=256)),
+                ('periodo', models.CharField(max_length=7)),
+                ('casos_ingresados', models.IntegerField(default=0)),
+                ('casos_resueltos', models.IntegerField(default=0)),
+                ('casos_en_tramite', models.IntegerField(default=0)),
+                ('sentencias', models.IntegerField(default=0)),
+                ('archivos_consentidos', models.IntegerField(default=0)),
+                ('archivo_califica', models.IntegerField(default=0)),
+                ('archivo_preliminar', models.IntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('dependencia', 'periodo', 'nombre_fiscal'),
+                'constraints': [models.UniqueConstraint(fields=('dependencia', 'nombre_fiscal', 'periodo'), name='indicadorcarga_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IndicadorMateriaDelito',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dependencia', models.CharField(max_length=256)),
+                ('periodo', models.CharField(max_length=7)),
+                ('materia', models.CharField(max_length=256)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('posicion', models.IntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('dependencia', 'periodo', 'posicion'),
+                'constraints': [models.UniqueConstraint(fields=('dependencia', 'periodo', 'materia'), name='indicadormateriadelito_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='IndicadorPlazos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dependencia', models.CharField(max_length=256)),
+                ('nombre_fiscal', models.CharField(max_length=256)),
+                ('periodo', models.CharField(max_length=7)),
+                ('fuente', models.CharField(max_length=64)),
+                ('dentro_plazo', models.IntegerField(default=0)),
+                ('por_vencer', models.IntegerField(default=0)),
+                ('vencidos', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('cumplimiento', models.FloatField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('dependencia', 'periodo', 'nombre_fiscal'),
+                'constraints': [models.UniqueConstraint(fields=('fuente', 'dependencia', 'nombre_fiscal', 'periodo'), name='indicadorplazos_unico')],
+            },
+        ),
+    ]
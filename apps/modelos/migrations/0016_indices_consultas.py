@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:04
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def eliminar_cargas_duplicadas(apps, schema_editor):
+    # Cargas repetidas de antes del registro de ingestas: se conserva el registro más reciente
+    Carga = apps.get_model('modelos', 'Carga')
+    ultimos = Carga.objects.values('dependencia', 'nombre_fiscal', 'fecha').annotate(ultimo=Max('id')).values('ultimo')
+    Carga.objects.exclude(id__in=ultimos).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0015_indicadores'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carga',
+            index=models.Index(fields=['dependencia', 'fecha'], name='carga_dep_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materiadelito',
+            index=models.Index(fields=['dependencia', 'mes'], name='materiadelito_dep_mes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plazos',
+            index=models.Index(fields=['dependencia', 'nombre_fiscal'], name='plazos_dep_fiscal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plazosdetalle',
+            index=models.Index(fields=['dependencia', 'nombre_fiscal'], name='plazosdetalle_dep_fiscal_idx'),
+        ),
+        migrations.RunPython(eliminar_cargas_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='carga',
+            constraint=models.UniqueConstraint(fields=('dependencia', 'nombre_fiscal', 'fecha'), name='carga_fiscal_dia_unico'),
+        ),
+    ]
@@ -0,0 +1,150 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:21
+
+from datetime import date
+
+from django.db import migrations, models
+
+# Las etiquetas viejas salían de strftime('%B').upper() con LC_TIME en es-ES; si el locale
+# no estaba disponible quedaban en inglés
+MESES = {
+    'ENERO': 1, 'FEBRERO': 2, 'MARZO': 3, 'ABRIL': 4, 'MAYO': 5, 'JUNIO': 6, 'JULIO': 7,
+    'AGOSTO': 8, 'SEPTIEMBRE': 9, 'SETIEMBRE': 9, 'OCTUBRE': 10, 'NOVIEMBRE': 11, 'DICIEMBRE': 12,
+    'JANUARY': 1, 'FEBRUARY': 2, 'MARCH': 3, 'APRIL': 4, 'MAY': 5, 'JUNE': 6, 'JULY': 7,
+    'AUGUST': 8, 'SEPTEMBER': 9, 'OCTOBER': 10, 'NOVEMBER': 11, 'DECEMBER': 12,
+}
+
+NOMBRES_MESES = [
+    'ENERO', 'FEBRERO', 'MARZO', 'ABRIL', 'MAYO', 'JUNIO', 'JULIO',
+    'AGOSTO', 'SEPTIEMBRE', 'OCTUBRE', 'NOVIEMBRE', 'DICIEMBRE',
+]
+
+
+def periodo_anterior_a(mes, referencia):
+    # Último mes con ese nombre que no es posterior a la fecha de referencia
+    return date(referencia.year if mes <= referencia.month else referencia.year - 1, mes, 1)
+
+
+def convertir_meses(apps, schema_editor):
+    # La etiqueta no trae año: se toma del momento en que se escribió la fila o de su ingesta.
+    # Una etiqueta irreconocible no se puede ubicar en el tiempo: la migración se detiene y
+    # lista esas filas para que se corrijan o eliminen a mano antes de volver a correrla.
+    MateriaDelito = apps.get_model('modelos', 'MateriaDelito')
+    TramitesMensual = apps.get_model('modelos', 'TramitesMensual')
+
+    irreconocibles = [
+        f'{modelo.__name__} id={id_fila} mes={mes!r}'
+        for modelo in (TramitesMensual, MateriaDelito)
+        for id_fila, mes in modelo.objects.values_list('id', 'mes')
+        if MESES.get(mes.strip().upper()) is None
+    ]
+    if irreconocibles:
+        raise ValueError(
+            f'{len(irreconocibles)} filas con un mes irreconocible: ' + ', '.join(irreconocibles)
+        )
+
+    periodos_tramites = {}
+    for tramite in TramitesMensual.objects.all():
+        mes = MESES[tramite.mes.strip().upper()]
+        tramite.periodo = periodo_anterior_a(mes, tramite.fecha_modificacion)
+        tramite.save(update_fields=['periodo'])
+        periodos = periodos_tramites.setdefault((tramite.dependencia, mes), set())
+        periodos.add(tramite.periodo)
+
+    for materia in MateriaDelito.objects.select_related('ingesta'):
+        mes = MESES[materia.mes.strip().upper()]
+        if materia.ingesta is not None:
+            # La ingesta es del mes procesado; la etiqueta es ese mes o el anterior
+            anio, mes_ingesta = (int(parte) for parte in materia.ingesta.periodo.split('-'))
+            referencia = date(anio, mes_ingesta, 1)
+        elif periodos_tramites.get((materia.dependencia, mes)):
+            referencia = max(periodos_tramites[(materia.dependencia, mes)])
+        else:
+            referencia = date.today()
+        materia.periodo = periodo_anterior_a(mes, referencia)
+        materia.save(update_fields=['periodo'])
+
+
+def restaurar_meses(apps, schema_editor):
+    # Vuelve a la etiqueta en castellano y el año se pierde. Antes había un solo TramitesMensual
+    # por fiscal y etiqueta, así que de los mismos meses de años distintos queda el más reciente.
+    TramitesMensual = apps.get_model('modelos', 'TramitesMensual')
+    vistos = set()
+    for id_fila, dependencia, fiscal, periodo in (
+        TramitesMensual.objects.order_by('-periodo').values_list('id', 'dependencia', 'nombre_fiscal', 'periodo')
+    ):
+        clave = (dependencia, fiscal, periodo.month)
+        if clave in vistos:
+            TramitesMensual.objects.filter(id=id_fila).delete()
+        vistos.add(clave)
+
+    for nombre in ('MateriaDelito', 'TramitesMensual'):
+        modelo = apps.get_model('modelos', nombre)
+        for numero, mes in enumerate(NOMBRES_MESES, start=1):
+            modelo.objects.filter(periodo__month=numero).update(mes=mes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0016_indices_consultas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='materiadelito',
+            name='periodo',
+            field=models.DateField(null=True),
+        ),
+        migrations.AddField(
+            model_name='tramitesmensual',
+            name='periodo',
+            field=models.DateField(null=True),
+        ),
+        # Antes de convertir, para que al revertir la columna mes vuelva vacía y la restricción y el
+        # NOT NULL se repongan con las etiquetas ya puestas
+        migrations.RemoveConstraint(
+            model_name='tramitesmensual',
+            name='tramitesmensual_periodo_unico',
+        ),
+        migrations.AlterField(
+            model_name='materiadelito',
+            name='mes',
+            field=models.CharField(max_length=256, null=True),
+        ),
+        migrations.AlterField(
+            model_name='tramitesmensual',
+            name='mes',
+            field=models.CharField(max_length=256, null=True),
+        ),
+        migrations.RunPython(convertir_meses, restaurar_meses),
+        migrations.RemoveIndex(
+            model_name='materiadelito',
+            name='materiadelito_dep_mes_idx',
+        ),
+        migrations.RemoveField(
+            model_name='materiadelito',
+            name='mes',
+        ),
+        migrations.RemoveField(
+            model_name='tramitesmensual',
+            name='mes',
+        ),
+        migrations.AlterField(
+            model_name='materiadelito',
+            name='periodo',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='tramitesmensual',
+            name='periodo',
+            field=models.DateField(),
+        ),
+        migrations.AddIndex(
+            model_name='materiadelito',
+            index=models.Index(fields=['dependencia', 'periodo'], name='materiadelito_dep_periodo_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tramitesmensual',
+            constraint=models.UniqueConstraint(fields=('dependencia', 'nombre_fiscal', 'periodo'), name='tramitesmensual_periodo_unico'),
+        ),
+    ]
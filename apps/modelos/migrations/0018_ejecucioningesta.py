@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0017_periodo_mensual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EjecucionIngesta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=64)),
+                ('dependencia', models.CharField(max_length=256)),
+                ('periodo', models.CharField(max_length=7)),
+                ('archivo', models.CharField(blank=True, default='', max_length=256)),
+                ('estado', models.CharField(choices=[('PROCESADO', 'Procesado'), ('OMITIDO', 'Omitido (ya procesado)'), ('ERROR', 'Error')], max_length=20)),
+                ('mensaje', models.TextField(blank=True, default='')),
+                ('duracion', models.FloatField()),
+                ('filas_leidas', models.IntegerField(default=0)),
+                ('filas_escritas', models.IntegerField(default=0)),
+                ('memoria_pico', models.BigIntegerField(blank=True, null=True)),
+                ('etapas', models.JSONField(default=dict)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('ingesta', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ejecuciones', to='modelos.registroingesta')),
+            ],
+            options={
+                'ordering': ('-id',),
+                'indexes': [models.Index(fields=['tipo', 'dependencia', 'periodo'], name='ejecucioningesta_fuente_idx')],
+            },
+        ),
+    ]
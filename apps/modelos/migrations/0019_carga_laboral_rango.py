@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0018_ejecucioningesta'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoingesta',
+            name='hasta',
+            field=models.CharField(blank=True, default='', max_length=7),
+        ),
+        migrations.AlterField(
+            model_name='ejecucioningesta',
+            name='periodo',
+            field=models.CharField(max_length=15),
+        ),
+        migrations.AlterField(
+            model_name='registroingesta',
+            name='periodo',
+            field=models.CharField(max_length=15),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-18 20:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('modelos', '0019_carga_laboral_rango'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cargasiatf',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+        migrations.AddField(
+            model_name='tramitesmensual',
+            name='ingesta',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='modelos.registroingesta'),
+        ),
+    ]
@@ -3,6 +3,66 @@ from django.db import models
 
 
 
+class RegistroIngesta(models.Model):
+    # Un registro por archivo ingerido: tipo de fuente, dependencia y periodo (AAAA-MM, o
+    # AAAA-MM:AAAA-MM cuando un export de carga laboral se carga para varios meses), con el
+    # hash SHA-256 del contenido para reconocer archivos ya procesados
+    tipo = models.CharField(max_length=64)
+    dependencia = models.CharField(max_length=256)
+    periodo = models.CharField(max_length=15)
+    hash_contenido = models.CharField(max_length=64)
+    archivo = models.CharField(max_length=256, blank=True, default='')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_modificacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.tipo} {self.dependencia} {self.periodo}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['tipo', 'dependencia', 'periodo'], name='registroingesta_unico'),
+        ]
+
+
+class EjecucionIngesta(models.Model):
+    # Una fila por cada vez que se procesa un archivo, por la API o por la carga masiva.
+    # `etapas` guarda segundos, filas y pico de memoria (bytes) de cada etapa del pipeline.
+    PROCESADO = 'PROCESADO'
+    OMITIDO = 'OMITIDO'
+    ERROR = 'ERROR'
+    ESTADOS = [
+        (PROCESADO, 'Procesado'),
+        (OMITIDO, 'Omitido (ya procesado)'),
+        (ERROR, 'Error'),
+    ]
+
+    tipo = models.CharField(max_length=64)
+    dependencia = models.CharField(max_length=256)
+    periodo = models.CharField(max_length=15)
+    archivo = models.CharField(max_length=256, blank=True, default='')
+    estado = models.CharField(max_length=20, choices=ESTADOS)
+    mensaje = models.TextField(blank=True, default='')
+    duracion = models.FloatField()
+    filas_leidas = models.IntegerField(default=0)
+    filas_escritas = models.IntegerField(default=0)
+    # Solo con INGESTA_MEDIR_MEMORIA
+    memoria_pico = models.BigIntegerField(blank=True, null=True)
+    etapas = models.JSONField(default=dict)
+    ingesta = models.ForeignKey(
+        RegistroIngesta, related_name='ejecuciones', on_delete=models.SET_NULL, blank=True, null=True
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.tipo} {self.dependencia} {self.periodo} {self.estado}'
+
+    class Meta:
+        ordering = ('-id',)
+        indexes = [
+            models.Index(fields=['tipo', 'dependencia', 'periodo'], name='ejecucioningesta_fuente_idx'),
+        ]
+
+
 class PlazosDetalle(models.Model):
     dependencia = models.CharField(max_length=256)
     nombre_fiscal =models.CharField(max_length=256)
@@ -11,10 +71,16 @@ class PlazosDetalle(models.Model):
     dentro_plazo = models.IntegerField(default=0)
     por_vencer = models.IntegerField(default=0)
     vencidos = models.IntegerField(default=0)
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.nombre_fiscal
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['dependencia', 'nombre_fiscal'], name='plazosdetalle_dep_fiscal_idx'),
+        ]
+
 
 
 class Plazos(models.Model):
@@ -27,10 +93,16 @@ class Plazos(models.Model):
     fecha_modificacion = models.DateField(auto_now=True)
     tipo_caso = models.CharField(max_length=256)
     # tipo_caso = models.ForeignKey(TipoCaso, on_delete=models.CASCADE)
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.nombre_fiscal
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['dependencia', 'nombre_fiscal'], name='plazos_dep_fiscal_idx'),
+        ]
+
 class Carga(models.Model):
     nombre_fiscal = models.CharField(max_length=256)
     casos_resueltos = models.IntegerField(default=0)
@@ -44,10 +116,21 @@ class Carga(models.Model):
     archivo_preliminar = models.IntegerField(default=0)
     fecha_creacion = models.DateField(auto_now_add=True)
     fecha_modificacion = models.DateField(auto_now=True)
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.nombre_fiscal
 
+    class Meta:
+        # Un registro por fiscal y día; el índice de la restricción sirve también a las consultas
+        # por dependencia, por dependencia y fiscal, y a los rangos de fecha dentro de ellas
+        constraints = [
+            models.UniqueConstraint(fields=['dependencia', 'nombre_fiscal', 'fecha'], name='carga_fiscal_dia_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['dependencia', 'fecha'], name='carga_dep_fecha_idx'),
+        ]
+
 class CargaTotal(models.Model):
     nombre_fiscal = models.CharField(max_length=256)
     total_tramite =  models.IntegerField(default=0)
@@ -62,6 +145,7 @@ class CargaTotal(models.Model):
     etapa_intermedia = models.IntegerField(default=0)
     etapa_juzgamiento = models.IntegerField(default=0)
     fecha_modificacion = models.DateField(auto_now=True)
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.dependencia
@@ -75,37 +159,180 @@ class Usuario(AbstractUser):
 class MateriaDelito(models.Model):
     materia = models.CharField(max_length=256)
     cantidad = models.IntegerField(default=0)
-    mes = models.CharField(max_length=256)
+    # Primer día del mes contado
+    periodo = models.DateField()
     dependencia =  models.CharField(max_length=256)
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.materia
 
+    class Meta:
+        # Sin restricción única: cada export de carga laboral vuelve a contar el mes anterior
+        indexes = [
+            models.Index(fields=['dependencia', 'periodo'], name='materiadelito_dep_periodo_idx'),
+        ]
+
 
 class TramitesMensual(models.Model):
     dependencia = models.CharField(max_length=256)
     nombre_fiscal = models.CharField(max_length=256)
     # fecha_ingreso = models.DateField(blank=False)
     # fecha_conclusion = models.DateField(blank=True, null= True)
-    mes = models.CharField(max_length=256)
+    # Primer día del mes procesado
+    periodo = models.DateField()
     total_tramite = models.IntegerField(default=0)
     tramite_mes = models.IntegerField(default=0)
     resuelto_mes = models.IntegerField(default=0)
     fecha_creacion = models.DateField(auto_now_add=True)
     fecha_modificacion = models.DateField(auto_now=True)
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.dependencia
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dependencia', 'nombre_fiscal', 'periodo'], name='tramitesmensual_periodo_unico'),
+        ]
+
 class CargaSiatf(models.Model):
     dependencia = models.CharField(max_length=256)
     estado = models.CharField(max_length=256)
     especialidad = models.CharField(max_length=256)
     casos_ingresados = models.IntegerField(default=0)
     cantidad  =models.IntegerField(default=0)
-    
+    ingesta = models.ForeignKey(RegistroIngesta, on_delete=models.CASCADE, blank=True, null=True)
 
     def __str__(self):
         return self.dependencia
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dependencia', 'especialidad', 'estado'], name='cargasiatf_estado_unico'),
+        ]
     
 
+
+
+class IndicadorCarga(models.Model):
+    # Totales de Carga por fiscal y mes (AAAA-MM), recalculados al terminar cada ingesta
+    dependencia = models.CharField(max_length=256)
+    nombre_fiscal = models.CharField(max_length=256)
+    periodo = models.CharField(max_length=7)
+    casos_ingresados = models.IntegerField(default=0)
+    casos_resueltos = models.IntegerField(default=0)
+    casos_en_tramite = models.IntegerField(default=0)
+    sentencias = models.IntegerField(default=0)
+    archivos_consentidos = models.IntegerField(default=0)
+    archivo_califica = models.IntegerField(default=0)
+    archivo_preliminar = models.IntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.dependencia} {self.nombre_fiscal} {self.periodo}'
+
+    class Meta:
+        ordering = ('dependencia', 'periodo', 'nombre_fiscal')
+        constraints = [
+            models.UniqueConstraint(fields=['dependencia', 'nombre_fiscal', 'periodo'], name='indicadorcarga_unico'),
+        ]
+
+
+class IndicadorPlazos(models.Model):
+    # Cumplimiento de plazos por fiscal en cada ingesta de Plazos o Plazos Detallado (fuente)
+    dependencia = models.CharField(max_length=256)
+    nombre_fiscal = models.CharField(max_length=256)
+    periodo = models.CharField(max_length=7)
+    fuente = models.CharField(max_length=64)
+    dentro_plazo = models.IntegerField(default=0)
+    por_vencer = models.IntegerField(default=0)
+    vencidos = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    cumplimiento = models.FloatField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.dependencia} {self.nombre_fiscal} {self.periodo}'
+
+    class Meta:
+        ordering = ('dependencia', 'periodo', 'nombre_fiscal')
+        constraints = [
+            models.UniqueConstraint(fields=['fuente', 'dependencia', 'nombre_fiscal', 'periodo'], name='indicadorplazos_unico'),
+        ]
+
+
+class IndicadorMateriaDelito(models.Model):
+    # Ranking de materias por casos ingresados en el mes, tomado del export más reciente que lo cubre
+    dependencia = models.CharField(max_length=256)
+    periodo = models.CharField(max_length=7)
+    materia = models.CharField(max_length=256)
+    cantidad = models.IntegerField(default=0)
+    posicion = models.IntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.dependencia} {self.periodo} {self.materia}'
+
+    class Meta:
+        ordering = ('dependencia', 'periodo', 'posicion')
+        constraints = [
+            models.UniqueConstraint(fields=['dependencia', 'periodo', 'materia'], name='indicadormateriadelito_unico'),
+        ]
+
+
+class TrabajoIngesta(models.Model):
+    PENDIENTE = 'PENDIENTE'
+    EN_PROCESO = 'EN_PROCESO'
+    TERMINADO = 'TERMINADO'
+    FALLIDO = 'FALLIDO'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (TERMINADO, 'Terminado'),
+        (FALLIDO, 'Fallido'),
+    ]
+
+    mes = models.IntegerField()
+    anio = models.IntegerField()
+    # AAAA-MM: la carga laboral se procesa para todos los meses desde mes/anio hasta este
+    hasta = models.CharField(max_length=7, blank=True, default='')
+    procesos = models.IntegerField(default=1)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    total_archivos = models.IntegerField(default=0)
+    archivos_procesados = models.IntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(blank=True, null=True)
+    fecha_fin = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.id} {self.estado}'
+
+    class Meta:
+        ordering = ('id',)
+
+
+class ArchivoTrabajo(models.Model):
+    PENDIENTE = 'PENDIENTE'
+    PROCESADO = 'PROCESADO'
+    ERROR = 'ERROR'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (PROCESADO, 'Procesado'),
+        (ERROR, 'Error'),
+    ]
+
+    trabajo = models.ForeignKey(TrabajoIngesta, related_name='archivos', on_delete=models.CASCADE)
+    tipo = models.CharField(max_length=256)
+    archivo = models.CharField(max_length=256)
+    dependencia = models.CharField(max_length=256)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)
+    mensaje = models.TextField(blank=True, default='')
+    duracion = models.FloatField(blank=True, null=True)
+
+    def __str__(self):
+        return self.archivo
+
+    class Meta:
+        ordering = ('id',)
@@ -164,3 +164,45 @@ X_FRAME_OPTIONS = 'ALLOWALL'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Ingesta de archivos
+# Tamaño de lote para las inserciones masivas de los procesadores de apps/api/functions.py
+INGESTA_BATCH_SIZE = 2000
+# Usa COPY en lugar de INSERT por lotes cuando la base es PostgreSQL
+INGESTA_USAR_COPY = False
+# Procesos del pool que reparte los archivos de data/ en procesar_archivos (1 = secuencial)
+INGESTA_PROCESOS = 1
+# Máximo de procesos que puede pedir un trabajo de carga masiva
+INGESTA_PROCESOS_MAX = 4
+# Minutos tras los que procesar_trabajos da por abandonado un trabajo EN_PROCESO y lo vuelve a encolar
+INGESTA_TRABAJO_ABANDONADO_MINUTOS = 240
+# Filas por bloque al leer los CSV de ingesta (la memoria queda acotada a un bloque)
+INGESTA_CHUNKSIZE = 100_000
+# Bytes del inicio del archivo que se usan para detectar la codificación
+INGESTA_MUESTRA_CODIFICACION = 1024 * 1024
+# Al procesar la carga laboral de un mes se reemplaza todo lo que haya de ese periodo para la dependencia
+INGESTA_REEMPLAZAR_PERIODO = True
+# Máximo de meses que puede cubrir una carga laboral con `hasta` (todos se procesan en una transacción)
+INGESTA_MAX_MESES_RANGO = 24
+# Parser de los CSV de ingesta: 'c' (por bloques) o 'pyarrow' (multihilo, requiere pip install pyarrow)
+INGESTA_MOTOR_CSV = 'c'
+# Motor con el que se agrupan los datos en la agregación: 'pandas' o 'polars' (multinúcleo, requiere
+# pip install polars pyarrow). INGESTA_MOTOR_AGREGACION_DEPENDENCIAS lo cambia solo para algunas dependencias.
+INGESTA_MOTOR_AGREGACION = 'pandas'
+INGESTA_MOTOR_AGREGACION_DEPENDENCIAS = {}
+# Mide el pico de memoria de cada etapa de la ingesta con tracemalloc (hace más lenta la ingesta)
+INGESTA_MEDIR_MEMORIA = False
+# Máximo de ejecuciones que devuelve /api/v1/ingestas/ejecuciones/ por pedido (parámetro `limite`)
+INGESTA_MAX_EJECUCIONES = 1000
+
+# Cada ingesta deja una línea con la duración de sus etapas en el logger apps.api.pipeline
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'consola': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps.api': {'handlers': ['consola'], 'level': 'INFO'},
+    },
+}